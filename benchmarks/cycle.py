@@ -0,0 +1,121 @@
+"""
+End-to-end run_cycle benchmark over recorded HTTP cassettes.
+
+Record once against the live APIs, then replay offline as often as needed:
+
+    python -m benchmarks.cycle --record
+    python -m benchmarks.cycle --cycles 3 --latency 0.08 --jitter 0.03
+
+Replay needs the KeyBERT model in the local model cache (collectors filter on keywords);
+--synthetic-encoder avoids loading the SentenceTransformer used for embeddings. Models are
+loaded once, before the first timed cycle.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from config import CASSETTE_DIR, EMBEDDING_MODEL, EMBEDDING_VERSION
+from benchmarks.run import RESULTS_DIR, git_revision
+from benchmarks.synthetic import SyntheticEncoder
+
+
+def load_models(synthetic_encoder):
+    """
+    Loads KeyBERT, the language profiles and the embedding encoder before any timer starts,
+    so cycle timings measure the pipeline rather than model loading. Returns (encoder, tag);
+    the same encoder is injected into every cycle's TrendManager.
+    """
+    from langdetect import detect
+    from collectors.base import get_keyword_model
+
+    get_keyword_model()
+    detect("warm up the language detector")
+    if synthetic_encoder:
+        return SyntheticEncoder(), None
+    from sentence_transformers import SentenceTransformer
+    print(f"🧠 Loading embedding model {EMBEDDING_MODEL}...")
+    return SentenceTransformer(EMBEDDING_MODEL), (EMBEDDING_MODEL, EMBEDDING_VERSION)
+
+
+async def timed_cycle(cycle_num, db_manager, mode, options):
+    from collectors.client import build_client, cassette_stats
+    from ui.main import run_cycle
+
+    async with build_client(mode=mode, **options) as client:
+        start = time.perf_counter()
+        await run_cycle(cycle_num, datetime.now().strftime("%H:%M:%S"), db_manager=db_manager, client=client)
+        elapsed = time.perf_counter() - start
+        stats = cassette_stats(client)
+    return elapsed, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--record', action='store_true', help="run one live cycle and store its responses")
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="artificial seconds per replayed response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="+/- seconds added to the latency")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cassettes', default=CASSETTE_DIR)
+    parser.add_argument('--synthetic-encoder', action='store_true')
+    parser.add_argument('--output', help="results file (default: benchmarks/results/cycle-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    from database.manager import TrendManager
+
+    workdir = tempfile.mkdtemp(prefix='trends-cycle-')
+    try:
+        encoder, tag = load_models(args.synthetic_encoder)
+        if args.record:
+            db_manager = TrendManager(db_path=os.path.join(workdir, 'record.db'), nlp_model=encoder, embedding_tag=tag)
+            elapsed, stats = asyncio.run(timed_cycle(1, db_manager, 'record', {'cassette_dir': args.cassettes}))
+            print(f"\n🎙️ Recorded {stats.get('recorded', 0)} responses to {args.cassettes} in {elapsed:.1f}s")
+            return
+
+        options = {'cassette_dir': args.cassettes, 'latency': args.latency, 'jitter': args.jitter, 'seed': args.seed}
+        timings, runs = [], []
+        for cycle_num in range(1, args.cycles + 1):
+            # Every cycle starts from an empty database so runs are comparable
+            db_manager = TrendManager(db_path=os.path.join(workdir, f"cycle_{cycle_num}.db"), nlp_model=encoder,
+                                      embedding_tag=tag)
+            elapsed, stats = asyncio.run(timed_cycle(cycle_num, db_manager, 'replay', options))
+            timings.append(elapsed)
+            runs.append({'cycle': cycle_num, 'seconds': elapsed, **stats})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n⏱️ run_cycle over replay: median {statistics.median(timings):.2f}s, min {min(timings):.2f}s")
+    if any(r.get('missed') for r in runs):
+        print("⚠️ Some requests had no cassette; re-record to keep runs representative.")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'seed': args.seed,
+            'synthetic_encoder': args.synthetic_encoder
+        },
+        'runs': runs
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"cycle-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
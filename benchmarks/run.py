@@ -0,0 +1,200 @@
+"""
+Scaling benchmarks for storage, scoring and graph entry points on a synthetic corpus.
+
+Runs fully offline: posts, scores and 384-d embeddings come from a seeded generator
+and TrendManager gets a SyntheticEncoder instead of the SentenceTransformer model.
+
+    python -m benchmarks.run --sizes 1k,10k,100k
+    python -m benchmarks.run --sizes 1m --only recalculate_platform_stats --no-memory
+    python -m benchmarks.run --sizes 10k --baseline benchmarks/results/bench-20260101-120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from benchmarks.synthetic import SyntheticCorpus, SyntheticEncoder, SYNTHETIC_MODEL_TAG
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+CYCLE_BATCH = 200  # posts per simulated ingest cycle for save_posts
+
+ENTRY_POINTS = [
+    'recalculate_platform_stats',
+    'fetch_balanced_trends',
+    'publish_snapshot',
+    'fetch_balanced_trends_parquet',
+    'build_graph',
+    'save_posts'  # last: it grows the corpus
+]
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def measure(fn, repeat, trace_memory):
+    """Times fn `repeat` times, then (optionally) replays it once under tracemalloc for the peak."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_mb': peak_mb
+    }
+
+
+def build_steps(db_path, snapshot_dir, manager, corpus_size, seed):
+    """Maps entry point names to zero-argument callables bound to this corpus."""
+    from collectors.github import GitHubCollector
+    from collectors.hacker_news import HackerNewsCollector
+    from collectors.mastodon import MastodonCollector
+    from collectors.devto import DevToCollector
+    from database.analytics import publish_snapshot, load_balanced_trends
+    from ui.graph_analyzer import GraphBuilder
+
+    collectors = [GitHubCollector(), HackerNewsCollector(), MastodonCollector(), DevToCollector()]
+    for collector in collectors:
+        collector.db_path = db_path
+
+    batches = {'next_id': corpus_size}
+
+    def save_cycle():
+        # Fresh external ids every call so each run inserts a full cycle
+        posts = list(SyntheticCorpus(seed + batches['next_id']).posts(CYCLE_BATCH, start=batches['next_id']))
+        batches['next_id'] += CYCLE_BATCH
+        manager.save_posts(posts)
+
+    return {
+        'recalculate_platform_stats': lambda: [c.recalculate_platform_stats() for c in collectors],
+        'fetch_balanced_trends': lambda: load_balanced_trends(db_path=db_path, path=snapshot_dir + '.missing'),
+        'publish_snapshot': lambda: publish_snapshot(db_path, snapshot_dir, force=True),
+        'fetch_balanced_trends_parquet': lambda: load_balanced_trends(db_path=db_path, path=snapshot_dir),
+        'build_graph': lambda: GraphBuilder(db_path=db_path, model_tag=SYNTHETIC_MODEL_TAG).build_graph(),
+        'save_posts': save_cycle
+    }
+
+
+def run_size(size, seed, workdir, entry_points, repeat, trace_memory):
+    from database.manager import TrendManager
+
+    db_path = os.path.join(workdir, f"corpus_{size}.db")
+    snapshot_dir = os.path.join(workdir, f"snapshot_{size}")
+    manager = TrendManager(db_path=db_path, nlp_model=SyntheticEncoder())
+
+    start = time.perf_counter()
+    SyntheticCorpus(seed).populate(db_path, size)
+    populate_seconds = time.perf_counter() - start
+    print(f"📦 {size:,} rows generated in {populate_seconds:.1f}s ({os.path.getsize(db_path) / 1e6:.0f} MB)")
+
+    steps = build_steps(db_path, snapshot_dir, manager, size, seed)
+    results = []
+    for name in ENTRY_POINTS:
+        if name not in entry_points:
+            continue
+        stats = measure(steps[name], repeat, trace_memory)
+        peak = f"{stats['peak_mb']:.1f} MB" if stats['peak_mb'] is not None else "n/a"
+        print(f"   ⏱️ {name:<32} {stats['seconds_median']:>9.4f}s | peak {peak}")
+        results.append({'size': size, 'entry_point': name, **stats})
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Prints the speed ratio of every (size, entry point) present in both runs."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['size'], r['entry_point']): r for r in json.load(f)['results']}
+    print(f"\n📊 Compared to {os.path.basename(baseline_path)} (>1.00x is faster)")
+    for r in results:
+        base = baseline.get((r['size'], r['entry_point']))
+        if base:
+            ratio = base['seconds_median'] / max(r['seconds_median'], 1e-9)
+            print(f"   {r['size']:>9,} | {r['entry_point']:<32} {ratio:>6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1k,10k,100k', help="comma separated corpus sizes, e.g. 1k,10k,100k,1m")
+    parser.add_argument('--only', help="comma separated subset of: " + ', '.join(ENTRY_POINTS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--workdir', help="keep generated corpora here instead of a temp dir")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    entry_points = set(args.only.split(',')) if args.only else set(ENTRY_POINTS)
+    unknown = entry_points - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"unknown entry points: {', '.join(sorted(unknown))}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='trends-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    try:
+        for size in sizes:
+            results.extend(run_size(size, args.seed, workdir, entry_points, args.repeat, not args.no_memory))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'cycle_batch': CYCLE_BATCH
+        },
+        'results': results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from config import EMBEDDING_DIM
+
+# Tag of every synthetic vector, so benchmark corpora never pass for real embeddings
+SYNTHETIC_MODEL_TAG = ('synthetic-blake2b', 1)
+
+# Raw score shapes per platform (log-normal mu / sigma) and typical content length in characters
+PLATFORM_PROFILES = {
+    'GitHub': {'mu': 7.0, 'sigma': 1.2, 'content_chars': 900},
+    'Hacker News': {'mu': 4.0, 'sigma': 1.3, 'content_chars': 2000},
+    'Mastodon': {'mu': 1.5, 'sigma': 1.0, 'content_chars': 300},
+    'Dev.to': {'mu': 3.0, 'sigma': 1.0, 'content_chars': 3000}
+}
+
+TOPIC_VOCABULARY = [
+    ['llm', 'inference', 'quantization', 'gguf', 'latency'],
+    ['agent', 'tool calling', 'planner', 'autonomous', 'workflow'],
+    ['diffusion', 'image generation', 'stable diffusion', 'lora', 'sampler'],
+    ['vector', 'embedding', 'retrieval', 'rag', 'index'],
+    ['pytorch', 'training', 'gpu', 'cuda', 'kernel'],
+    ['transformer', 'attention', 'context window', 'tokenizer', 'benchmark'],
+    ['openai', 'gpt', 'api', 'pricing', 'release'],
+    ['deepseek', 'open weights', 'reasoning', 'distillation', 'moe'],
+    ['data science', 'pandas', 'notebook', 'feature', 'dataset'],
+    ['automation', 'pipeline', 'mlops', 'deployment', 'monitoring'],
+    ['nlp', 'sentiment', 'classification', 'ner', 'translation'],
+    ['claude', 'assistant', 'coding', 'ide', 'copilot']
+]
+
+FILLER = ['the', 'new', 'approach', 'shows', 'how', 'teams', 'use', 'with', 'for', 'faster', 'open', 'source']
+
+
+class SyntheticEncoder:
+    """
+    Drop-in stand-in for SentenceTransformer.encode: a deterministic unit vector per text.
+    Lets TrendManager.save_posts run without downloading or loading a model.
+    """
+
+    model_name, model_version = SYNTHETIC_MODEL_TAG
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def encode(self, text, **kwargs):
+        if not isinstance(text, str):
+            return np.stack([self.encode(t) for t in text]) if len(text) else np.empty((0, self.dim), np.float32)
+        seed = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+class SyntheticCorpus:
+    """
+    Seeded generator of realistic-looking posts for the four platforms.
+    Embeddings are drawn around shared topic centroids, so cross-platform
+    similarity (and therefore graph density) behaves like real data.
+    """
+
+    def __init__(self, seed=42, topic_noise=0.8, days=60):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.topic_noise = topic_noise
+        self.days = days
+        centroids = self.rng.standard_normal((len(TOPIC_VOCABULARY), EMBEDDING_DIM))
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def _text(self, topic, n_chars):
+        words = TOPIC_VOCABULARY[topic] + FILLER
+        picks = self.rng.choice(len(words), size=max(n_chars // 6, 4))
+        return ' '.join(words[i] for i in picks)[:n_chars]
+
+    def _embeddings(self, topics):
+        # Noise norm ~topic_noise, so same-topic posts land around cosine 1 / (1 + topic_noise^2)
+        noise = self.rng.standard_normal((len(topics), EMBEDDING_DIM)) * self.topic_noise / np.sqrt(EMBEDDING_DIM)
+        vectors = self.centroids[topics] + noise
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    def posts(self, n, start=0):
+        """Yields n post dicts shaped like collector output, plus a precomputed 'embedding'."""
+        platforms = list(PLATFORM_PROFILES)
+        platform_idx = self.rng.integers(0, len(platforms), size=n)
+        topics = self.rng.integers(0, len(TOPIC_VOCABULARY), size=n)
+        embeddings = self._embeddings(topics)
+        ages = self.rng.uniform(0, self.days * 86400, size=n)
+
+        for i in range(n):
+            platform = platforms[platform_idx[i]]
+            profile = PLATFORM_PROFILES[platform]
+            topic = int(topics[i])
+            published = self.now - timedelta(seconds=float(ages[i]))
+            vocabulary = TOPIC_VOCABULARY[topic]
+            yield {
+                'source_platform': platform,
+                'external_id': f"syn-{start + i}",
+                'title': self._text(topic, 60),
+                'content': self._text(topic, profile['content_chars']),
+                'author': f"user{int(self.rng.integers(0, 5000))}",
+                'url': f"https://example.com/{platform.lower().replace(' ', '-')}/{start + i}",
+                'raw_score': float(np.round(self.rng.lognormal(profile['mu'], profile['sigma']))),
+                'sentiment': float(self.rng.uniform(-0.3, 0.6)),
+                'published_at': str(int(published.timestamp())) if platform == 'Hacker News' else published.isoformat(),
+                'keywords': list(self.rng.choice(vocabulary, size=3, replace=False)),
+                'embedding': embeddings[i]
+            }
+
+    def populate(self, db_path, n, chunk_size=10000):
+        """Bulk-loads n posts straight into unified_posts (schema must already exist)."""
+        collected_at = self.now.isoformat()
+        with sqlite3.connect(db_path) as conn:
+            for start in range(0, n, chunk_size):
+                batch = self.posts(min(chunk_size, n - start), start=start)
+                conn.executemany('''
+                    INSERT INTO unified_posts (
+                        source_platform, external_id, title, content, author, url, raw_score,
+                        trend_score, published_at, collected_at, keywords, embedding,
+                        embedding_model, embedding_version
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?)
+                ''', [(
+                    p['source_platform'], p['external_id'], p['title'], p['content'], p['author'], p['url'],
+                    p['raw_score'], p['published_at'], collected_at, json.dumps(p['keywords']),
+                    json.dumps(p['embedding'].tolist()), *SYNTHETIC_MODEL_TAG
+                ) for p in batch])
+                conn.commit()
@@ -0,0 +1,285 @@
+"""
+TrendAnalyzer command line: run one pipeline stage without starting the scheduler.
+
+    python cli.py collect-once            # one full ingest cycle (loads KeyBERT + embeddings)
+    python cli.py rescore-only            # renormalize trend scores, no models
+    python cli.py stats                   # per-platform counts and storage tiers, no models
+    python cli.py rebuild-graph           # rebuild the semantic graph snapshot, no models
+    python cli.py re-embed                # resumable re-embedding backfill, loads SentenceTransformer
+    python cli.py export --out DIR        # publish the Parquet analytics snapshot, no models
+    python cli.py vacuum                  # one-time switch to incremental VACUUM; stop writers first
+    python cli.py keywords --days 7       # rising keyphrases from the keyword index, no models
+    python cli.py topics --maintain       # emerging topic clusters, no models
+    python cli.py worker                  # drain the ingest job queue (start as many as needed)
+    python cli.py queue --fetch           # enqueue fetch jobs / inspect the queue, no models
+
+Every command imports only the modules its stage needs, so the maintenance commands
+start without touching the NLP stack. --profile profiles the command (see telemetry.profiling).
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+DB_PATH = os.path.join(PROJECT_ROOT, "trends_project.db")
+
+
+def cmd_collect_once(args):
+    import asyncio
+    from database.manager import TrendManager
+    from ui.main import run_cycle
+
+    db_manager = TrendManager(db_path=args.db)
+    asyncio.run(run_cycle(1, datetime.now().strftime("%H:%M:%S"), db_manager=db_manager))
+
+
+def cmd_rescore_only(args):
+    from database.scoring import list_platforms, rescore_platform
+
+    platforms = args.platform or list_platforms(args.db)
+    for platform in platforms:
+        count = rescore_platform(args.db, platform)
+        print(f"🧠 {platform}: rescored {count} posts")
+
+
+def _require_db(path):
+    """Read-only and maintenance commands never create a database at a mistyped path."""
+    if not os.path.exists(path):
+        sys.exit(f"❌ No database at {path}")
+
+
+def cmd_stats(args):
+    from database.manager import TrendManager
+
+    _require_db(args.db)
+    db_manager = TrendManager(db_path=args.db)
+    db_manager.get_db_stats()
+    storage = db_manager.retention.storage_stats()
+    tiers = ', '.join(f"{tier}: {count}" for tier, count in sorted(storage['tiers'].items(), key=str)) or 'empty'
+    print(f"🧊 Storage tiers: {tiers}")
+    print(f"💽 Database size: {storage['size_mb']:.1f} MB ({storage['free_mb']:.1f} MB free)")
+
+
+def cmd_rebuild_graph(args):
+    from ui.graph_analyzer import GraphBuilder, graph_snapshot_path
+
+    _require_db(args.db)
+    builder = GraphBuilder(db_path=args.db)
+    graph = builder.build_graph()
+    path = args.out or graph_snapshot_path(args.db)
+    builder.save_snapshot(path)
+    print(f"🕸️ Graph snapshot: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges -> {path}")
+
+
+def cmd_re_embed(args):
+    from database.backfill import EmbeddingBackfill
+
+    config = {k: v for k, v in (('chunk_size', args.chunk_size), ('workers', args.workers)) if v}
+    backfill = EmbeddingBackfill(args.db, keywords=args.keywords, force=args.force, config=config)
+    result = backfill.run(restart=args.restart, limit=args.limit)
+    if result['already_complete']:
+        state = "already complete, nothing new to encode"
+    elif result['finished']:
+        state = f"complete, {result['topics']:,} posts clustered into topics"
+    else:
+        state = f"paused after id {result['last_id']}"
+    print(f"🧬 {backfill.job}: {result['processed']:,} rows processed, {state}")
+
+
+def cmd_export(args):
+    from database.analytics import publish_snapshot
+
+    _require_db(args.db)
+    path = publish_snapshot(args.db, out_dir=args.out, force=args.full)
+    print(f"📦 Analytics snapshot published to {path}")
+
+
+def cmd_vacuum(args):
+    from database.retention import RetentionManager
+
+    _require_db(args.db)
+    retention = RetentionManager(args.db)
+    before = retention.storage_stats()
+    if not retention.enable_incremental_vacuum():
+        print("🗜️ Incremental auto-vacuum is already enabled; the retention job releases free pages")
+        return
+    after = retention.storage_stats()
+    print(f"🗜️ Incremental auto-vacuum enabled: {before['size_mb']:.1f} MB -> {after['size_mb']:.1f} MB")
+
+
+def cmd_keywords(args):
+    from database.keywords import KeywordIndex
+
+    _require_db(args.db)
+    index = KeywordIndex(args.db)
+    if args.rebuild:
+        print(f"🔑 Rebuilt keyword index: {index.rebuild():,} keyword occurrences")
+    rising = index.rising_keywords(days=args.days, platform=args.platform, limit=args.limit)
+    print(f"\n📈 Rising keyphrases (last {args.days} days vs. the 4 weeks before)")
+    for row in rising.itertuples():
+        print(f"  {row.keyword:<32} {row.recent:>5} posts | {row.platforms} platforms | momentum {row.momentum:.2f}")
+
+
+def cmd_topics(args):
+    from database.topics import TopicModel
+
+    _require_db(args.db)
+    model = TopicModel(args.db)
+    if args.rebuild:
+        print(f"🧭 Re-clustered {model.rebuild():,} embeddings")
+    elif args.maintain:
+        report = model.maintain()
+        print(f"🧭 {report['merged']} merged, {report['split']} split, {report['pruned']} pruned, "
+              f"{report['topics']} active topics")
+    emerging = model.emerging_topics(days=args.days, limit=args.limit)
+    print(f"\n🌱 Emerging topics (last {args.days} days vs. the 4 weeks before)")
+    for row in emerging.itertuples():
+        print(f"  #{row.topic_id:<5} {str(row.label or '-'):<40} {row.recent:>5} posts | "
+              f"{row.platforms} platforms | growth {row.growth:.2f}")
+
+
+def _collectors():
+    from collectors.github import GitHubCollector
+    from collectors.hacker_news import HackerNewsCollector
+    from collectors.mastodon import MastodonCollector
+    from collectors.devto import DevToCollector
+
+    return [GitHubCollector(), HackerNewsCollector(), MastodonCollector(), DevToCollector()]
+
+
+def cmd_worker(args):
+    import asyncio
+    from collectors.client import build_client
+    from database.manager import TrendManager
+    from database.queue import JobQueue
+    from ui.worker import IngestWorker
+
+    worker = IngestWorker(JobQueue(args.db), TrendManager(db_path=args.db), _collectors(),
+                          kinds=args.kinds, worker_id=args.id)
+    print(f"👷 Worker {worker.worker_id} draining {', '.join(worker.kinds)} jobs")
+
+    async def drain():
+        async with build_client() as client:
+            return await worker.run(client, once=args.once, max_jobs=args.max_jobs)
+
+    print(f"👷 {worker.worker_id}: {asyncio.run(drain())} jobs handled")
+
+
+def cmd_queue(args):
+    from database.queue import JobQueue
+    from ui.worker import JOB_FETCH
+
+    queue = JobQueue(args.db)
+    if args.fetch is not None:
+        platforms = args.fetch or [c.platform_name for c in _collectors()]
+        for platform in platforms:
+            job_id = queue.enqueue(JOB_FETCH, {'platform': platform}, dedupe_key=f"{JOB_FETCH}:{platform}")
+            print(f"📨 {platform}: " + (f"fetch job #{job_id} queued" if job_id else "a fetch is already pending"))
+    if args.requeue_dead:
+        print(f"♻️ {queue.requeue_dead()} dead-lettered jobs queued again")
+    if args.purge:
+        print(f"🧹 {queue.purge()} finished jobs purged")
+
+    print("\n📬 Job queue")
+    for kind, counts in sorted(queue.stats().items()):
+        print(f"  {kind:<10} " + ' | '.join(f"{status}: {n}" for status, n in sorted(counts.items())))
+    for job in queue.dead_letters() if args.dead else []:
+        print(f"  ☠️ #{job['id']} {job['kind']} after {job['attempts']} attempts: {job['last_error']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=DB_PATH, help="SQLite database (default: trends_project.db in the project root)")
+    parser.add_argument('--profile', nargs='?', const='all', choices=['cpu', 'mem', 'all'],
+                        help="write a profile of the command to profiles/")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('collect-once', help="run a single collection cycle").set_defaults(func=cmd_collect_once)
+
+    rescore = commands.add_parser('rescore-only', help="recompute trend scores from stored raw scores")
+    rescore.add_argument('--platform', action='append', help="limit to a platform (repeatable)")
+    rescore.set_defaults(func=cmd_rescore_only)
+
+    commands.add_parser('stats', help="print database health and storage summary").set_defaults(func=cmd_stats)
+
+    graph = commands.add_parser('rebuild-graph', help="rebuild the graph snapshot served to the dashboard")
+    graph.add_argument('--out', help="snapshot path (default: graph_snapshot.json next to the database)")
+    graph.set_defaults(func=cmd_rebuild_graph)
+
+    embed = commands.add_parser('re-embed', help="re-encode posts not yet on the configured embedding model")
+    embed.add_argument('--keywords', action='store_true', help="also re-extract keywords (loads KeyBERT)")
+    embed.add_argument('--force', action='store_true',
+                       help="re-encode rows already on the current model (add --restart to redo a finished run)")
+    embed.add_argument('--restart', action='store_true', help="ignore the checkpoint and start from the first row")
+    embed.add_argument('--workers', type=int, help="encoder processes (default: all cores)")
+    embed.add_argument('--chunk-size', type=int, help="rows per committed chunk")
+    embed.add_argument('--limit', type=int, help="stop after this many rows (resume later)")
+    embed.set_defaults(func=cmd_re_embed)
+
+    export = commands.add_parser('export', help="publish the Parquet analytics snapshot")
+    export.add_argument('--out', help="snapshot directory (default: next to the database)")
+    export.add_argument('--full', action='store_true', help="rewrite every platform, not only the changed ones")
+    export.set_defaults(func=cmd_export)
+
+    commands.add_parser(
+        'vacuum', help="switch the database to incremental auto-vacuum (full VACUUM; stop writers first)"
+    ).set_defaults(func=cmd_vacuum)
+
+    keywords = commands.add_parser('keywords', help="show keyphrases with the highest momentum")
+    keywords.add_argument('--days', type=int, default=7)
+    keywords.add_argument('--platform')
+    keywords.add_argument('--limit', type=int, default=20)
+    keywords.add_argument('--rebuild', action='store_true', help="re-derive the index from the JSON keywords first")
+    keywords.set_defaults(func=cmd_keywords)
+
+    topics = commands.add_parser('topics', help="show the fastest-growing topic clusters")
+    topics.add_argument('--days', type=int, default=7)
+    topics.add_argument('--limit', type=int, default=15)
+    topics.add_argument('--maintain', action='store_true', help="run the merge/split pass first")
+    topics.add_argument('--rebuild', action='store_true', help="re-cluster every stored embedding first")
+    topics.set_defaults(func=cmd_topics)
+
+    worker = commands.add_parser('worker', help="run an ingest worker on the job queue")
+    worker.add_argument('--kinds', nargs='+', choices=['fetch', 'process'], default=['fetch', 'process'],
+                        help="job kinds to claim (default: both)")
+    worker.add_argument('--id', help="worker id (default: host:pid)")
+    worker.add_argument('--once', action='store_true', help="exit when no job is due instead of polling")
+    worker.add_argument('--max-jobs', type=int, help="exit after this many jobs")
+    worker.set_defaults(func=cmd_worker)
+
+    queue = commands.add_parser('queue', help="inspect and manage the ingest job queue")
+    queue.add_argument('--fetch', nargs='*', metavar='PLATFORM',
+                       help="enqueue fetch jobs (all platforms if none given)")
+    queue.add_argument('--dead', action='store_true', help="list dead-lettered jobs")
+    queue.add_argument('--requeue-dead', action='store_true', help="retry every dead-lettered job")
+    queue.add_argument('--purge', action='store_true', help="delete finished jobs past keep_done_days")
+    queue.set_defaults(func=cmd_queue)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    handler = args.func
+    if args.profile:
+        # Set before the command's lazy imports so their decorators see it too
+        from telemetry.profiling import enable_profiling, profiled
+        enable_profiling(args.profile)
+        handler = profiled(args.command)(handler)
+
+    started = time.perf_counter()
+    try:
+        handler(args)
+    except KeyboardInterrupt:
+        print("\n👋 Interrupted.")
+        return 130
+    print(f"⏱️ {args.command} finished in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
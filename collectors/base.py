@@ -1,31 +1,38 @@
 from abc import ABC, abstractmethod
-import sqlite3
-import math
 import os
 import re
 import html  # Added for unescaping HTML entitiesֿ
-import numpy as np
 from textblob import TextBlob
 from langdetect import detect, detect_langs, LangDetectException
 from config import AI_FILTER_KEYWORDS
-from keybert import KeyBERT
+from database.scoring import DEFAULT_STATS_CONFIG, rescore_platform
+from telemetry.metrics import metrics
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "trends_project.db")
 
-print("🧠 Loading NLP Model (KeyBERT) for dynamic entity extraction...")
-kw_model = KeyBERT(model='all-MiniLM-L6-v2')
+kw_model = None
+
+
+def get_keyword_model():
+    """Loads KeyBERT on first use so rescoring and offline tooling never pay for it."""
+    global kw_model
+    if kw_model is None:
+        from keybert import KeyBERT
+        print("🧠 Loading NLP Model (KeyBERT) for dynamic entity extraction...")
+        kw_model = KeyBERT(model='all-MiniLM-L6-v2')
+    return kw_model
+
+
+class FetchError(Exception):
+    """A collector's listing request failed; raised so queue jobs are retried and dead-lettered."""
 
 
 class BaseCollector(ABC):
     def __init__(self, platform_name):
         self.platform_name = platform_name
-        self.stats_config = {
-            'min_stdev': 1.0,
-            'damping_factor': 1.0,
-            'sigmoid_shift': 0.5,
-            'log_base': 10
-        }
+        self.db_path = DB_PATH
+        self.stats_config = dict(DEFAULT_STATS_CONFIG)
 
     @staticmethod
     def clean_text(text):
@@ -51,7 +58,7 @@ class BaseCollector(ABC):
     def extract_keywords(text):
         if not text: return []
         try:
-            extracted = kw_model.extract_keywords(text, keyphrase_ngram_range=(1, 2), stop_words='english', top_n=5)
+            extracted = get_keyword_model().extract_keywords(text, keyphrase_ngram_range=(1, 2), stop_words='english', top_n=5)
             return [phrase.lower() for phrase, score in extracted if score > 0.35]
         except Exception as e:
             print(f"Extraction error: {e}")
@@ -61,45 +68,71 @@ class BaseCollector(ABC):
     def analyze_sentiment(text):
         if not text or not isinstance(text, str): return 0.0
         try:
-            return TextBlob(text).sentiment.polarity
-        except:
+            with metrics.timer('stage_seconds', stage='sentiment'):
+                return TextBlob(text).sentiment.polarity
+        except Exception:
             return 0.0
 
+    def _filter_outcome(self, stage, passed):
+        metrics.inc('filter_items_total', platform=self.platform_name, stage=stage,
+                    outcome='passed' if passed else 'rejected')
+        return passed
+
     def is_quality_content(self, post):
         """Final gatekeeper with language and relevance check."""
-        post['title'] = self.clean_text(post.get('title', ''))
-        post['content'] = self.clean_text(post.get('content', ''))
-        full_text = f"{post['title']} {post['content']}"
+        platform = self.platform_name
+        with metrics.timer('stage_seconds', stage='clean', platform=platform):
+            post['title'] = self.clean_text(post.get('title', ''))
+            post['content'] = self.clean_text(post.get('content', ''))
+            full_text = f"{post['title']} {post['content']}"
 
-        if not self.is_ai_relevant(full_text): return False
+        with metrics.timer('stage_seconds', stage='relevance', platform=platform):
+            relevant = self.is_ai_relevant(full_text)
+        if not self._filter_outcome('relevance', relevant): return False
 
         # Enhanced language detection
         text_to_check = full_text[:500]
         if len(text_to_check) > 25:
-            try:
-                langs = detect_langs(text_to_check)
-                if langs[0].lang != 'en' or langs[0].prob < 0.85: return False
-            except LangDetectException:
-                return False
+            with metrics.timer('stage_seconds', stage='language', platform=platform):
+                try:
+                    langs = detect_langs(text_to_check)
+                    is_english = langs[0].lang == 'en' and langs[0].prob >= 0.85
+                except LangDetectException:
+                    is_english = False
+            if not self._filter_outcome('language', is_english): return False
 
-        post['keywords'] = self.extract_keywords(full_text)
-        return bool(post.get('keywords'))
+        with metrics.timer('stage_seconds', stage='keybert', platform=platform):
+            post['keywords'] = self.extract_keywords(full_text)
+        return self._filter_outcome('keywords', bool(post.get('keywords')))
 
     def recalculate_platform_stats(self):
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, raw_score FROM unified_posts WHERE source_platform = ?', (self.platform_name,))
-            rows = cursor.fetchall()
-            if not rows: return
-            processed_scores = [math.log10(r[1] + 1) if r[1] > 0 else 0 for r in rows]
-            mean, std_dev = np.mean(processed_scores), np.std(processed_scores) or 1.0
-            damp, shift = self.stats_config.get('damping_factor', 1.0), self.stats_config.get('sigmoid_shift', 0.5)
-            for row, scaled_score in zip(rows, processed_scores):
-                z_score = ((scaled_score - mean) / (std_dev * damp)) + shift
-                trend_score = (1 / (1 + math.exp(-z_score))) * 100
-                cursor.execute('UPDATE unified_posts SET trend_score = ? WHERE id = ?', (trend_score, row[0]))
-            conn.commit()
+        with metrics.timer('stage_seconds', stage='rescore', platform=self.platform_name):
+            rescore_platform(self.db_path, self.platform_name, self.stats_config)
+
+    def process(self, posts):
+        """NLP stage: sentiment, cleaning, relevance/language filtering and keyword extraction."""
+        processed = []
+        for post in posts:
+            post['sentiment'] = self.analyze_sentiment(post.get('content'))
+            # is_quality_content handles cleaning and keyword extraction
+            if self.is_quality_content(post):
+                processed.append(post)
+        return processed
 
     @abstractmethod
+    async def fetch(self, client):
+        """
+        Network stage: returns raw post dicts, no NLP applied (safe to run on a fetch-only worker).
+        Errors propagate, so the job queue can retry the fetch or dead-letter it.
+        """
+        pass
+
     async def collect(self, client):
-        pass
\ No newline at end of file
+        """Inline fetch and process; a failed poll is counted and yields no posts."""
+        try:
+            posts = await self.fetch(client)
+        except Exception as e:
+            metrics.inc('collect_errors_total', platform=self.platform_name, error=type(e).__name__)
+            print(f"Error {self.platform_name}: {e}")
+            return []
+        return self.process(posts)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import time
+import httpx
+from config import HTTP_MODE
+from collectors.rate_limit import RateLimitedTransport, host_label
+from collectors.replay import CassetteTransport, MODE_REPLAY
+from telemetry.metrics import metrics
+
+USER_AGENT = 'TrendAnalyzer/5.0'
+MODE_LIVE = 'live'
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Records per-host request counts, status codes, latency and transport errors.
+    Hosts outside RATE_LIMITS (scraped article links) are aggregated under host="other".
+    """
+
+    def __init__(self, transport=None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        host = host_label(request.url.host)
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError as e:
+            metrics.inc('http_errors_total', host=host, error=type(e).__name__)
+            raise
+        finally:
+            metrics.observe('http_request_seconds', time.perf_counter() - start, host=host)
+        metrics.inc('http_requests_total', host=host, status=response.status_code)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def build_client(transport=None, timeout=30.0, mode=None, **cassette_options):
+    """
+    Creates the shared AsyncClient used by all collectors.
+    Every live request is routed through the per-host rate-limited scheduler;
+    pass an inner transport (e.g. httpx.MockTransport) to run fully offline.
+
+    mode (default: config.HTTP_MODE) selects record/replay: in 'record' and 'auto'
+    the cassette layer sits under the rate limiter, in 'replay' nothing touches the
+    network so the limiter is skipped and only the cassette latency/jitter applies.
+    """
+    mode = mode or HTTP_MODE
+    if mode == MODE_REPLAY:
+        transport = InstrumentedTransport(CassetteTransport(mode=mode, **cassette_options))
+    else:
+        if mode != MODE_LIVE:
+            transport = CassetteTransport(mode=mode, transport=transport, **cassette_options)
+        transport = RateLimitedTransport(transport=InstrumentedTransport(transport))
+
+    return httpx.AsyncClient(timeout=timeout, headers={'User-Agent': USER_AGENT}, transport=transport)
+
+
+def rate_budget(client):
+    """Returns the per-host budget tracked by the client's rate-limited transport, if any."""
+    transport = getattr(client, '_transport', None)
+    return transport.budget() if isinstance(transport, RateLimitedTransport) else {}
+
+
+def cassette_stats(client):
+    """Returns recorded/replayed/missed counters of the client's cassette layer, if any."""
+    transport = getattr(client, '_transport', None)
+    while transport is not None and not isinstance(transport, CassetteTransport):
+        transport = getattr(transport, '_transport', None)
+    return dict(transport.stats) if transport is not None else {}
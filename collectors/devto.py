@@ -1,5 +1,7 @@
 import httpx
-from collectors.base import BaseCollector
+from collectors.base import BaseCollector, FetchError
+from collectors.rate_limit import PRIORITY_DEEP
+from telemetry.metrics import metrics
 from config import MAX_POSTS_PER_PLATFORM
 
 
@@ -17,42 +19,41 @@ class DevToCollector(BaseCollector):
         """Fetches the full markdown body of an article for better NLP context."""
         url = f"https://dev.to/api/articles/{article_id}"
         try:
-            resp = await client.get(url)
+            resp = await client.get(url, extensions={'priority': PRIORITY_DEEP})
             if resp.status_code == 200:
                 data = resp.json()
                 return data.get('body_markdown', '') or data.get('description', '')
-        except:
+            metrics.inc('fetch_failures_total', platform=self.platform_name, stage='article_body',
+                        error=f"HTTP {resp.status_code}")
+        except Exception as e:
+            metrics.inc('fetch_failures_total', platform=self.platform_name, stage='article_body',
+                        error=type(e).__name__)
             return ""
         return ""
 
-    async def collect(self, client: httpx.AsyncClient):
+    async def fetch(self, client: httpx.AsyncClient):
         print(f"--- {self.platform_name}: Performing Deep Fetch for Articles... ---")
         posts = []
-        try:
-            params = {"tag": "ai", "per_page": MAX_POSTS_PER_PLATFORM}
-            response = await client.get(self.api_url, params=params)
-            if response.status_code != 200: return []
-
-            articles = response.json()[:MAX_POSTS_PER_PLATFORM]
-
-            for art in articles:
-                # DEEP FETCH: Get the full content instead of the truncated 'description'
-                full_content = await self.fetch_full_content(client, art['id'])
-
-                post = {
-                    'source_platform': self.platform_name,
-                    'external_id': str(art['id']),
-                    'title': art.get('title', ''),
-                    'content': full_content if full_content else art.get('description', ''),
-                    'author': art.get('user', {}).get('username', 'unknown'),
-                    'url': art.get('url', ''),
-                    'raw_score': art.get('public_reactions_count', 0),
-                    'sentiment': self.analyze_sentiment(full_content),
-                    'published_at': art.get('published_at', '')
-                }
-                if self.is_quality_content(post):
-                    posts.append(post)
-            return posts
-        except Exception as e:
-            print(f"Error Dev.to: {e}")
-            return []
\ No newline at end of file
+        params = {"tag": "ai", "per_page": MAX_POSTS_PER_PLATFORM}
+        response = await client.get(self.api_url, params=params)
+        if response.status_code != 200:
+            raise FetchError(f"article listing returned HTTP {response.status_code}")
+
+        articles = response.json()[:MAX_POSTS_PER_PLATFORM]
+
+        for art in articles:
+            # DEEP FETCH: Get the full content instead of the truncated 'description'
+            full_content = await self.fetch_full_content(client, art['id'])
+
+            post = {
+                'source_platform': self.platform_name,
+                'external_id': str(art['id']),
+                'title': art.get('title', ''),
+                'content': full_content if full_content else art.get('description', ''),
+                'author': art.get('user', {}).get('username', 'unknown'),
+                'url': art.get('url', ''),
+                'raw_score': art.get('public_reactions_count', 0),
+                'published_at': art.get('published_at', '')
+            }
+            posts.append(post)
+        return posts
\ No newline at end of file
@@ -1,6 +1,6 @@
 import httpx
 import textwrap
-from collectors.base import BaseCollector
+from collectors.base import BaseCollector, FetchError
 from config import MAX_POSTS_PER_PLATFORM
 
 
@@ -9,43 +9,37 @@ class MastodonCollector(BaseCollector):
         super().__init__("Mastodon")
         self.api_url = "https://mastodon.social/api/v1/timelines/tag/ai"
 
-    async def collect(self, client: httpx.AsyncClient):
+    async def fetch(self, client: httpx.AsyncClient):
         print(f"--- {self.platform_name}: Ingesting Toots... ---")
         posts = []
-        try:
-            params = {"limit": MAX_POSTS_PER_PLATFORM}
-            response = await client.get(self.api_url, params=params)
-            if response.status_code != 200: return []
-
-            items = response.json()[:MAX_POSTS_PER_PLATFORM]
-
-            for item in items:
-                clean_content = self.clean_text(item.get('content', ''))
-
-                # --- FILTER REPLIES ---
-                # Skip if the post is a personal conversation starting with @
-                if clean_content.startswith('@'): continue
-
-                title = textwrap.shorten(clean_content, width=80, placeholder="...")
-                raw_score = (item.get('replies_count', 0) +
-                             item.get('reblogs_count', 0) +
-                             item.get('favourites_count', 0))
-
-                post = {
-                    'source_platform': self.platform_name,
-                    'external_id': str(item['id']),
-                    'title': title,
-                    'content': clean_content,
-                    'author': item.get('account', {}).get('username', 'unknown'),
-                    'url': item.get('url', ''),
-                    'raw_score': raw_score,
-                    'sentiment': self.analyze_sentiment(clean_content),
-                    'published_at': item.get('created_at', '')
-                }
-
-                if self.is_quality_content(post):
-                    posts.append(post)
-            return posts
-        except Exception as e:
-            print(f"Error in Mastodon: {e}")
-            return []
\ No newline at end of file
+        params = {"limit": MAX_POSTS_PER_PLATFORM}
+        response = await client.get(self.api_url, params=params)
+        if response.status_code != 200:
+            raise FetchError(f"tag timeline returned HTTP {response.status_code}")
+
+        items = response.json()[:MAX_POSTS_PER_PLATFORM]
+
+        for item in items:
+            clean_content = self.clean_text(item.get('content', ''))
+
+            # --- FILTER REPLIES ---
+            # Skip if the post is a personal conversation starting with @
+            if not self._filter_outcome('reply', not clean_content.startswith('@')): continue
+
+            title = textwrap.shorten(clean_content, width=80, placeholder="...")
+            raw_score = (item.get('replies_count', 0) +
+                         item.get('reblogs_count', 0) +
+                         item.get('favourites_count', 0))
+
+            post = {
+                'source_platform': self.platform_name,
+                'external_id': str(item['id']),
+                'title': title,
+                'content': clean_content,
+                'author': item.get('account', {}).get('username', 'unknown'),
+                'url': item.get('url', ''),
+                'raw_score': raw_score,
+                'published_at': item.get('created_at', '')
+            }
+            posts.append(post)
+        return posts
\ No newline at end of file
@@ -0,0 +1,311 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+from config import RATE_LIMITS, RETRY_CONFIG
+from telemetry.metrics import metrics
+
+# --- Request Priorities (lower value is served first) ---
+# Primary listing calls (search, top stories, tag timeline) decide what a cycle sees at all,
+# so they jump ahead of per-item deep fetches (READMEs, article bodies, external pages).
+# Priorities only order requests waiting on the same bucket at the same time (e.g. concurrent
+# collector jobs sharing the external bucket); waiters are handed the turn, never polled.
+# Deep fetches of hosts without a RATE_LIMITS entry (arbitrary article links) are not retried.
+PRIORITY_PRIMARY = 0
+PRIORITY_DEEP = 10
+
+# Shared bucket for every host without its own RATE_LIMITS entry
+EXTERNAL_BUCKET = 'external'
+# Metrics label of those hosts: per-domain labels would grow the registry with every scraped link
+OTHER_HOST = 'other'
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value, now=None):
+    """Converts a Retry-After header (delta seconds or HTTP-date) to a wait in seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        target = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if target.tzinfo is None:
+        target = target.replace(tzinfo=timezone.utc)
+    now = now if now is not None else time.time()
+    return max(target.timestamp() - now, 0.0)
+
+
+def parse_reset(value, now=None):
+    """
+    Converts an X-RateLimit-Reset header to seconds until the window resets.
+    GitHub sends epoch seconds, Mastodon sends an ISO-8601 timestamp, others send a delta.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    now = now if now is not None else time.time()
+    try:
+        number = float(value)
+        # Anything that looks like a Unix timestamp is absolute, smaller values are deltas
+        return max(number - now, 0.0) if number > 1e9 else max(number, 0.0)
+    except ValueError:
+        pass
+    try:
+        target = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if target.tzinfo is None:
+        target = target.replace(tzinfo=timezone.utc)
+    return max(target.timestamp() - now, 0.0)
+
+
+def host_label(host, limits=None):
+    """Metrics label for a host: itself for configured APIs, OTHER_HOST for everything else."""
+    limits = RATE_LIMITS if limits is None else limits
+    return host if host in limits and host != 'default' else OTHER_HOST
+
+
+def _header_int(headers, name):
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Per-host (or per-host rate-limit resource) token bucket with priority-ordered waiters.
+    Only the head waiter sleeps on the refill; the others wait on an event until the turn is
+    handed to them. The configured rate is an upper bound; server headers can pace it down
+    or block it entirely.
+    """
+
+    def __init__(self, rate, capacity):
+        self.base_rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.paced_rate = None
+        self.paced_until = 0.0
+        # Last budget reported by the server, exposed through RateLimitedTransport.budget()
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    @property
+    def rate(self):
+        if self.paced_rate is not None and time.monotonic() < self.paced_until:
+            return self.paced_rate
+        return self.base_rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def blocked_for(self):
+        """Seconds until the server allows requests to this host again."""
+        return max(self.blocked_until - time.monotonic(), 0.0)
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def _next_delay(self):
+        if self.blocked_for() > 0:
+            return self.blocked_for()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / max(self.rate, 1e-6)
+
+    async def acquire(self, priority=PRIORITY_PRIMARY):
+        """Waits for a token; among waiters on the same host the lowest priority value wins."""
+        # The sequence number is unique, so the event is never compared
+        entry = (priority, next(self._sequence), asyncio.Event())
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                if self._waiters[0] is not entry:
+                    entry[2].clear()
+                    await entry[2].wait()
+                    continue
+                self._refill()
+                if self.blocked_for() == 0 and self.tokens >= 1:
+                    heapq.heappop(self._waiters)
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(max(self._next_delay(), 0.005))
+        except BaseException:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        finally:
+            # Hand the turn to whoever is at the head now
+            if self._waiters:
+                self._waiters[0][2].set()
+
+    def observe(self, headers):
+        """Syncs the bucket with X-RateLimit-* headers from a response."""
+        limit = _header_int(headers, 'X-RateLimit-Limit')
+        remaining = _header_int(headers, 'X-RateLimit-Remaining')
+        reset_in = parse_reset(headers.get('X-RateLimit-Reset'))
+
+        if limit is not None:
+            self.limit = limit
+        if remaining is None:
+            return
+        self.remaining = remaining
+        self.reset_at = time.time() + reset_in if reset_in is not None else None
+
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0 and reset_in:
+            self.block(reset_in)
+        elif reset_in:
+            # Spread what is left of the window evenly instead of bursting into a hard limit
+            self.paced_rate = min(self.base_rate, remaining / reset_in)
+            self.paced_until = time.monotonic() + reset_in
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport layer that schedules every request through a per-host token bucket.
+    Handles Retry-After / X-RateLimit-* headers and retries throttled or transient
+    failures with jittered exponential backoff. Wraps any inner transport, so it can
+    be exercised against httpx.MockTransport without touching the network.
+
+    Hosts that meter separate budgets (GitHub: 'search' vs 'core') name them in
+    X-RateLimit-Resource. The transport learns which resource each route (first path
+    segment) draws on and gives every resource its own bucket, so an exhausted search
+    budget does not block README fetches. Hosts without a RATE_LIMITS entry share a single
+    'external' bucket, so scraping arbitrary links never grows the bucket table.
+    """
+
+    def __init__(self, transport=None, limits=None, retry=None, seed=None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._limits = limits or RATE_LIMITS
+        self._retry = {**RETRY_CONFIG, **(retry or {})}
+        self._random = random.Random(seed)
+        self._buckets = {}
+        self._resources = {}  # (host, route) -> X-RateLimit-Resource seen in its responses
+
+    def bucket(self, host, resource=None):
+        host = host if host_label(host, self._limits) != OTHER_HOST else EXTERNAL_BUCKET
+        key = f"{host}:{resource}" if resource and host != EXTERNAL_BUCKET else host
+        if key not in self._buckets:
+            settings = self._limits.get(host) or self._limits.get('default', {'rate': 5.0, 'burst': 10})
+            self._buckets[key] = TokenBucket(settings['rate'], settings['burst'])
+        return self._buckets[key]
+
+    @staticmethod
+    def _route(request):
+        return request.url.path.strip('/').split('/', 1)[0]
+
+    def _bucket_for(self, request):
+        host = request.url.host
+        return self.bucket(host, self._resources.get((host, self._route(request))))
+
+    def budget(self):
+        """Returns the last server-reported budget for every host (or host:resource) seen so far."""
+        return {
+            host: {
+                'limit': b.limit,
+                'remaining': b.remaining,
+                'reset_at': b.reset_at,
+                'blocked_for': round(b.blocked_for(), 1)
+            }
+            for host, b in self._buckets.items()
+        }
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff."""
+        ceiling = min(self._retry['max_delay'], self._retry['base_delay'] * (2 ** attempt))
+        return self._random.uniform(0, ceiling)
+
+    @staticmethod
+    def _is_rate_limited(response, retry_after):
+        if response.status_code == 429:
+            return True
+        # GitHub signals an exhausted budget / secondary limit with 403
+        return response.status_code == 403 and (
+            retry_after is not None or response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+
+    @staticmethod
+    def _throttled_response(request, wait):
+        return httpx.Response(
+            429,
+            headers={'Retry-After': str(int(wait) + 1), 'X-Throttled-Locally': '1'},
+            request=request
+        )
+
+    async def handle_async_request(self, request):
+        host = request.url.host
+        label = host_label(host, self._limits)
+        priority = request.extensions.get('priority', PRIORITY_PRIMARY)
+        max_retries, max_delay = self._retry['max_retries'], self._retry['max_delay']
+        if priority >= PRIORITY_DEEP and label == OTHER_HOST:
+            # A dead article link is not worth a backoff series; the collector falls back to the listing text
+            max_retries = 0
+
+        for attempt in range(max_retries + 1):
+            bucket = self._bucket_for(request)
+            # Fail fast when the host is blocked for longer than we are willing to wait
+            wait = bucket.blocked_for()
+            if wait > max_delay:
+                metrics.inc('http_throttled_total', host=label)
+                return self._throttled_response(request, wait)
+
+            with metrics.timer('rate_limit_wait_seconds', host=label):
+                await bucket.acquire(priority)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError:
+                if attempt >= max_retries:
+                    raise
+                metrics.inc('http_retries_total', host=label, reason='transport_error')
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            resource = response.headers.get('X-RateLimit-Resource')
+            if resource and label != OTHER_HOST:
+                self._resources[(host, self._route(request))] = resource
+                bucket = self.bucket(host, resource)
+            bucket.observe(response.headers)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            rate_limited = self._is_rate_limited(response, retry_after)
+
+            if rate_limited:
+                if retry_after is None and bucket.blocked_for() > 0:
+                    retry_after = bucket.blocked_for()
+                if retry_after is not None:
+                    bucket.block(retry_after)
+            elif response.status_code not in RETRYABLE_STATUSES:
+                return response
+
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            if attempt >= max_retries or delay > max_delay:
+                return response
+
+            metrics.inc('http_retries_total', host=label, reason=str(response.status_code))
+            await response.aclose()
+            await asyncio.sleep(delay + self._random.uniform(0, self._retry['base_delay']))
+
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -0,0 +1,115 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import httpx
+from config import CASSETTE_DIR, REPLAY_LATENCY_SECONDS, REPLAY_JITTER_SECONDS
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+MODE_AUTO = 'auto'
+
+# The stored body is already decoded, so transfer-level headers must not be replayed
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def request_key(request):
+    """Stable cassette key: method plus URL with query parameters in sorted order."""
+    url = request.url.copy_with(params=sorted(request.url.params.multi_items()))
+    return hashlib.sha256(f"{request.method} {url}".encode('utf-8')).hexdigest()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    Records real responses to a cassette store and replays them offline.
+    Cassettes are one JSON file per request under <cassette_dir>/<host>/<key>.json.
+    Replay adds configurable latency and jitter so concurrency changes stay measurable.
+    """
+
+    def __init__(self, mode=MODE_REPLAY, cassette_dir=CASSETTE_DIR, transport=None,
+                 latency=REPLAY_LATENCY_SECONDS, jitter=REPLAY_JITTER_SECONDS, seed=None, strict=False):
+        if mode not in (MODE_RECORD, MODE_REPLAY, MODE_AUTO):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.mode = mode
+        self.cassette_dir = cassette_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.strict = strict
+        self._transport = transport or (httpx.AsyncHTTPTransport() if mode != MODE_REPLAY else None)
+        self._random = random.Random(seed)
+        self.stats = {'recorded': 0, 'replayed': 0, 'missed': 0}
+
+    def _path(self, request):
+        return os.path.join(self.cassette_dir, request.url.host or '_', f"{request_key(request)}.json")
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, path, request, response):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        cassette = {
+            'request': {'method': request.method, 'url': str(request.url)},
+            'response': {
+                'status_code': response.status_code,
+                'headers': [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS],
+                'body': base64.b64encode(response.content).decode('ascii')
+            }
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cassette, f, indent=1)
+        os.replace(tmp_path, path)
+
+    async def _replay(self, request, cassette):
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.stats['replayed'] += 1
+        stored = cassette['response']
+        return httpx.Response(
+            stored['status_code'],
+            headers=stored['headers'],
+            content=base64.b64decode(stored['body']),
+            request=request
+        )
+
+    async def _record(self, request, path):
+        response = await self._transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        self._save(path, request, response)
+        self.stats['recorded'] += 1
+        return httpx.Response(
+            response.status_code,
+            headers=[(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS],
+            content=response.content,
+            request=request
+        )
+
+    async def handle_async_request(self, request):
+        path = self._path(request)
+        if self.mode == MODE_RECORD:
+            return await self._record(request, path)
+
+        cassette = self._load(path)
+        if cassette is not None:
+            return await self._replay(request, cassette)
+        if self.mode == MODE_AUTO:
+            return await self._record(request, path)
+
+        self.stats['missed'] += 1
+        if self.strict:
+            raise httpx.ConnectError(f"No cassette recorded for {request.method} {request.url}", request=request)
+        return httpx.Response(404, headers={'X-Cassette-Miss': '1'}, request=request)
+
+    async def aclose(self):
+        if self._transport is not None:
+            await self._transport.aclose()
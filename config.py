@@ -1,4 +1,5 @@
 # config.py
+import os
 
 # --- Noise Filtering Keywords (The Gatekeeper) ---
 # Used strictly to verify if a post is generally related to the AI domain before ingestion.
@@ -18,4 +19,150 @@ COLLECTORS_CONFIG = {
     'max_items': 100
 }
 
-MAX_POSTS_PER_PLATFORM = 50
\ No newline at end of file
+MAX_POSTS_PER_PLATFORM = 50
+
+# --- HTTP Rate Limiting ---
+# Per-host token buckets: 'rate' is sustained requests/second, 'burst' is the bucket capacity.
+# Server-reported X-RateLimit-* / Retry-After headers tighten these at runtime.
+RATE_LIMITS = {
+    'api.github.com': {'rate': 0.5, 'burst': 5},
+    'hacker-news.firebaseio.com': {'rate': 20.0, 'burst': 20},
+    'mastodon.social': {'rate': 1.0, 'burst': 10},
+    'dev.to': {'rate': 1.0, 'burst': 5},
+    'default': {'rate': 5.0, 'burst': 10}
+}
+
+# Retry policy for throttled (429 / rate-limited 403) and transient (5xx, network) failures.
+RETRY_CONFIG = {
+    'max_retries': 3,
+    'base_delay': 1.0,   # seconds, doubled on every attempt
+    'max_delay': 60.0    # longer server-imposed waits fail fast instead of stalling the cycle
+}
+
+# --- Adaptive Polling ---
+# Each platform is polled by its own job. The interval tracks the observed rate of new
+# items (target_new_items per poll) and is clamped to [min_minutes, max_minutes].
+POLLING_CONFIG = {
+    'GitHub': {'initial_minutes': 90, 'min_minutes': 30, 'max_minutes': 360},
+    'Hacker News': {'initial_minutes': 30, 'min_minutes': 10, 'max_minutes': 180},
+    'Mastodon': {'initial_minutes': 15, 'min_minutes': 5, 'max_minutes': 120},
+    'Dev.to': {'initial_minutes': 60, 'min_minutes': 20, 'max_minutes': 240},
+    'default': {'initial_minutes': 60, 'min_minutes': 15, 'max_minutes': 240}
+}
+POLLING_TARGET_NEW_ITEMS = 10
+POLLING_SMOOTHING = 0.5  # EWMA weight of the latest observed arrival rate
+
+# Downstream jobs are debounced so a burst of collector runs triggers one rescore/rebuild.
+RESCORE_DELAY_SECONDS = 30
+GRAPH_REBUILD_DELAY_SECONDS = 60
+GRAPH_SNAPSHOT_MAX_AGE_MINUTES = 180
+
+# --- Score History ---
+# Every poll appends (post, cycle_time, raw_score); old snapshots are rolled up to keep the log narrow.
+SCORE_HISTORY_CONFIG = {
+    'raw_hours': 48,           # keep every snapshot this recent
+    'hourly_days': 30,         # then one snapshot per post per hour, afterwards one per day
+    'max_days': 365,           # snapshots older than this are dropped
+    'rollup_interval_hours': 6
+}
+
+# --- Embeddings ---
+# Every stored vector is tagged with (model, version); only vectors with the current tag are compared.
+# Bump EMBEDDING_VERSION when the text fed to the model changes (cleaning, title/content mix),
+# then run `python cli.py re-embed` to backfill.
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_VERSION = 1
+BACKFILL_CONFIG = {
+    'chunk_size': 1000,     # rows read, encoded and committed per checkpoint
+    'batch_size': 64,       # encoder batch size
+    'workers': None         # encoder processes; None uses every CPU core, 1 encodes in-process
+}
+
+# --- Analytics Snapshot ---
+# Parquet copy of unified_posts published by its own scheduler job, read by the dashboard and notebooks.
+EMBEDDING_DIM = 384
+ANALYTICS_SNAPSHOT_CHUNK_SIZE = 5000
+ANALYTICS_SNAPSHOT_INTERVAL_MINUTES = 15
+# Versions kept on disk (the live one included), so slow readers never lose their files
+ANALYTICS_SNAPSHOT_KEEP_VERSIONS = 3
+
+# --- Retention ---
+# Rows older than hot_days move to the cold tier (content zlib-compressed into content_blob).
+# With embedding_only_after_days set, even older rows keep only title, scores, keywords and embedding.
+RETENTION_CONFIG = {
+    'hot_days': 14,
+    'embedding_only_after_days': None,
+    'batch_size': 500,
+    'vacuum_pages': 2000,      # pages released per incremental VACUUM step
+    'interval_hours': 12
+}
+
+# --- Topic Clustering ---
+# Streaming centroid clustering over post embeddings (cosine similarity on unit vectors).
+# New posts join the nearest topic or open a new one; a periodic pass merges and splits topics.
+TOPIC_CONFIG = {
+    'assign_threshold': 0.55,   # below this a post starts a new topic (while under max_topics)
+    'max_topics': 200,
+    'max_weight': 500,          # caps the running-mean weight so centroids keep following drift
+    'merge_threshold': 0.85,    # centroids this similar are merged
+    'split_min_size': 60,
+    'split_cohesion': 0.45,     # topics whose members are less similar than this on average are split
+    'split_sample': 2000,       # member embeddings sampled to fit the split
+    'prune_min_size': 3,        # topics smaller than this that saw no new post for
+    'prune_after_days': 3,      # this long are dissolved, freeing slots under max_topics
+    'interval_hours': 6
+}
+
+# --- HTTP Record / Replay ---
+# 'live' hits the real APIs, 'record' also stores every response as a cassette,
+# 'replay' serves cassettes only (offline, deterministic), 'auto' replays and records misses.
+HTTP_MODE = os.getenv('TREND_HTTP_MODE', 'live')
+CASSETTE_DIR = os.getenv('TREND_CASSETTE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cassettes'))
+REPLAY_LATENCY_SECONDS = float(os.getenv('TREND_REPLAY_LATENCY', '0.0'))
+REPLAY_JITTER_SECONDS = float(os.getenv('TREND_REPLAY_JITTER', '0.0'))
+
+# --- Telemetry ---
+# Per-stage timers/counters; a JSON snapshot is written per cycle and Prometheus text is served locally.
+METRICS_DIR = os.getenv('TREND_METRICS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'metrics'))
+METRICS_PORT = int(os.getenv('TREND_METRICS_PORT', '9108'))  # 0 disables the HTTP endpoint
+METRICS_KEEP_CYCLES = 500  # per-cycle JSON files kept across runs (oldest are deleted)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# --- Profiling ---
+# TREND_PROFILE=cpu|mem|all (or 1) wraps cycles, graph builds and dashboard renders with
+# cProfile + stack sampling and/or tracemalloc. Unset means the wrappers are never installed.
+# The switch is read when functions are decorated, so CLIs may set it after importing config.
+PROFILE_DIR = os.getenv('TREND_PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROFILE_KEEP_RUNS = 10
+PROFILE_KEEP_SESSIONS = 50      # per run (a Streamlit process profiles every rerun)
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples for the collapsed-stack output
+
+# --- AI Briefings ---
+# Generated analyst briefings are cached in SQLite, keyed by the post pair and PROMPT_VERSION
+# (ui/briefing.py), and pre-generated for the top cross-platform bridges after each graph rebuild.
+# TREND_LLM selects the client: 'gemini' (needs GEMINI_KEY), 'stub' (offline canned text) or 'off'.
+LLM_PROVIDER = os.getenv('TREND_LLM', 'gemini')
+BRIEFING_CONFIG = {
+    'models': ['models/gemini-flash-latest', 'models/gemini-2.5-flash'],  # tried in order
+    'requests_per_minute': 10,
+    'burst': 2,
+    'max_wait_seconds': 15,     # an interactive request never queues longer than this
+    'pregenerate_top': 5        # bridges warmed by the scheduler after every graph rebuild
+}
+
+# --- Work Queue ---
+# TREND_INGEST=queue turns the scheduler into a dispatcher: it enqueues 'fetch' jobs and any number
+# of `python cli.py worker` processes drain them; each fetch enqueues a 'process' job (NLP,
+# embeddings, storage). Jobs are leased, retried with exponential backoff and dead-lettered.
+INGEST_MODE = os.getenv('TREND_INGEST', 'inline')
+QUEUE_CONFIG = {
+    'db_path': os.getenv('TREND_QUEUE_DB'),  # None keeps the queue in the trends database
+    'lease_seconds': 300,         # a job whose worker stops heartbeating is re-claimed after this
+    'max_attempts': 4,            # failures after this many claims move the job to the dead letter
+    'retry_base_seconds': 30,     # backoff: base * 2 ** (attempt - 1), capped below
+    'retry_max_seconds': 1800,
+    'poll_seconds': 2.0,          # idle worker sleep between claim attempts
+    'keep_done_days': 3
+}
+# How long a connection waits for another process's write lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
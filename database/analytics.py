@@ -0,0 +1,288 @@
+import os
+import shutil
+import sqlite3
+import json
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from config import EMBEDDING_DIM, ANALYTICS_SNAPSHOT_CHUNK_SIZE, ANALYTICS_SNAPSHOT_KEEP_VERSIONS
+from database.dates import to_day
+from database.retention import CONTENT_SQL, register_codecs
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "trends_project.db")
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "analytics_snapshot")
+
+# Month partitions keep the file count low; day filters still prune row groups on published_date
+PARTITION_COLUMNS = ['source_platform', 'published_month']
+# Pointer to the live version directory; swapped atomically on publish
+CURRENT_FILE = 'CURRENT.json'
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('source_platform', pa.string()),
+    ('external_id', pa.string()),
+    ('title', pa.string()),
+    ('content', pa.string()),
+    ('author', pa.string()),
+    ('url', pa.string()),
+    ('raw_score', pa.float64()),
+    ('trend_score', pa.float64()),
+    ('published_at', pa.string()),
+    ('collected_at', pa.string()),
+    ('published_date', pa.string()),
+    ('published_month', pa.string()),
+    ('keywords', pa.list_(pa.string())),
+    ('has_embedding', pa.bool_()),
+    ('embedding_model', pa.string()),   # "<model>@<version>"; only compare vectors with equal tags
+    ('embedding', pa.list_(pa.float32(), EMBEDDING_DIM))
+])
+
+# Everything the dashboard renders; embeddings are only read when explicitly projected
+DASHBOARD_COLUMNS = [
+    'id', 'source_platform', 'title', 'content', 'author', 'url',
+    'raw_score', 'trend_score', 'published_at', 'collected_at'
+]
+
+
+def _embedding_arrays(raw_embeddings):
+    """
+    Packs JSON embeddings into a fixed-size-list column.
+    Parquet cannot round-trip null fixed-size lists, so missing or mis-sized vectors
+    are stored as zeros and flagged through the has_embedding column instead.
+    """
+    flat = np.zeros((len(raw_embeddings), EMBEDDING_DIM), dtype=np.float32)
+    valid = np.zeros(len(raw_embeddings), dtype=bool)
+    for i, raw in enumerate(raw_embeddings):
+        try:
+            vector = json.loads(raw) if raw else None
+        except (TypeError, ValueError):
+            vector = None
+        if vector is not None and len(vector) == EMBEDDING_DIM:
+            flat[i] = vector
+            valid[i] = True
+    return pa.array(valid), pa.FixedSizeListArray.from_arrays(pa.array(flat.ravel()), EMBEDDING_DIM)
+
+
+def _keyword_lists(raw_keywords):
+    lists = []
+    for raw in raw_keywords:
+        try:
+            lists.append(json.loads(raw) if raw else [])
+        except (TypeError, ValueError):
+            lists.append([])
+    return lists
+
+
+def _iter_batches(db_path, chunk_size, platform):
+    """Streams one platform's rows of unified_posts in id order as Arrow record batches."""
+    last_id = 0
+    with sqlite3.connect(db_path) as conn:
+        register_codecs(conn)
+        while True:
+            rows = conn.execute(f'''
+                SELECT id, source_platform, external_id, title, {CONTENT_SQL}, author, url,
+                       raw_score, trend_score, published_at, collected_at, keywords, embedding,
+                       embedding_model || '@' || embedding_version
+                FROM unified_posts WHERE id > ? AND source_platform IS ? ORDER BY id LIMIT ?
+            ''', (last_id, platform, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            cols = list(zip(*rows))
+            has_embedding, embeddings = _embedding_arrays(cols[12])
+            days = [to_day(p, c) or 'unknown' for p, c in zip(cols[9], cols[10])]
+            yield pa.RecordBatch.from_arrays([
+                pa.array(cols[0], pa.int64()),
+                pa.array(cols[1], pa.string()),
+                pa.array([str(v) if v is not None else None for v in cols[2]], pa.string()),
+                pa.array(cols[3], pa.string()),
+                pa.array(cols[4], pa.string()),
+                pa.array(cols[5], pa.string()),
+                pa.array(cols[6], pa.string()),
+                pa.array(cols[7], pa.float64()),
+                pa.array(cols[8], pa.float64()),
+                pa.array([str(v) if v is not None else None for v in cols[9]], pa.string()),
+                pa.array(cols[10], pa.string()),
+                pa.array(days, pa.string()),
+                pa.array([day[:7] for day in days], pa.string()),
+                pa.array(_keyword_lists(cols[11]), pa.list_(pa.string())),
+                has_embedding,
+                pa.array(cols[13], pa.string()),
+                embeddings
+            ], schema=SNAPSHOT_SCHEMA)
+
+
+def _fingerprints(db_path):
+    """
+    Cheap per-platform change marker: new rows, rescoring, tiering and re-embedding all move it.
+    Returns {platform: [...]}; platforms whose marker is unchanged are not rewritten.
+    """
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute('''
+            SELECT source_platform, COUNT(*), MAX(id), TOTAL(trend_score), COUNT(embedding),
+                   TOTAL(embedding_version), SUM(storage_tier = 'cold'), SUM(storage_tier = 'embedding_only')
+            FROM unified_posts GROUP BY source_platform
+        ''').fetchall()
+    return {row[0]: list(row[1:]) for row in rows}
+
+
+def _read_current(out_dir):
+    try:
+        with open(os.path.join(out_dir, CURRENT_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _link_files(src_dir, dst_dir, files):
+    for name in files:
+        target = os.path.join(dst_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            # Unchanged partitions are shared between versions instead of rewritten
+            os.link(os.path.join(src_dir, name), target)
+        except OSError:
+            shutil.copy2(os.path.join(src_dir, name), target)
+
+
+def _write_platform(db_path, version_dir, platform, index, chunk_size):
+    written = []
+    ds.write_dataset(
+        _iter_batches(db_path, chunk_size, platform),
+        version_dir,
+        schema=SNAPSHOT_SCHEMA,
+        format='parquet',
+        partitioning=PARTITION_COLUMNS,
+        partitioning_flavor='hive',
+        basename_template=f"part-{index}-{{i}}.parquet",
+        min_rows_per_group=chunk_size,
+        existing_data_behavior='overwrite_or_ignore',
+        file_visitor=lambda f: written.append(os.path.relpath(f.path, version_dir))
+    )
+    return written
+
+
+def _retire_versions(out_dir, current, keep):
+    """Drops all but the newest `keep` versions; readers still on a retired one keep their files."""
+    versions = sorted(d for d in os.listdir(out_dir) if d.startswith('v-') and d != current)
+    for name in versions[:max(len(versions) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    # Datasets published before versioning lived directly in out_dir
+    for name in os.listdir(out_dir):
+        if name.startswith('source_platform='):
+            shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+
+
+def publish_snapshot(db_path=DB_PATH, out_dir=None, chunk_size=ANALYTICS_SNAPSHOT_CHUNK_SIZE, force=False,
+                     keep=ANALYTICS_SNAPSHOT_KEEP_VERSIONS):
+    """
+    Publishes unified_posts as a Hive-partitioned Parquet dataset (platform / published month).
+    By default the snapshot lives next to its database file. Every publish writes a new version
+    directory and then atomically repoints CURRENT.json at it, so readers never see a partial or
+    missing copy; retired versions are kept (`keep` in total) for readers still using them.
+    Only platforms whose rows changed since the last publish are re-encoded, the others are
+    hard-linked from the previous version; force=True rewrites everything.
+    Returns the dataset root, or None when the database does not exist.
+    """
+    if not os.path.exists(db_path):
+        return None
+    out_dir = out_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), os.path.basename(SNAPSHOT_DIR))
+    os.makedirs(out_dir, exist_ok=True)
+
+    current = None if force else _read_current(out_dir)
+    previous = {entry['platform']: entry for entry in current['platforms']} if current else {}
+    fingerprints = _fingerprints(db_path)
+    if current and {p: e['fingerprint'] for p, e in previous.items()} == fingerprints:
+        return out_dir
+
+    version = f"v-{time.time_ns()}"
+    version_dir = os.path.join(out_dir, version)
+    os.makedirs(version_dir)
+    platforms = []
+    for index, (platform, fingerprint) in enumerate(sorted(fingerprints.items(), key=lambda x: str(x[0]))):
+        entry = previous.get(platform)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            _link_files(os.path.join(out_dir, current['version']), version_dir, entry['files'])
+            files = entry['files']
+        else:
+            files = _write_platform(db_path, version_dir, platform, index, chunk_size)
+        platforms.append({'platform': platform, 'fingerprint': fingerprint, 'files': files})
+
+    pointer = os.path.join(out_dir, f".{CURRENT_FILE}.{version}")
+    with open(pointer, 'w') as f:
+        json.dump({'version': version, 'published_at': time.time(), 'platforms': platforms}, f)
+    os.replace(pointer, os.path.join(out_dir, CURRENT_FILE))
+    _retire_versions(out_dir, version, keep)
+    return out_dir
+
+
+def open_snapshot(path=SNAPSHOT_DIR):
+    """Opens the live version of the published dataset, or returns None if nothing has been published yet."""
+    current = _read_current(path)
+    if current is None:
+        return None
+    return ds.dataset(os.path.join(path, current['version']), format='parquet', partitioning='hive',
+                      schema=SNAPSHOT_SCHEMA)
+
+
+def load_posts(columns=None, platforms=None, since_day=None, until_day=None, where=None, path=SNAPSHOT_DIR):
+    """
+    Reads the snapshot into pandas with column projection and predicate pushdown.
+    Platform and day filters prune whole partitions; an extra pyarrow expression in
+    `where` (e.g. ds.field('trend_score') > 80) is pushed down to the Parquet row groups.
+
+    Notebook usage:
+        load_posts(['title', 'trend_score'], platforms=['GitHub'], since_day='2026-01-01')
+    """
+    dataset = open_snapshot(path)
+    if dataset is None:
+        return None
+
+    expression = where
+    conditions = []
+    if platforms:
+        conditions.append(ds.field('source_platform').isin(list(platforms)))
+    # The month bound prunes partitions, the day bound the row groups inside them
+    if since_day:
+        conditions.append((ds.field('published_month') >= since_day[:7]) & (ds.field('published_date') >= since_day))
+    if until_day:
+        conditions.append((ds.field('published_month') <= until_day[:7]) & (ds.field('published_date') <= until_day))
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def load_balanced_trends(per_platform=25, db_path=DB_PATH, path=SNAPSHOT_DIR):
+    """Top posts per platform for the dashboard: read from the snapshot, falling back to SQLite."""
+    ranking = load_posts(columns=['id', 'source_platform', 'published_month', 'trend_score'], path=path)
+    if ranking is not None:
+        # Rank on narrow columns, then read full rows (content included) for the winners only;
+        # filtering on their partitions skips every file that holds none of them
+        top = ranking.sort_values('trend_score', ascending=False).groupby('source_platform', sort=False).head(per_platform)
+        # Typed arrays: an empty snapshot must still bind against the schema
+        where = ds.field('id').isin(pa.array(top['id'].tolist(), pa.int64()))
+        if top['published_month'].notna().all():
+            where = where & ds.field('published_month').isin(pa.array(top['published_month'].unique().tolist(),
+                                                                      pa.string()))
+        df = load_posts(columns=DASHBOARD_COLUMNS, platforms=top['source_platform'].unique().tolist(),
+                        where=where, path=path)
+        df = df.sort_values('trend_score', ascending=False).reset_index(drop=True)
+    elif not os.path.exists(db_path):
+        return pd.DataFrame()
+    else:
+        columns = ', '.join(CONTENT_SQL + ' AS content' if c == 'content' else c for c in DASHBOARD_COLUMNS)
+        with sqlite3.connect(db_path) as conn:
+            register_codecs(conn)
+            df = pd.read_sql_query(f"""
+                SELECT {columns} FROM (
+                    SELECT *, ROW_NUMBER() OVER(PARTITION BY source_platform ORDER BY trend_score DESC) as rn
+                    FROM unified_posts
+                ) WHERE rn <= ? ORDER BY trend_score DESC
+            """, conn, params=(per_platform,))
+    # Embedding-only rows have no content left to preview
+    df['content'] = df['content'].fillna('')
+    return df
@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+import numpy as np
+from config import EMBEDDING_MODEL, EMBEDDING_VERSION, BACKFILL_CONFIG
+from database.keywords import KeywordIndex
+from database.manager import embedding_text
+from database.retention import CONTENT_SQL, TIER_EMBEDDING_ONLY, register_codecs
+from database.topics import TopicModel
+from telemetry.metrics import metrics
+
+
+class EmbeddingBackfill:
+    """
+    Recomputes stored embeddings (and optionally keywords) without re-scraping.
+    Walks unified_posts in id-ordered chunks, encodes each chunk on a multi-process
+    pool and commits the vectors together with a checkpoint, so an interrupted run
+    resumes after the last committed chunk. Every updated row is tagged with the
+    model name and version it was encoded with, and a run that encoded rows
+    re-clusters the topics of that model/version from the new vectors.
+    """
+
+    def __init__(self, db_path, model_name=EMBEDDING_MODEL, version=EMBEDDING_VERSION,
+                 encoder=None, keywords=False, force=False, config=None):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.version = version
+        self.encoder = encoder
+        self.keywords = keywords
+        # Re-extracting keywords touches every row, so it cannot skip rows that are already tagged
+        self.force = force or keywords
+        self.config = {**BACKFILL_CONFIG, **(config or {})}
+        self._pool = None
+
+    @staticmethod
+    def init_schema(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                job TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                processed INTEGER NOT NULL,
+                started_at TEXT,
+                updated_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+
+    @property
+    def job(self):
+        return f"embed:{self.model_name}@{self.version}" + (':keywords' if self.keywords else '')
+
+    def _filter(self):
+        """WHERE clause (and params) for rows that still need this job."""
+        # Rows stripped to their embedding by retention have no text left to encode
+        clause, params = 'storage_tier IS NOT ?', [TIER_EMBEDDING_ONLY]
+        if not self.force:
+            clause += ' AND NOT (embedding_model IS ? AND embedding_version IS ?)'
+            params += [self.model_name, self.version]
+        return clause, params
+
+    def _load_checkpoint(self, conn, restart):
+        """Returns (last_id, processed, finished) of this job, starting a fresh checkpoint if needed."""
+        row = conn.execute('SELECT last_id, processed, finished_at FROM backfill_checkpoints WHERE job = ?',
+                           (self.job,)).fetchone()
+        if row is None or restart:
+            now = datetime.now().isoformat()
+            conn.execute('''
+                INSERT OR REPLACE INTO backfill_checkpoints (job, last_id, processed, started_at, updated_at, finished_at)
+                VALUES (?, 0, 0, ?, ?, NULL)
+            ''', (self.job, now, now))
+            conn.commit()
+            return 0, 0, False
+        if row[2] is not None and not self.force:
+            # A finished job only picks up rows that lost (or never had) its tag; the filter skips the rest
+            return 0, row[1], True
+        return row[0], row[1], row[2] is not None
+
+    def _get_encoder(self):
+        if self.encoder is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"🧠 Loading embedding model {self.model_name}...")
+            self.encoder = SentenceTransformer(self.model_name)
+        return self.encoder
+
+    def _start_pool(self, encoder):
+        workers = self.config['workers'] or os.cpu_count() or 1
+        if workers > 1 and hasattr(encoder, 'start_multi_process_pool'):
+            self._pool = encoder.start_multi_process_pool(target_devices=['cpu'] * workers)
+            print(f"🧵 Encoding on {workers} worker processes")
+
+    def _stop_pool(self):
+        if self._pool is not None:
+            self.encoder.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def _encode(self, texts):
+        encoder = self._get_encoder()
+        with metrics.timer('stage_seconds', stage='backfill_encode'):
+            if self._pool is not None:
+                return encoder.encode_multi_process(texts, self._pool, batch_size=self.config['batch_size'])
+            return encoder.encode(texts, batch_size=self.config['batch_size'])
+
+    @staticmethod
+    def _extract_keywords(rows):
+        # KeyBERT only loads when keywords are requested
+        from collectors.base import BaseCollector
+        with metrics.timer('stage_seconds', stage='backfill_keywords'):
+            return [BaseCollector.extract_keywords(f"{row[1] or ''} {row[2] or ''}") for row in rows]
+
+    def pending(self):
+        """Rows this job would still (re)process from scratch."""
+        clause, params = self._filter()
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM unified_posts WHERE {clause}', params).fetchone()[0]
+
+    def run(self, restart=False, limit=None):
+        """
+        Processes rows until none are left (or `limit` rows were written this run).
+        Returns {'processed', 'last_id', 'finished', 'topics', 'already_complete'}; rerunning after an
+        interruption continues. 'topics' counts the posts clustered once the run finished (0 while paused);
+        rerunning a finished job encodes only rows added since and skips the re-clustering when there
+        were none ('already_complete').
+        """
+        clause, params = self._filter()
+        chunk_size = self.config['chunk_size']
+        conn = register_codecs(sqlite3.connect(self.db_path))
+        try:
+            self.init_schema(conn.cursor())
+            last_id, processed, was_finished = self._load_checkpoint(conn, restart)
+            total = processed + conn.execute(
+                f'SELECT COUNT(*) FROM unified_posts WHERE id > ? AND {clause}', [last_id] + params).fetchone()[0]
+            if last_id and not was_finished:
+                print(f"↩️ Resuming {self.job} after id {last_id} ({processed:,} rows already done)")
+
+            self._start_pool(self._get_encoder())
+            started, done_this_run = time.perf_counter(), 0
+            while limit is None or done_this_run < limit:
+                size = chunk_size if limit is None else min(chunk_size, limit - done_this_run)
+                rows = conn.execute(f'''
+                    SELECT id, title, {CONTENT_SQL}, source_platform, published_at, collected_at FROM unified_posts
+                    WHERE id > ? AND {clause} ORDER BY id LIMIT ?
+                ''', [last_id] + params + [size]).fetchall()
+                if not rows:
+                    if was_finished and not done_this_run:
+                        return {'processed': processed, 'last_id': last_id, 'finished': True, 'topics': 0,
+                                'already_complete': True}
+                    conn.execute('UPDATE backfill_checkpoints SET finished_at = ? WHERE job = ?',
+                                 (datetime.now().isoformat(), self.job))
+                    conn.commit()
+                    # New vectors are only comparable with each other: cluster them under their own tag
+                    topics = TopicModel(self.db_path, (self.model_name, self.version)).rebuild() if processed else 0
+                    return {'processed': processed, 'last_id': last_id, 'finished': True, 'topics': topics,
+                            'already_complete': not processed}
+
+                vectors = self._encode([embedding_text(row[1], row[2]) for row in rows])
+                keywords = self._extract_keywords(rows) if self.keywords else None
+
+                # Vectors and checkpoint land in one transaction: a crash never skips or half-writes a chunk
+                with metrics.timer('stage_seconds', stage='backfill_write'):
+                    conn.executemany(
+                        'UPDATE unified_posts SET embedding = ?, embedding_model = ?, embedding_version = ? WHERE id = ?',
+                        [(json.dumps(np.asarray(vector).tolist()), self.model_name, self.version, row[0])
+                         for row, vector in zip(rows, vectors)]
+                    )
+                    if keywords is not None:
+                        conn.executemany('UPDATE unified_posts SET keywords = ? WHERE id = ?',
+                                         [(json.dumps(kw), row[0]) for row, kw in zip(rows, keywords)])
+                        KeywordIndex.reindex(conn.cursor(), [(row[0], row[3], row[4], row[5], kw)
+                                                             for row, kw in zip(rows, keywords)])
+                    last_id, processed = rows[-1][0], processed + len(rows)
+                    # Until this pass finishes, the rows it encoded still need clustering
+                    conn.execute('''
+                        UPDATE backfill_checkpoints SET last_id = ?, processed = ?, updated_at = ?, finished_at = NULL
+                        WHERE job = ?
+                    ''', (last_id, processed, datetime.now().isoformat(), self.job))
+                    conn.commit()
+
+                was_finished = False
+                done_this_run += len(rows)
+                metrics.inc('backfill_rows_total', len(rows), job=self.job)
+                rate = done_this_run / max(time.perf_counter() - started, 1e-6)
+                print(f"🧬 {self.job}: {processed:,}/{total:,} rows ({rate:.0f} rows/s)")
+            return {'processed': processed, 'last_id': last_id, 'finished': False, 'topics': 0,
+                    'already_complete': False}
+        finally:
+            self._stop_pool()
+            conn.close()
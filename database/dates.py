@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    """
+    Normalizes the mixed published_at formats stored by the collectors into an aware datetime.
+    Hacker News stores Unix epoch seconds, the other platforms ISO-8601 strings.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        pass
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def to_day(value, fallback=None):
+    """Returns the 'YYYY-MM-DD' day of a timestamp, trying the fallback timestamp if unparseable."""
+    parsed = parse_timestamp(value) or parse_timestamp(fallback)
+    return parsed.strftime('%Y-%m-%d') if parsed else None
+
+
+def to_utc_iso(value, fallback=None):
+    """UTC ISO-8601 form of a timestamp (or the fallback), so stored values compare as strings."""
+    parsed = parse_timestamp(value) or parse_timestamp(fallback)
+    return parsed.astimezone(timezone.utc).isoformat() if parsed else None
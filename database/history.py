@@ -0,0 +1,136 @@
+import sqlite3
+import time
+import numpy as np
+from config import SCORE_HISTORY_CONFIG
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class ScoreHistory:
+    """
+    Append-only log of raw scores per post and collection cycle.
+    Stored as a narrow WITHOUT ROWID table keyed by (post_id, cycle_time) so that
+    velocity queries are range reads over the index instead of scans of unified_posts.
+    """
+
+    def __init__(self, db_path, config=None):
+        self.db_path = db_path
+        self.config = {**SCORE_HISTORY_CONFIG, **(config or {})}
+
+    @staticmethod
+    def init_schema(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS score_snapshots (
+                post_id INTEGER NOT NULL,
+                cycle_time INTEGER NOT NULL,  -- Unix epoch seconds
+                raw_score REAL NOT NULL,
+                PRIMARY KEY (post_id, cycle_time)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_time ON score_snapshots(cycle_time)')
+
+    @staticmethod
+    def record(cursor, posts, cycle_time=None):
+        """Appends one snapshot per post, resolving post ids through the (platform, external_id) key."""
+        cycle_time = int(cycle_time if cycle_time is not None else time.time())
+        cursor.executemany('''
+            INSERT OR REPLACE INTO score_snapshots (post_id, cycle_time, raw_score)
+            SELECT id, ?, ? FROM unified_posts WHERE source_platform = ? AND external_id = ?
+        ''', [
+            (cycle_time, float(p.get('raw_score') or 0), p['source_platform'], p['external_id'])
+            for p in posts
+        ])
+
+    def rollup(self, now=None):
+        """
+        Downsamples old snapshots: keeps the last one per hour after raw_hours,
+        the last one per day after hourly_days, and drops everything past max_days.
+        Idempotent, so it is safe to run on any schedule.
+        """
+        now = int(now if now is not None else time.time())
+        hourly_cutoff = now - self.config['raw_hours'] * HOUR
+        daily_cutoff = now - self.config['hourly_days'] * DAY
+        drop_cutoff = now - self.config['max_days'] * DAY
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM score_snapshots WHERE cycle_time < ?', (drop_cutoff,))
+            dropped = cursor.rowcount
+            removed = 0
+            for cutoff, bucket in ((daily_cutoff, DAY), (hourly_cutoff, HOUR)):
+                cursor.execute('''
+                    DELETE FROM score_snapshots
+                    WHERE cycle_time < :cutoff
+                      AND (post_id, cycle_time) NOT IN (
+                          SELECT post_id, MAX(cycle_time) FROM score_snapshots
+                          WHERE cycle_time < :cutoff
+                          GROUP BY post_id, cycle_time / :bucket
+                      )
+                ''', {'cutoff': cutoff, 'bucket': bucket})
+                removed += cursor.rowcount
+            conn.commit()
+        return {'dropped': dropped, 'downsampled': removed}
+
+    def _load(self, since, platform=None):
+        """Reads (post_id, cycle_time, raw_score) ordered by post and time into numpy columns."""
+        query = 'SELECT s.post_id, s.cycle_time, s.raw_score FROM score_snapshots s'
+        params = [since]
+        if platform:
+            query += ' JOIN unified_posts p ON p.id = s.post_id WHERE s.cycle_time >= ? AND p.source_platform = ?'
+            params.append(platform)
+        else:
+            query += ' WHERE s.cycle_time >= ?'
+        query += ' ORDER BY s.post_id, s.cycle_time'
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return np.empty((0, 3))
+        return np.asarray(rows, dtype=np.float64)
+
+    def velocity(self, window_hours=24, platform=None, now=None):
+        """
+        Score change per hour over the window, one row per post with at least two snapshots.
+        Computed on whole columns: first/last snapshot per post via np.unique offsets.
+        """
+        import pandas as pd  # only the analytics views need it; keeps the ingest/CLI import path light
+
+        now = now if now is not None else time.time()
+        data = self._load(int(now - window_hours * HOUR), platform)
+        columns = ['post_id', 'first_score', 'last_score', 'hours', 'velocity']
+        if not len(data):
+            return pd.DataFrame(columns=columns)
+
+        post_ids, times, scores = data[:, 0], data[:, 1], data[:, 2]
+        unique_ids, first = np.unique(post_ids, return_index=True)
+        last = np.append(first[1:], len(post_ids)) - 1
+
+        hours = (times[last] - times[first]) / HOUR
+        delta = scores[last] - scores[first]
+        tracked = hours > 0
+        result = pd.DataFrame({
+            'post_id': unique_ids[tracked].astype(np.int64),
+            'first_score': scores[first][tracked],
+            'last_score': scores[last][tracked],
+            'hours': hours[tracked],
+            'velocity': delta[tracked] / hours[tracked]
+        }, columns=columns)
+        return result.sort_values('velocity', ascending=False, ignore_index=True)
+
+    def movers(self, window_hours=24, platform=None, limit=20, now=None):
+        """Fastest-rising posts over the window: velocity joined with the post fields the dashboard shows."""
+        velocity = self.velocity(window_hours, platform, now).head(limit)
+        if velocity.empty:
+            return velocity.assign(title=[], source_platform=[], url=[])
+
+        ids = velocity['post_id'].tolist()
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(f'''
+                SELECT id, title, source_platform, url FROM unified_posts
+                WHERE id IN ({', '.join('?' * len(ids))})
+            ''', ids).fetchall()
+        posts = {row[0]: row[1:] for row in rows}
+        fields = [posts.get(post_id, (None, None, None)) for post_id in ids]
+        return velocity.assign(title=[f[0] for f in fields], source_platform=[f[1] for f in fields],
+                               url=[f[2] for f in fields])
@@ -0,0 +1,213 @@
+import json
+import sqlite3
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from database.dates import to_utc_iso
+
+
+def _normalize(keywords):
+    """Lower-cased, de-duplicated keyphrases of one post."""
+    return sorted({k.strip().lower() for k in keywords or [] if k and k.strip()})
+
+
+class KeywordIndex:
+    """
+    Normalized copy of unified_posts.keywords: one post_keywords row per (post, keyphrase)
+    and a keyword_daily_counts rollup maintained incrementally on every insert.
+    Keyword trend queries read the rollup's primary key range instead of parsing JSON per row.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    @staticmethod
+    def init_schema(cursor):
+        """Creates the index tables; returns True when they are new and need a backfill."""
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_keywords'").fetchone()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_keywords (
+                post_id INTEGER NOT NULL,
+                keyword TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                published_at TEXT NOT NULL,  -- UTC ISO-8601
+                PRIMARY KEY (post_id, keyword)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_keywords_keyword ON post_keywords(keyword, published_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_keywords_published ON post_keywords(published_at)')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_daily_counts (
+                day TEXT NOT NULL,           -- 'YYYY-MM-DD' of published_at
+                keyword TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                posts INTEGER NOT NULL,
+                PRIMARY KEY (day, keyword, platform)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_keyword_daily_keyword ON keyword_daily_counts(keyword, day)')
+        return exists is None
+
+    def needs_backfill(self):
+        """True when the index is empty although stored posts carry keywords (a pre-index database)."""
+        with sqlite3.connect(self.db_path) as conn:
+            self.init_schema(conn.cursor())
+            return conn.execute('''
+                SELECT NOT EXISTS (SELECT 1 FROM post_keywords)
+                   AND EXISTS (SELECT 1 FROM unified_posts WHERE keywords IS NOT NULL AND keywords != '[]')
+            ''').fetchone()[0] == 1
+
+    @staticmethod
+    def record(cursor, entries):
+        """
+        Indexes newly stored posts and bumps their daily counts.
+        entries: (post_id, platform, published_at, collected_at, keywords) tuples.
+        """
+        rows = []
+        for post_id, platform, published_at, collected_at, keywords in entries:
+            published = to_utc_iso(published_at, collected_at)
+            if published is None:
+                continue
+            rows += [(post_id, keyword, platform, published) for keyword in _normalize(keywords)]
+        if not rows:
+            return 0
+
+        counts = Counter()
+        for row in rows:
+            cursor.execute('INSERT OR IGNORE INTO post_keywords (post_id, keyword, platform, published_at) '
+                           'VALUES (?, ?, ?, ?)', row)
+            # Only count pairs that were not indexed yet, so replays stay idempotent
+            if cursor.rowcount > 0:
+                counts[(row[3][:10], row[1], row[2])] += 1
+        cursor.executemany('''
+            INSERT INTO keyword_daily_counts (day, keyword, platform, posts) VALUES (?, ?, ?, ?)
+            ON CONFLICT (day, keyword, platform) DO UPDATE SET posts = posts + excluded.posts
+        ''', [(day, keyword, platform, n) for (day, keyword, platform), n in counts.items()])
+        return sum(counts.values())
+
+    @staticmethod
+    def forget(cursor, post_ids):
+        """Removes posts from the index and takes them out of the daily counts."""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join('?' * len(post_ids))
+        counts = cursor.execute(f'''
+            SELECT substr(published_at, 1, 10), keyword, platform, COUNT(*) FROM post_keywords
+            WHERE post_id IN ({placeholders}) GROUP BY 1, 2, 3
+        ''', post_ids).fetchall()
+        cursor.executemany('''
+            UPDATE keyword_daily_counts SET posts = posts - ? WHERE day = ? AND keyword = ? AND platform = ?
+        ''', [(n, day, keyword, platform) for day, keyword, platform, n in counts])
+        cursor.execute('DELETE FROM keyword_daily_counts WHERE posts <= 0')
+        cursor.execute(f'DELETE FROM post_keywords WHERE post_id IN ({placeholders})', post_ids)
+
+    @classmethod
+    def reindex(cls, cursor, entries):
+        """Replaces the indexed keywords of existing posts (e.g. after keywords were re-extracted)."""
+        entries = list(entries)
+        cls.forget(cursor, [entry[0] for entry in entries])
+        return cls.record(cursor, entries)
+
+    def rebuild(self, chunk_size=5000):
+        """Re-derives both tables from the JSON keywords column in id-ordered chunks."""
+        indexed, last_id = 0, 0
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self.init_schema(cursor)
+            cursor.execute('DELETE FROM post_keywords')
+            cursor.execute('DELETE FROM keyword_daily_counts')
+            while True:
+                rows = cursor.execute('''
+                    SELECT id, source_platform, published_at, collected_at, keywords FROM unified_posts
+                    WHERE id > ? ORDER BY id LIMIT ?
+                ''', (last_id, chunk_size)).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                entries = []
+                for post_id, platform, published_at, collected_at, raw in rows:
+                    try:
+                        keywords = json.loads(raw) if raw else []
+                    except (TypeError, ValueError):
+                        keywords = []
+                    entries.append((post_id, platform, published_at, collected_at, keywords))
+                indexed += self.record(cursor, entries)
+                conn.commit()
+        return indexed
+
+    @staticmethod
+    def _day(now, days_back):
+        return (now - timedelta(days=days_back)).strftime('%Y-%m-%d')
+
+    def rising_keywords(self, days=7, baseline_days=28, platform=None, limit=20, min_posts=3,
+                        smoothing=0.5, now=None):
+        """
+        Keyphrases whose daily post rate over the last `days` grew most against the
+        `baseline_days` before them. momentum = recent rate / (baseline rate + smoothing),
+        so brand-new keywords rank high without dividing by zero.
+        """
+        import pandas as pd
+
+        now = now or datetime.now(timezone.utc)
+        params = {
+            'recent_start': self._day(now, days - 1),
+            'baseline_start': self._day(now, days - 1 + baseline_days),
+            'days': days,
+            'baseline_days': baseline_days,
+            'smoothing': smoothing,
+            'min_posts': min_posts,
+            'limit': limit
+        }
+        platform_filter = ''
+        if platform:
+            platform_filter = 'AND platform = :platform'
+            params['platform'] = platform
+
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql_query(f'''
+                SELECT keyword, recent, baseline, platforms,
+                       (recent * 1.0 / :days) / (baseline * 1.0 / :baseline_days + :smoothing) AS momentum
+                FROM (
+                    SELECT keyword,
+                           SUM(CASE WHEN day >= :recent_start THEN posts ELSE 0 END) AS recent,
+                           SUM(CASE WHEN day < :recent_start THEN posts ELSE 0 END) AS baseline,
+                           COUNT(DISTINCT CASE WHEN day >= :recent_start THEN platform END) AS platforms
+                    FROM keyword_daily_counts
+                    WHERE day >= :baseline_start {platform_filter}
+                    GROUP BY keyword
+                )
+                WHERE recent >= :min_posts
+                ORDER BY momentum DESC, recent DESC
+                LIMIT :limit
+            ''', conn, params=params)
+
+    def keyword_series(self, keywords, days=30, platform=None, now=None):
+        """Daily post counts for the given keyphrases (long format: day, keyword, posts)."""
+        import pandas as pd
+
+        keywords = _normalize(keywords)
+        if not keywords:
+            return pd.DataFrame(columns=['day', 'keyword', 'posts'])
+        now = now or datetime.now(timezone.utc)
+        params = keywords + [self._day(now, days - 1)]
+        platform_filter = ''
+        if platform:
+            platform_filter = 'AND platform = ?'
+            params.append(platform)
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql_query(f'''
+                SELECT day, keyword, SUM(posts) AS posts FROM keyword_daily_counts
+                WHERE keyword IN ({', '.join('?' * len(keywords))}) AND day >= ? {platform_filter}
+                GROUP BY day, keyword ORDER BY day
+            ''', conn, params=params)
+
+    def posts_with_keyword(self, keyword, days=7, limit=20, now=None):
+        """Ids of the most recently published posts tagged with a keyphrase."""
+        now = now or datetime.now(timezone.utc)
+        since = (now - timedelta(days=days)).astimezone(timezone.utc).isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            return [row[0] for row in conn.execute('''
+                SELECT post_id FROM post_keywords WHERE keyword = ? AND published_at >= ?
+                ORDER BY published_at DESC LIMIT ?
+            ''', (keyword.strip().lower(), since, limit))]
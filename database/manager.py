@@ -24,7 +24,51 @@ warnings.filterwarnings("ignore", category=UserWarning, module="huggingface_hub.
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 # =================================================================
 
-from sentence_transformers import SentenceTransformer
+from database.history import ScoreHistory
+from database.retention import RetentionManager, CONTENT_SQL, register_codecs
+from database.keywords import KeywordIndex
+from database.topics import TopicModel
+from telemetry.metrics import metrics
+from config import EMBEDDING_MODEL, EMBEDDING_VERSION, SQLITE_BUSY_TIMEOUT_SECONDS
+
+# Every embedding stored before vectors were tagged came from this model
+LEGACY_EMBEDDING_TAG = ('all-MiniLM-L6-v2', 1)
+
+
+# Columns the query API can project; cold-tier content is inflated transparently
+POST_COLUMNS = {
+    'id': 'id',
+    'source_platform': 'source_platform',
+    'external_id': 'external_id',
+    'title': 'title',
+    'content': CONTENT_SQL,
+    'author': 'author',
+    'url': 'url',
+    'raw_score': 'raw_score',
+    'trend_score': 'trend_score',
+    'published_at': 'published_at',
+    'collected_at': 'collected_at',
+    'keywords': 'keywords',
+    'embedding': 'embedding',
+    'embedding_model': 'embedding_model',
+    'embedding_version': 'embedding_version',
+    'storage_tier': 'storage_tier'
+}
+
+# Embeddings are ~8 KB of JSON per row, so they are only read when explicitly requested
+DEFAULT_POST_COLUMNS = [
+    'id', 'source_platform', 'external_id', 'title', 'content', 'author', 'url',
+    'raw_score', 'trend_score', 'published_at', 'collected_at', 'keywords'
+]
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def embedding_text(title, content):
+    """The exact text a post's embedding is computed from (shared with the backfill job)."""
+    return f"{title or ''}. {content or ''}"
 
 
 class TrendManager:
@@ -33,21 +77,44 @@ class TrendManager:
     Includes data health monitoring and noise suppression for AI models.
     """
 
-    def __init__(self, db_path="trends_project.db"):
+    def __init__(self, db_path="trends_project.db", nlp_model=None, embedding_tag=None):
         self.db_path = db_path
+        self.history = ScoreHistory(db_path)
+        self.retention = RetentionManager(db_path)
+        self.keyword_index = KeywordIndex(db_path)
+
+        # The Sentence-Transformer model transforms text into 384-dimensional semantic vectors.
+        # It is loaded on first use, so read-only and maintenance commands never pay for it.
+        # Any object with a compatible encode() can be injected (benchmarks, offline runs), but its
+        # vectors must not be tagged as the production model: GraphBuilder and TopicModel compare
+        # every vector that shares a tag. Pass embedding_tag=(model, version) or expose model_name.
+        self._nlp_model = nlp_model
+        if embedding_tag is None and nlp_model is not None:
+            name = getattr(nlp_model, 'model_name', None)
+            if not name:
+                raise ValueError("An injected nlp_model needs a model_name attribute or an explicit embedding_tag")
+            embedding_tag = (name, getattr(nlp_model, 'model_version', 1))
+        self.embedding_model, self.embedding_version = embedding_tag or (EMBEDDING_MODEL, EMBEDDING_VERSION)
 
-        # Initialize the Sentence-Transformer model
-        # This model transforms text into 384-dimensional semantic vectors.
-        print("🧠 Loading NLP Model for semantic analysis...")
-        self.nlp_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✅ NLP Model Loaded Successfully!")
+        self.topics = TopicModel(db_path, (self.embedding_model, self.embedding_version))
 
         self._init_db()
 
+    @property
+    def nlp_model(self):
+        if self._nlp_model is None:
+            from sentence_transformers import SentenceTransformer
+            print("🧠 Loading NLP Model for semantic analysis...")
+            self._nlp_model = SentenceTransformer(self.embedding_model)
+            print("✅ NLP Model Loaded Successfully!")
+        return self._nlp_model
+
     def _init_db(self):
         """Initializes the schema with support for scores, dynamic keywords, and semantic embeddings."""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
+            # Only takes effect on a fresh file; RetentionManager migrates existing ones
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS unified_posts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -66,67 +133,202 @@ class TrendManager:
                     UNIQUE(source_platform, external_id)
                 )
             ''')
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(unified_posts)')}
+            if 'embedding_model' not in columns:
+                cursor.execute('ALTER TABLE unified_posts ADD COLUMN embedding_model TEXT')
+                cursor.execute('ALTER TABLE unified_posts ADD COLUMN embedding_version INTEGER')
+                cursor.execute('''
+                    UPDATE unified_posts SET embedding_model = ?, embedding_version = ?
+                    WHERE embedding IS NOT NULL
+                ''', LEGACY_EMBEDDING_TAG)
+            # Serve top-k and keyset pages straight from an index instead of sorting the table
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_trend ON unified_posts(trend_score DESC, id DESC)')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_posts_platform_trend
+                ON unified_posts(source_platform, trend_score DESC, id DESC)
+            ''')
+            ScoreHistory.init_schema(cursor)
+            RetentionManager.init_schema(cursor)
+            KeywordIndex.init_schema(cursor)
+            TopicModel.init_schema(cursor)
             conn.commit()
 
+    def backfill_indexes(self):
+        """
+        One-off migration of databases created before the derived indexes existed: rebuilds the
+        keyword index when it is empty but stored posts have keywords, and clusters the stored
+        embeddings when this model has no topics yet. Runs as a scheduler startup job (or
+        `cli.py keywords --rebuild` / `cli.py topics --rebuild`), never on construction, so opening
+        the database stays cheap. Returns {index: rows indexed}.
+        """
+        report = {}
+        if self.keyword_index.needs_backfill():
+            report['keywords'] = self.keyword_index.rebuild()
+        if self.topics.needs_backfill():
+            report['topics'] = self.topics.rebuild()
+        return report
+
     def save_posts(self, posts):
         """Processes a list of posts, generates embeddings, and saves them to the DB."""
         if not posts:
             return 0
 
         added_count = 0
-        with sqlite3.connect(self.db_path) as conn:
+        indexed = []  # (post_id, platform, published_at, collected_at, keywords) of new rows
+        clustered = []  # same, with the embedding vector instead of keywords
+
+        # Generate semantic vectors for the whole batch before taking the write lock,
+        # so concurrent ingest workers only hold it for the inserts
+        with metrics.timer('stage_seconds', stage='embedding'):
+            vectors = self.nlp_model.encode([embedding_text(post.get('title'), post.get('content'))
+                                             for post in posts])
+
+        with sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS) as conn:
             cursor = conn.cursor()
             collected_at = datetime.now().isoformat()
 
-            for post in posts:
+            for post, embedding_vector in zip(posts, vectors):
                 try:
-                    # Create a rich text representation for embedding
-                    text_to_embed = f"{post.get('title', '')}. {post.get('content', '')}"
-
-                    # Generate semantic vector
-                    embedding_vector = self.nlp_model.encode(text_to_embed)
-
                     # Convert the vector to a JSON string for storage
                     embedding_json = json.dumps(embedding_vector.tolist())
 
                     # Convert keyword list to JSON string for database storage
                     keywords_json = json.dumps(post.get('keywords', []))
 
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO unified_posts (
-                            source_platform, external_id, title, content, 
-                            author, url, raw_score, trend_score, 
-                            published_at, collected_at, keywords, embedding
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        post['source_platform'],
-                        post['external_id'],
-                        post['title'],
-                        post['content'],
-                        post['author'],
-                        post['url'],
-                        post['raw_score'],
-                        post.get('trend_score', 0),
-                        post['published_at'],
-                        collected_at,
-                        keywords_json,
-                        embedding_json
-                    ))
+                    with metrics.timer('stage_seconds', stage='db_write'):
+                        cursor.execute('''
+                            INSERT OR IGNORE INTO unified_posts (
+                                source_platform, external_id, title, content, 
+                                author, url, raw_score, trend_score, 
+                                published_at, collected_at, keywords, embedding,
+                                embedding_model, embedding_version
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            post['source_platform'],
+                            post['external_id'],
+                            post['title'],
+                            post['content'],
+                            post['author'],
+                            post['url'],
+                            post['raw_score'],
+                            post.get('trend_score', 0),
+                            post['published_at'],
+                            collected_at,
+                            keywords_json,
+                            embedding_json,
+                            self.embedding_model,
+                            self.embedding_version
+                        ))
                     if cursor.rowcount > 0:
                         added_count += 1
+                        indexed.append((cursor.lastrowid, post['source_platform'], post['published_at'],
+                                        collected_at, post.get('keywords', [])))
+                        clustered.append(indexed[-1][:4] + (embedding_vector,))
+                    metrics.inc('posts_saved_total', platform=post['source_platform'],
+                                outcome='new' if cursor.rowcount > 0 else 'duplicate')
                 except Exception as e:
+                    metrics.inc('posts_saved_total', platform=post.get('source_platform'), outcome='error')
                     print(f"Error saving post {post.get('external_id')}: {e}")
 
-            conn.commit()
+            # Append this cycle's raw scores for every tracked post, new or already stored
+            with metrics.timer('stage_seconds', stage='db_write'):
+                ScoreHistory.record(cursor, posts)
+                KeywordIndex.record(cursor, indexed)
+            # Nearest-centroid assignment: O(topics) per new post
+            with metrics.timer('stage_seconds', stage='topics'):
+                self.topics.assign(cursor, clustered)
+            with metrics.timer('stage_seconds', stage='db_write'):
+                conn.commit()
         return added_count
 
-    def get_all_posts(self):
-        """Retrieves all posts sorted by their calculated trend intensity."""
+    def _connect(self):
+        conn = register_codecs(sqlite3.connect(self.db_path))
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _query_parts(columns, platform, since, until, required=()):
+        """Builds the SELECT list and WHERE clauses shared by the query methods."""
+        columns = list(columns or DEFAULT_POST_COLUMNS)
+        unknown = set(columns) - POST_COLUMNS.keys()
+        if unknown:
+            raise ValueError(f"Unknown post columns: {sorted(unknown)}")
+        columns += [c for c in required if c not in columns]
+        select = ', '.join(f"{POST_COLUMNS[c]} AS {c}" for c in columns)
+
+        clauses, params = [], []
+        if platform:
+            platforms = [platform] if isinstance(platform, str) else list(platform)
+            clauses.append(f"source_platform IN ({', '.join('?' * len(platforms))})")
+            params += platforms
+        # collected_at is always ISO-8601 (published_at mixes epoch and ISO across platforms)
+        if since is not None:
+            clauses.append('collected_at >= ?')
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append('collected_at < ?')
+            params.append(_iso(until))
+        return select, clauses, params
+
+    def page_posts(self, limit=50, after=None, columns=None, platform=None, since=None, until=None):
+        """
+        One page of posts by descending trend score, using keyset pagination.
+        Pass the returned cursor as `after` to get the next page; it is None on the last page.
+        id and trend_score are always included since they make up the cursor.
+        """
+        select, clauses, params = self._query_parts(columns, platform, since, until,
+                                                    required=('id', 'trend_score'))
+        if after is not None:
+            clauses.append('(trend_score, id) < (?, ?)')
+            params += list(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT {select} FROM unified_posts {where} ORDER BY trend_score DESC, id DESC LIMIT ?',
+                params + [-1 if limit is None else limit]
+            ).fetchall()
+        posts = [dict(row) for row in rows]
+        cursor = (posts[-1]['trend_score'], posts[-1]['id']) if limit and len(posts) == limit else None
+        return posts, cursor
+
+    def top_posts(self, limit=15, columns=None, platform=None, since=None, until=None):
+        """Top-k posts by trend score; the LIMIT is applied in SQL over the score index."""
+        posts, _ = self.page_posts(limit, columns=columns, platform=platform, since=since, until=until)
+        return posts
+
+    def iter_posts(self, columns=None, platform=None, since=None, until=None, chunk_size=1000):
+        """Streams posts in id order, one chunk in memory at a time (for exports and bulk jobs)."""
+        select, clauses, params = self._query_parts(columns, platform, since, until, required=('id',))
+        where = ' AND '.join(['id > ?'] + clauses)
+        last_id = 0
+        conn = self._connect()
+        try:
+            while True:
+                rows = conn.execute(
+                    f'SELECT {select} FROM unified_posts WHERE {where} ORDER BY id LIMIT ?',
+                    [last_id] + params + [chunk_size]
+                ).fetchall()
+                if not rows:
+                    return
+                last_id = rows[-1]['id']
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def count_posts(self, platform=None, since=None, until=None):
+        """Number of posts matching the same filters as the query methods (collected_at window)."""
+        _, clauses, params = self._query_parts(['id'], platform, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
         with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM unified_posts ORDER BY trend_score DESC')
-            return [dict(row) for row in cursor.fetchall()]
+            return conn.execute(f'SELECT COUNT(*) FROM unified_posts {where}', params).fetchone()[0]
+
+    def get_all_posts(self):
+        """
+        Retrieves all posts (embeddings included) sorted by their calculated trend intensity.
+        Loads the whole table; prefer top_posts, page_posts or iter_posts.
+        """
+        return self.top_posts(limit=None, columns=list(POST_COLUMNS))
 
     def get_db_stats(self):
         """
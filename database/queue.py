@@ -0,0 +1,234 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from config import QUEUE_CONFIG, SQLITE_BUSY_TIMEOUT_SECONDS
+from telemetry.metrics import metrics
+
+STATUS_QUEUED = 'queued'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_DEAD = 'dead'
+
+
+def worker_name():
+    """Default worker id: unique per process across every host sharing the queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseLost(Exception):
+    """The job's lease expired and it may already be running on another worker."""
+
+
+class JobQueue:
+    """
+    Durable job queue stored in SQLite and shared by the dispatcher and any number of workers.
+    A worker claims a job under a time-limited lease and must complete, fail or heartbeat it before
+    the lease runs out; expired leases are claimed again by other workers, so a crashed worker never
+    loses a job. Failed jobs are retried with exponential backoff and moved to the dead letter
+    (status 'dead') after max_attempts. Claims run in BEGIN IMMEDIATE transactions on a WAL
+    database, so concurrent workers never receive the same job.
+
+    Jobs are at-least-once: handlers must be idempotent (save_posts ignores stored posts).
+    """
+
+    def __init__(self, db_path, config=None):
+        self.config = {**QUEUE_CONFIG, **(config or {})}
+        self.db_path = self.config['db_path'] or db_path
+        conn = self._connect()
+        try:
+            # Readers no longer block the writer; the setting is persistent for the database file
+            conn.execute('PRAGMA journal_mode = WAL')
+            self.init_schema(conn.cursor())
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            # Take the write lock up front so two workers cannot read the same candidate job
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def init_schema(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,          -- JSON
+                status TEXT NOT NULL,           -- queued | leased | done | dead
+                dedupe_key TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,     -- epoch seconds; not claimable before
+                lease_owner TEXT,
+                lease_expires REAL,             -- epoch seconds
+                last_error TEXT,
+                created_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, available_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires)')
+        # At most one pending job per dedupe key (e.g. one outstanding fetch per platform)
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key)
+            WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'leased')
+        ''')
+
+    def enqueue(self, kind, payload, delay_seconds=0, dedupe_key=None, max_attempts=None):
+        """Adds a job; returns its id, or None when a pending job with the same dedupe_key exists."""
+        with self._transaction() as conn:
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO jobs (kind, payload, status, dedupe_key, max_attempts, available_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (kind, json.dumps(payload), STATUS_QUEUED, dedupe_key,
+                  max_attempts or self.config['max_attempts'], time.time() + delay_seconds,
+                  datetime.now().isoformat()))
+            job_id = cursor.lastrowid if cursor.rowcount > 0 else None
+        metrics.inc('queue_jobs_total', kind=kind, outcome='enqueued' if job_id else 'deduplicated')
+        return job_id
+
+    def _expire_leases(self, conn, now):
+        """Returns jobs of workers that stopped heartbeating to the queue (or the dead letter)."""
+        dead = conn.execute('''
+            UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, finished_at = ?,
+                            last_error = 'lease expired after final attempt'
+            WHERE status = ? AND lease_expires <= ? AND attempts >= max_attempts
+        ''', (STATUS_DEAD, datetime.now().isoformat(), STATUS_LEASED, now)).rowcount
+        requeued = conn.execute('''
+            UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, available_at = ?,
+                            last_error = 'lease expired'
+            WHERE status = ? AND lease_expires <= ?
+        ''', (STATUS_QUEUED, now, STATUS_LEASED, now)).rowcount
+        if dead:
+            metrics.inc('queue_leases_expired_total', dead, outcome='dead')
+        if requeued:
+            metrics.inc('queue_leases_expired_total', requeued, outcome='requeued')
+
+    def claim(self, worker_id, kinds=None):
+        """
+        Leases the oldest due job (optionally of the given kinds) to worker_id.
+        Returns {'id', 'kind', 'payload', 'attempts', 'max_attempts'} or None if nothing is due.
+        """
+        now = time.time()
+        kind_filter, params = '', [STATUS_QUEUED, now]
+        if kinds:
+            kind_filter = f"AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(f'''
+                SELECT id, kind, payload, attempts, max_attempts FROM jobs
+                WHERE status = ? AND available_at <= ? {kind_filter}
+                ORDER BY available_at, id LIMIT 1
+            ''', params).fetchone()
+            if row is None:
+                return None
+            conn.execute('''
+                UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?
+                WHERE id = ?
+            ''', (STATUS_LEASED, worker_id, now + self.config['lease_seconds'], row[0]))
+        return {'id': row[0], 'kind': row[1], 'payload': json.loads(row[2]),
+                'attempts': row[3] + 1, 'max_attempts': row[4]}
+
+    def _update_leased(self, job, worker_id, assignments, params):
+        """Applies an update only while worker_id still holds the job's lease."""
+        with self._transaction() as conn:
+            return conn.execute(f'''
+                UPDATE jobs SET {assignments} WHERE id = ? AND status = ? AND lease_owner = ?
+            ''', list(params) + [job['id'], STATUS_LEASED, worker_id]).rowcount > 0
+
+    def heartbeat(self, job, worker_id):
+        """Extends the lease of a long-running job; raises LeaseLost if it already expired."""
+        if not self._update_leased(job, worker_id, 'lease_expires = ?',
+                                   [time.time() + self.config['lease_seconds']]):
+            raise LeaseLost(f"Lease on job {job['id']} lost by {worker_id}")
+
+    def complete(self, job, worker_id):
+        """Marks the job done; False if the lease was lost (the result still stands, jobs are idempotent)."""
+        done = self._update_leased(job, worker_id,
+                                   'status = ?, lease_owner = NULL, lease_expires = NULL, finished_at = ?',
+                                   [STATUS_DONE, datetime.now().isoformat()])
+        metrics.inc('queue_jobs_total', kind=job['kind'], outcome='done' if done else 'lease_lost')
+        return done
+
+    def fail(self, job, worker_id, error):
+        """
+        Schedules a retry with exponential backoff, or dead-letters the job; returns its new status.
+        Returns None if the lease was lost: the job is back in the queue (or running elsewhere) and unchanged.
+        """
+        if job['attempts'] >= job['max_attempts']:
+            status, assignments = STATUS_DEAD, 'finished_at = ?'
+            extra = [datetime.now().isoformat()]
+        else:
+            delay = min(self.config['retry_base_seconds'] * 2 ** (job['attempts'] - 1),
+                        self.config['retry_max_seconds'])
+            status, assignments = STATUS_QUEUED, 'available_at = ?'
+            extra = [time.time() + delay]
+        assignments = f'status = ?, lease_owner = NULL, lease_expires = NULL, last_error = ?, {assignments}'
+        if not self._update_leased(job, worker_id, assignments, [status, str(error)[:2000]] + extra):
+            metrics.inc('queue_jobs_total', kind=job['kind'], outcome='lease_lost')
+            return None
+        metrics.inc('queue_jobs_total', kind=job['kind'], outcome='dead' if status == STATUS_DEAD else 'retried')
+        return status
+
+    def release(self, job, worker_id):
+        """Hands an unfinished job back without counting the attempt (graceful worker shutdown)."""
+        return self._update_leased(job, worker_id,
+                                   'status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL',
+                                   [STATUS_QUEUED])
+
+    def stats(self):
+        """Job counts as {kind: {status: count}}."""
+        counts = {}
+        with sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS) as conn:
+            for kind, status, n in conn.execute('SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status'):
+                counts.setdefault(kind, {})[status] = n
+        return counts
+
+    def dead_letters(self, limit=20):
+        with sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute('''
+                SELECT id, kind, attempts, last_error, finished_at FROM jobs
+                WHERE status = ? ORDER BY id DESC LIMIT ?
+            ''', (STATUS_DEAD, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_dead(self, kind=None):
+        """Moves dead-lettered jobs back to the queue with a fresh attempt budget."""
+        kind_filter, params = '', [STATUS_QUEUED, time.time(), STATUS_DEAD]
+        if kind:
+            kind_filter = 'AND kind = ?'
+            params.append(kind)
+        with self._transaction() as conn:
+            # OR IGNORE: a dead job whose dedupe key is pending again stays dead
+            return conn.execute(f'''
+                UPDATE OR IGNORE jobs SET status = ?, attempts = 0, available_at = ?, finished_at = NULL
+                WHERE status = ? {kind_filter}
+            ''', params).rowcount
+
+    def purge(self, keep_days=None):
+        """Deletes finished jobs older than keep_days; dead letters are kept for inspection."""
+        keep_days = self.config['keep_done_days'] if keep_days is None else keep_days
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat()
+        with self._transaction() as conn:
+            return conn.execute('DELETE FROM jobs WHERE status = ? AND finished_at < ?',
+                                (STATUS_DONE, cutoff)).rowcount
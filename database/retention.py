@@ -0,0 +1,142 @@
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from config import RETENTION_CONFIG, SQLITE_BUSY_TIMEOUT_SECONDS
+
+# Codec tag prepended to every blob so the format can change without a migration
+ZLIB_CODEC = b'z'
+
+TIER_HOT = 'hot'
+TIER_COLD = 'cold'
+TIER_EMBEDDING_ONLY = 'embedding_only'
+
+# Use in place of the bare column wherever content is read (requires register_codecs)
+CONTENT_SQL = "COALESCE(content, inflate(content_blob))"
+
+
+def compress_text(text):
+    if text is None:
+        return None
+    return ZLIB_CODEC + zlib.compress(text.encode('utf-8'), 9)
+
+
+def decompress_text(blob):
+    if blob is None:
+        return None
+    blob = bytes(blob)
+    if blob[:1] == ZLIB_CODEC:
+        return zlib.decompress(blob[1:]).decode('utf-8')
+    raise ValueError(f"Unknown content codec: {blob[:1]!r}")
+
+
+def register_codecs(conn):
+    """Exposes inflate(blob) to SQL so readers can transparently select cold content."""
+    conn.create_function('inflate', 1, decompress_text, deterministic=True)
+    return conn
+
+
+class RetentionManager:
+    """
+    Keeps unified_posts bounded on long-running instances.
+    Hot rows are stored as-is, cold rows keep their content as a compressed blob and,
+    optionally, the oldest rows drop their content entirely and keep only the embedding.
+    Freed pages are returned to the OS in small incremental VACUUM steps.
+    """
+
+    def __init__(self, db_path, config=None):
+        self.db_path = db_path
+        self.config = {**RETENTION_CONFIG, **(config or {})}
+
+    @staticmethod
+    def init_schema(cursor):
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(unified_posts)')}
+        if 'content_blob' not in columns:
+            cursor.execute('ALTER TABLE unified_posts ADD COLUMN content_blob BLOB')
+        if 'storage_tier' not in columns:
+            cursor.execute(f"ALTER TABLE unified_posts ADD COLUMN storage_tier TEXT DEFAULT '{TIER_HOT}'")
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_tier_collected ON unified_posts(storage_tier, collected_at)')
+
+    def _cutoff(self, days, now):
+        return (now - timedelta(days=days)).isoformat()
+
+    def _compress_cold(self, conn, cutoff):
+        moved = 0
+        while True:
+            rows = conn.execute('''
+                SELECT id, content FROM unified_posts
+                WHERE storage_tier = ? AND collected_at < ? LIMIT ?
+            ''', (TIER_HOT, cutoff, self.config['batch_size'])).fetchall()
+            if not rows:
+                return moved
+            conn.executemany('''
+                UPDATE unified_posts SET content_blob = ?, content = NULL, storage_tier = ? WHERE id = ?
+            ''', [(compress_text(content), TIER_COLD, post_id) for post_id, content in rows])
+            conn.commit()
+            moved += len(rows)
+
+    def _strip_to_embedding(self, conn, cutoff):
+        cursor = conn.execute('''
+            UPDATE unified_posts SET content = NULL, content_blob = NULL, storage_tier = ?
+            WHERE storage_tier != ? AND collected_at < ?
+        ''', (TIER_EMBEDDING_ONLY, TIER_EMBEDDING_ONLY, cutoff))
+        conn.commit()
+        return cursor.rowcount
+
+    def incremental_vacuum_enabled(self, conn=None):
+        if conn is None:
+            with sqlite3.connect(self.db_path) as conn:
+                return self.incremental_vacuum_enabled(conn)
+        return conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+    def enable_incremental_vacuum(self):
+        """
+        One-time migration for databases created before retention existed: switching the
+        auto_vacuum mode needs a full VACUUM, which rewrites the file and locks out writers.
+        Run it (`cli.py vacuum`) while no collector or worker is writing. Returns True if converted.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+        try:
+            if self.incremental_vacuum_enabled(conn):
+                return False
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            return True
+        finally:
+            conn.close()
+
+    def vacuum_step(self, conn):
+        conn.execute(f"PRAGMA incremental_vacuum({int(self.config['vacuum_pages'])})").fetchall()
+        return conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    def run(self, now=None):
+        """
+        Applies the tiering policy and releases a bounded number of free pages. Safe next to live
+        writers: it never runs a full VACUUM, so on a database still in full/none auto_vacuum mode
+        the freed pages stay in the file until enable_incremental_vacuum() has run.
+        """
+        now = now or datetime.now()
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+        try:
+            report = {'cold': self._compress_cold(conn, self._cutoff(self.config['hot_days'], now)), 'embedding_only': 0}
+            if self.config['embedding_only_after_days'] is not None:
+                report['embedding_only'] = self._strip_to_embedding(
+                    conn, self._cutoff(self.config['embedding_only_after_days'], now))
+            report['free_pages_left'] = self.vacuum_step(conn)
+            report['incremental_vacuum'] = self.incremental_vacuum_enabled(conn)
+            return report
+        finally:
+            conn.close()
+
+    def storage_stats(self):
+        """Row counts per tier plus the database page footprint."""
+        with sqlite3.connect(self.db_path) as conn:
+            tiers = dict(conn.execute(
+                'SELECT storage_tier, COUNT(*) FROM unified_posts GROUP BY storage_tier').fetchall())
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return {
+            'tiers': tiers,
+            'size_mb': page_size * page_count / 1e6,
+            'free_mb': page_size * free_pages / 1e6
+        }
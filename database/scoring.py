@@ -0,0 +1,41 @@
+import math
+import sqlite3
+import numpy as np
+
+# Shared by every collector; kept here so rescoring does not import the NLP filter stack
+DEFAULT_STATS_CONFIG = {
+    'min_stdev': 1.0,
+    'damping_factor': 1.0,
+    'sigmoid_shift': 0.5,
+    'log_base': 10
+}
+
+
+def rescore_platform(db_path, platform, stats_config=None):
+    """
+    Normalizes one platform's raw scores into 0-100 trend scores:
+    log-scaled popularity, z-scored within the platform, squashed through a sigmoid.
+    Returns the number of rescored posts.
+    """
+    stats_config = stats_config or DEFAULT_STATS_CONFIG
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, raw_score FROM unified_posts WHERE source_platform = ?', (platform,))
+        rows = cursor.fetchall()
+        if not rows: return 0
+        processed_scores = [math.log10(r[1] + 1) if r[1] > 0 else 0 for r in rows]
+        mean, std_dev = np.mean(processed_scores), np.std(processed_scores) or 1.0
+        damp, shift = stats_config.get('damping_factor', 1.0), stats_config.get('sigmoid_shift', 0.5)
+        for row, scaled_score in zip(rows, processed_scores):
+            z_score = ((scaled_score - mean) / (std_dev * damp)) + shift
+            trend_score = (1 / (1 + math.exp(-z_score))) * 100
+            cursor.execute('UPDATE unified_posts SET trend_score = ? WHERE id = ?', (trend_score, row[0]))
+        conn.commit()
+    return len(rows)
+
+
+def list_platforms(db_path):
+    """Platforms that have at least one stored post."""
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute(
+            'SELECT DISTINCT source_platform FROM unified_posts ORDER BY source_platform')]
@@ -0,0 +1,330 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from config import EMBEDDING_MODEL, EMBEDDING_VERSION, SQLITE_BUSY_TIMEOUT_SECONDS, TOPIC_CONFIG
+from database.dates import to_utc_iso
+
+
+def _unit(vector):
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _pack(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _unpack(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class TopicModel:
+    """
+    Streaming centroid clustering over post embeddings.
+    Centroids are persisted in `topics`; every new post is assigned to its nearest centroid
+    (one k x d dot product) or opens a new topic, and the centroid follows as a capped
+    running mean. A periodic maintenance pass merges converging topics and splits
+    incoherent ones with mini-batch k-means. Only vectors of one embedding model/version
+    are ever compared.
+    """
+
+    def __init__(self, db_path, model_tag=(EMBEDDING_MODEL, EMBEDDING_VERSION), config=None):
+        self.db_path = db_path
+        self.model_tag = tuple(model_tag)
+        self.config = {**TOPIC_CONFIG, **(config or {})}
+
+    @staticmethod
+    def init_schema(cursor):
+        """Creates the topic tables; returns True when they are new and need a backfill."""
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'topics'").fetchone()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS topics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                embedding_model TEXT NOT NULL,
+                embedding_version INTEGER NOT NULL,
+                centroid BLOB NOT NULL,     -- unit float32 vector
+                size INTEGER NOT NULL,
+                label TEXT,                 -- top keyphrases of the members, refreshed by maintain()
+                created_at TEXT,
+                updated_at TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_topics (
+                post_id INTEGER PRIMARY KEY,
+                topic_id INTEGER NOT NULL,
+                platform TEXT NOT NULL,
+                published_at TEXT NOT NULL,  -- UTC ISO-8601
+                similarity REAL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_topics_topic ON post_topics(topic_id, published_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_topics_published ON post_topics(published_at)')
+        return exists is None
+
+    def needs_backfill(self):
+        """True when embeddings of this model exist but none was clustered (a pre-topics database)."""
+        with sqlite3.connect(self.db_path) as conn:
+            self.init_schema(conn.cursor())
+            return conn.execute('''
+                SELECT NOT EXISTS (SELECT 1 FROM topics WHERE embedding_model = ? AND embedding_version = ?)
+                   AND EXISTS (SELECT 1 FROM unified_posts
+                               WHERE embedding IS NOT NULL AND embedding_model = ? AND embedding_version = ?)
+            ''', self.model_tag + self.model_tag).fetchone()[0] == 1
+
+    def _load(self, cursor):
+        rows = cursor.execute('''
+            SELECT id, centroid, size FROM topics
+            WHERE embedding_model = ? AND embedding_version = ? ORDER BY id
+        ''', self.model_tag).fetchall()
+        ids = [row[0] for row in rows]
+        centroids = np.array([_unpack(row[1]) for row in rows], dtype=np.float32) if rows else None
+        sizes = [row[2] for row in rows]
+        return ids, centroids, sizes
+
+    def _create(self, cursor, centroid, size):
+        now = datetime.now().isoformat()
+        cursor.execute('''
+            INSERT INTO topics (embedding_model, embedding_version, centroid, size, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', self.model_tag + (_pack(centroid), size, now, now))
+        return cursor.lastrowid
+
+    def assign(self, cursor, entries):
+        """
+        Assigns newly stored posts to topics inside the caller's transaction.
+        entries: (post_id, platform, published_at, collected_at, vector) tuples.
+        Centroids are re-read per call, so concurrent writers never overwrite each other's topics.
+        """
+        entries = list(entries)
+        if not entries:
+            return 0
+        ids, centroids, sizes = self._load(cursor)
+        touched, rows = set(), []
+        for post_id, platform, published_at, collected_at, vector in entries:
+            x = _unit(np.asarray(vector, dtype=np.float32))
+            best, similarity = None, -1.0
+            if ids:
+                similarities = centroids @ x
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+
+            if best is None or (similarity < self.config['assign_threshold'] and len(ids) < self.config['max_topics']):
+                ids.append(self._create(cursor, x, 1))
+                centroids = x[None, :] if centroids is None else np.vstack([centroids, x])
+                sizes.append(1)
+                best, similarity = len(ids) - 1, 1.0
+            else:
+                # Capped running mean: old topics keep adapting instead of freezing
+                weight = min(sizes[best], self.config['max_weight']) + 1
+                centroids[best] = _unit(centroids[best] + (x - centroids[best]) / weight)
+                sizes[best] += 1
+                touched.add(best)
+
+            rows.append((post_id, ids[best], platform,
+                         to_utc_iso(published_at, collected_at) or datetime.now(timezone.utc).isoformat(), similarity))
+
+        cursor.executemany('''
+            INSERT OR REPLACE INTO post_topics (post_id, topic_id, platform, published_at, similarity)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        now = datetime.now().isoformat()
+        cursor.executemany('UPDATE topics SET centroid = ?, size = ?, updated_at = ? WHERE id = ?',
+                           [(_pack(centroids[i]), sizes[i], now, ids[i]) for i in touched])
+        return len(rows)
+
+    def _iter_embeddings(self, conn, chunk_size, topic_id=None, limit=None):
+        """Yields (rows, matrix) chunks of posts with current-model embeddings, in id order."""
+        where = 'p.embedding IS NOT NULL AND p.embedding_model = ? AND p.embedding_version = ?'
+        join, params = '', list(self.model_tag)
+        if topic_id is not None:
+            join, where = 'JOIN post_topics t ON t.post_id = p.id', where + ' AND t.topic_id = ?'
+            params.append(topic_id)
+        last_id, seen = 0, 0
+        while limit is None or seen < limit:
+            size = chunk_size if limit is None else min(chunk_size, limit - seen)
+            rows = conn.execute(f'''
+                SELECT p.id, p.source_platform, p.published_at, p.collected_at, p.embedding
+                FROM unified_posts p {join} WHERE p.id > ? AND {where} ORDER BY p.id LIMIT ?
+            ''', [last_id] + params + [size]).fetchall()
+            if not rows:
+                return
+            last_id, seen = rows[-1][0], seen + len(rows)
+            yield rows, np.array([json.loads(row[4]) for row in rows], dtype=np.float32)
+
+    def rebuild(self, chunk_size=2000):
+        """Re-clusters every stored embedding from scratch in one linear pass, then runs maintenance."""
+        assigned = 0
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self.init_schema(cursor)
+            cursor.execute('DELETE FROM post_topics WHERE topic_id IN '
+                           '(SELECT id FROM topics WHERE embedding_model = ? AND embedding_version = ?)', self.model_tag)
+            cursor.execute('DELETE FROM topics WHERE embedding_model = ? AND embedding_version = ?', self.model_tag)
+            for rows, matrix in self._iter_embeddings(conn, chunk_size):
+                assigned += self.assign(cursor, [row[:4] + (vector,) for row, vector in zip(rows, matrix)])
+                conn.commit()
+        if assigned:
+            self.maintain()
+        return assigned
+
+    def _merge(self, cursor):
+        ids, centroids, sizes = self._load(cursor)
+        if len(ids) < 2:
+            return 0
+        similarities = centroids @ centroids.T
+        np.fill_diagonal(similarities, -1.0)
+        left, right = np.where(np.triu(similarities >= self.config['merge_threshold']))
+        order = np.argsort(-similarities[left, right])
+        absorbed = set()
+        for i, j in zip(left[order], right[order]):
+            if i in absorbed or j in absorbed:
+                continue
+            keep, drop = (i, j) if sizes[i] >= sizes[j] else (j, i)
+            centroids[keep] = _unit(centroids[keep] * sizes[keep] + centroids[drop] * sizes[drop])
+            sizes[keep] += sizes[drop]
+            cursor.execute('UPDATE post_topics SET topic_id = ? WHERE topic_id = ?', (ids[keep], ids[drop]))
+            cursor.execute('DELETE FROM topics WHERE id = ?', (ids[drop],))
+            cursor.execute('UPDATE topics SET centroid = ?, size = ?, updated_at = ? WHERE id = ?',
+                           (_pack(centroids[keep]), sizes[keep], datetime.now().isoformat(), ids[keep]))
+            absorbed.add(drop)
+        return len(absorbed)
+
+    def _split(self, conn):
+        cursor = conn.cursor()
+        ids, centroids, sizes = self._load(cursor)
+        split = 0
+        for topic_id, centroid, size in zip(ids, centroids if ids else [], sizes):
+            if size < self.config['split_min_size'] or len(ids) + split >= self.config['max_topics']:
+                continue
+            sample = [m for _, m in self._iter_embeddings(conn, self.config['split_sample'], topic_id,
+                                                          limit=self.config['split_sample'])]
+            if not sample:
+                continue
+            members = np.vstack(sample)
+            members /= np.maximum(np.linalg.norm(members, axis=1, keepdims=True), 1e-12)
+            if float(np.mean(members @ centroid)) >= self.config['split_cohesion']:
+                continue
+
+            from sklearn.cluster import MiniBatchKMeans  # heavy import, only paid when a split happens
+            kmeans = MiniBatchKMeans(n_clusters=2, n_init=3, random_state=0).fit(members)
+            halves = np.array([_unit(c) for c in kmeans.cluster_centers_], dtype=np.float32)
+            new_id = self._create(cursor, halves[1], 0)
+            # Reassign every member (not just the sample) to the nearer half
+            moved = []
+            for rows, matrix in self._iter_embeddings(conn, 2000, topic_id):
+                scores = matrix @ halves.T
+                moved += [(new_id, float(s[1]), row[0]) for row, s in zip(rows, scores) if s[1] > s[0]]
+            cursor.executemany('UPDATE post_topics SET topic_id = ?, similarity = ? WHERE post_id = ?', moved)
+            cursor.execute('UPDATE topics SET centroid = ?, updated_at = ? WHERE id = ?',
+                           (_pack(halves[0]), datetime.now().isoformat(), topic_id))
+            split += 1
+        return split
+
+    def _prune(self, conn):
+        """Dissolves tiny topics that stopped growing; their posts move to the nearest surviving topic."""
+        cursor = conn.cursor()
+        cutoff = (datetime.now() - timedelta(days=self.config['prune_after_days'])).isoformat()
+        stale = [row[0] for row in cursor.execute('''
+            SELECT id FROM topics
+            WHERE embedding_model = ? AND embedding_version = ? AND size < ? AND updated_at < ?
+        ''', self.model_tag + (self.config['prune_min_size'], cutoff))]
+        ids, centroids, _ = self._load(cursor)
+        keep = [i for i, topic_id in enumerate(ids) if topic_id not in stale]
+        if keep:
+            ids, centroids = [ids[i] for i in keep], centroids[keep]
+            moved, now = {}, datetime.now().isoformat()
+            for topic_id in stale:
+                for rows, matrix in self._iter_embeddings(conn, 2000, topic_id):
+                    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                    similarities = matrix @ centroids.T
+                    best = np.argmax(similarities, axis=1)
+                    cursor.executemany('UPDATE post_topics SET topic_id = ?, similarity = ? WHERE post_id = ?',
+                                       [(ids[b], float(similarities[k, b]), row[0])
+                                        for k, (row, b) in enumerate(zip(rows, best))])
+                    for b in best:
+                        moved[ids[b]] = moved.get(ids[b], 0) + 1
+            cursor.executemany('UPDATE topics SET size = size + ?, updated_at = ? WHERE id = ?',
+                               [(n, now, topic_id) for topic_id, n in moved.items()])
+        # Members without a usable embedding (or with no topic left to join) are dropped
+        cursor.executemany('DELETE FROM post_topics WHERE topic_id = ?', [(t,) for t in stale])
+        cursor.executemany('DELETE FROM topics WHERE id = ?', [(t,) for t in stale])
+        return len(stale)
+
+    def maintain(self):
+        """Merge, split and prune passes, then sizes and labels are recomputed from post_topics."""
+        # Autocommit mode: the passes run in one explicit BEGIN IMMEDIATE transaction
+        with sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None) as conn:
+            cursor = conn.cursor()
+            # Take the write lock before reading centroids, so a concurrent assign() cannot update
+            # a topic between the read and the merged write (and have its change overwritten)
+            cursor.execute('BEGIN IMMEDIATE')
+            merged = self._merge(cursor)
+            split = self._split(conn)
+            cursor.execute('''
+                UPDATE topics SET size = (SELECT COUNT(*) FROM post_topics WHERE topic_id = topics.id)
+                WHERE embedding_model = ? AND embedding_version = ?
+            ''', self.model_tag)
+            cursor.execute('DELETE FROM topics WHERE size = 0 AND embedding_model = ? AND embedding_version = ?',
+                           self.model_tag)
+            pruned = self._prune(conn)
+            labels = cursor.execute('''
+                SELECT topic_id, keyword, COUNT(*) AS n FROM post_topics
+                JOIN post_keywords USING (post_id)
+                GROUP BY topic_id, keyword ORDER BY topic_id, n DESC
+            ''').fetchall()
+            top = {}
+            for topic_id, keyword, _ in labels:
+                if len(top.setdefault(topic_id, [])) < 3:
+                    top[topic_id].append(keyword)
+            cursor.executemany('UPDATE topics SET label = ? WHERE id = ?',
+                               [(', '.join(words), topic_id) for topic_id, words in top.items()])
+            topics = cursor.execute('SELECT COUNT(*) FROM topics WHERE embedding_model = ? AND embedding_version = ?',
+                                    self.model_tag).fetchone()[0]
+            conn.commit()
+        return {'merged': merged, 'split': split, 'pruned': pruned, 'topics': topics}
+
+    def emerging_topics(self, days=7, baseline_days=28, limit=10, min_posts=3, smoothing=0.5, now=None):
+        """
+        Topics ranked by growth: posts per day over the last `days` against the `baseline_days`
+        before them, growth = recent rate / (baseline rate + smoothing).
+        """
+        import pandas as pd
+
+        now = now or datetime.now(timezone.utc)
+        recent_start = (now - timedelta(days=days)).astimezone(timezone.utc).isoformat()
+        baseline_start = (now - timedelta(days=days + baseline_days)).astimezone(timezone.utc).isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql_query('''
+                SELECT t.id AS topic_id, t.label, t.size, c.recent, c.baseline, c.platforms,
+                       (c.recent * 1.0 / :days) / (c.baseline * 1.0 / :baseline_days + :smoothing) AS growth
+                FROM (
+                    SELECT topic_id,
+                           SUM(published_at >= :recent_start) AS recent,
+                           SUM(published_at < :recent_start) AS baseline,
+                           COUNT(DISTINCT CASE WHEN published_at >= :recent_start THEN platform END) AS platforms
+                    FROM post_topics
+                    WHERE published_at >= :baseline_start
+                    GROUP BY topic_id
+                ) c
+                JOIN topics t ON t.id = c.topic_id
+                WHERE t.embedding_model = :model AND t.embedding_version = :version AND c.recent >= :min_posts
+                ORDER BY growth DESC, c.recent DESC
+                LIMIT :limit
+            ''', conn, params={
+                'days': days, 'baseline_days': baseline_days, 'smoothing': smoothing,
+                'recent_start': recent_start, 'baseline_start': baseline_start, 'min_posts': min_posts,
+                'model': self.model_tag[0], 'version': self.model_tag[1], 'limit': limit
+            })
+
+    def topic_posts(self, topic_id, limit=10):
+        """A topic's members closest to its centroid (id, platform, title, url, similarity)."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute('''
+                SELECT p.id, p.source_platform, p.title, p.url, t.similarity
+                FROM post_topics t JOIN unified_posts p ON p.id = t.post_id
+                WHERE t.topic_id = ? ORDER BY t.similarity DESC LIMIT ?
+            ''', (topic_id, limit))]
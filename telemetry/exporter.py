@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import METRICS_DIR, METRICS_PORT, METRICS_KEEP_CYCLES
+from telemetry.metrics import metrics
+
+
+def _delta(current, previous):
+    """Per-cycle view: counter increments and histogram count/sum since the previous export."""
+    before = {(s['name'], tuple(sorted(s['labels'].items()))): s['value'] for s in previous.get('counters', [])}
+    counters = []
+    for s in current['counters']:
+        change = s['value'] - before.get((s['name'], tuple(sorted(s['labels'].items()))), 0)
+        if change:
+            counters.append({**s, 'value': change})
+
+    before = {(s['name'], tuple(sorted(s['labels'].items()))): s['value'] for s in previous.get('histograms', [])}
+    histograms = []
+    for s in current['histograms']:
+        old = before.get((s['name'], tuple(sorted(s['labels'].items()))), {'count': 0, 'sum': 0.0})
+        count = s['value']['count'] - old['count']
+        if count:
+            histograms.append({**s, 'value': {'count': count, 'sum': round(s['value']['sum'] - old['sum'], 6)}})
+    return {'counters': counters, 'histograms': histograms}
+
+
+def _prune(directory, keep):
+    """Keeps only the `keep` most recent cycle files (names sort chronologically)."""
+    files = sorted(f for f in os.listdir(directory) if f.startswith('cycle-') and f.endswith('.json'))
+    for stale in files[:-keep] if keep else files:
+        try:
+            os.remove(os.path.join(directory, stale))
+        except OSError:
+            pass
+
+
+class CycleExporter:
+    """
+    Writes one JSON metrics snapshot per cycle (cumulative totals plus the cycle's own delta).
+    Files are named cycle-<run>-<cycle>.json, with the run id taken from the start time and pid,
+    so restarts never overwrite earlier runs; only the newest `keep` files are retained.
+    """
+
+    def __init__(self, directory=METRICS_DIR, registry=metrics, keep=METRICS_KEEP_CYCLES):
+        self.directory = directory
+        self.registry = registry
+        self.keep = keep
+        self.run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        self._previous = {}
+
+    def export(self, cycle_num, **context):
+        current = self.registry.snapshot()
+        report = {
+            'cycle': cycle_num,
+            'exported_at': datetime.now().isoformat(timespec='seconds'),
+            **context,
+            'cycle_delta': _delta(current, self._previous),
+            'cumulative': current
+        }
+        self._previous = current
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"cycle-{self.run_id}-{cycle_num:06d}.json")
+        for target in (path, os.path.join(self.directory, 'latest.json')):
+            tmp_path = f"{target}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=1)
+            os.replace(tmp_path, target)
+        _prune(self.directory, self.keep)
+        return path
+
+
+def start_http_server(port=METRICS_PORT, registry=metrics, host='127.0.0.1'):
+    """Serves GET /metrics in Prometheus text format from a daemon thread. Returns None if disabled."""
+    if not port:
+        return None
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Metrics endpoint disabled, cannot bind {host}:{port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    print(f"📈 Prometheus metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,139 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from config import METRICS_LATENCY_BUCKETS
+
+PREFIX = 'trends_'
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimates a quantile by linear interpolation inside the matching bucket."""
+        if not self.count:
+            return None
+        rank, seen, lower = q * self.count, 0, 0.0
+        for upper, n in zip(self.buckets + (float('inf'),), self.counts):
+            if n and seen + n >= rank:
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper if upper != float('inf') else lower
+        return lower
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts))
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, process-local store of labelled counters, gauges and histograms.
+    Cheap enough to call per item: every update is a dict lookup under a lock.
+    """
+
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observes the wall time of the block (in seconds) into the `name` histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """Plain-dict view of every series, suitable for JSON."""
+        def series(store, render):
+            return [{'name': name, 'labels': dict(labels), 'value': render(value)}
+                    for (name, labels), value in sorted(store.items())]
+
+        with self._lock:
+            return {
+                'counters': series(self._counters, lambda v: v),
+                'gauges': series(self._gauges, lambda v: v),
+                'histograms': series(self._histograms, Histogram.as_dict)
+            }
+
+    def to_prometheus(self):
+        """Renders all series in the Prometheus text exposition format."""
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+            return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+        lines, typed = [], set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                declare(name, 'counter')
+                lines.append(f"{PREFIX}{name}{fmt_labels(labels)} {value}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                declare(name, 'gauge')
+                lines.append(f"{PREFIX}{name}{fmt_labels(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                declare(name, 'histogram')
+                cumulative = 0
+                for upper, n in zip([str(b) for b in h.buckets] + ['+Inf'], h.counts):
+                    cumulative += n
+                    lines.append(f"{PREFIX}{name}_bucket{fmt_labels(labels, [('le', upper)])} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{fmt_labels(labels)} {h.sum}")
+                lines.append(f"{PREFIX}{name}_count{fmt_labels(labels)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry used by collectors, storage and the scheduler
+metrics = MetricsRegistry()
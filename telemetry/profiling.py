@@ -0,0 +1,236 @@
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from config import PROFILE_DIR, PROFILE_KEEP_RUNS, PROFILE_KEEP_SESSIONS, PROFILE_SAMPLE_INTERVAL
+
+PROFILE_ENV = 'TREND_PROFILE'
+
+_run_dir = None
+_session_counter = 0
+_lock = threading.Lock()
+# Sessions overlap whenever profiled coroutines share an event loop: tracemalloc is refcounted
+# so only the last session stops it, and cProfile/stack sampling (process-wide hooks) is
+# limited to one session at a time
+_tracemalloc_sessions = 0
+_tracemalloc_owned = False
+_cpu_session_active = False
+
+
+def profile_modes():
+    """Parses TREND_PROFILE into the set of enabled profilers ('cpu', 'mem')."""
+    value = os.getenv(PROFILE_ENV, '').strip().lower()
+    if value in ('', '0', 'false', 'off'):
+        return set()
+    if value in ('1', 'true', 'on', 'all'):
+        return {'cpu', 'mem'}
+    return {mode.strip() for mode in value.split(',')} & {'cpu', 'mem'}
+
+
+def enable_profiling(modes='all'):
+    """For CLIs: turns profiling on for every function decorated after this call."""
+    os.environ[PROFILE_ENV] = modes
+
+
+def _prune(directory, keep):
+    """Keeps only the `keep` most recent entries of a directory (names sort chronologically)."""
+    entries = sorted(e for e in os.listdir(directory) if os.path.isdir(os.path.join(directory, e)))
+    for stale in entries[:-keep] if keep else entries:
+        shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+
+
+def _session_dir(name):
+    """profiles/<run>/<seq>-<name>/; the run directory is created once per process and rotated."""
+    global _run_dir, _session_counter
+    with _lock:
+        if _run_dir is None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            _run_dir = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}")
+            os.makedirs(_run_dir, exist_ok=True)
+            _prune(PROFILE_DIR, PROFILE_KEEP_RUNS)
+        _session_counter += 1
+        path = os.path.join(_run_dir, f"{_session_counter:05d}-{name}")
+        os.makedirs(path, exist_ok=True)
+        _prune(_run_dir, PROFILE_KEEP_SESSIONS)
+    return path
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval and aggregates collapsed stacks
+    ("outer;inner;leaf count" lines), the input format of flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    """CPU (cProfile + sampled stacks) and/or memory (tracemalloc) profile of one call."""
+
+    def __init__(self, name, modes):
+        self.name = name
+        self.modes = modes
+        self.profiler = None
+        self.sampler = None
+        self.cpu_skipped = False
+
+    def _start_tracemalloc(self):
+        global _tracemalloc_sessions, _tracemalloc_owned
+        with _lock:
+            if _tracemalloc_sessions == 0:
+                _tracemalloc_owned = not tracemalloc.is_tracing()
+                if _tracemalloc_owned:
+                    tracemalloc.start(25)
+                # Overlapping sessions share one peak; only the first one resets it
+                tracemalloc.reset_peak()
+            _tracemalloc_sessions += 1
+
+    @staticmethod
+    def _stop_tracemalloc():
+        global _tracemalloc_sessions, _tracemalloc_owned
+        with _lock:
+            _tracemalloc_sessions -= 1
+            if _tracemalloc_sessions == 0 and _tracemalloc_owned:
+                tracemalloc.stop()
+                _tracemalloc_owned = False
+
+    def _start_cpu(self):
+        global _cpu_session_active
+        with _lock:
+            if _cpu_session_active:
+                # Nested or concurrent session: its profile would fight over the same hooks
+                self.cpu_skipped = True
+                return
+            _cpu_session_active = True
+        self.profiler = cProfile.Profile()
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # A profiler outside this module is active; stack samples still work
+            self.profiler = None
+        self.sampler = StackSampler(threading.get_ident())
+        self.sampler.start()
+
+    def _stop_cpu(self):
+        global _cpu_session_active
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.profiler is not None or self.sampler is not None:
+            with _lock:
+                _cpu_session_active = False
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        if 'mem' in self.modes:
+            self._start_tracemalloc()
+        if 'cpu' in self.modes:
+            self._start_cpu()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.started
+        self._stop_cpu()
+        snapshot = None
+        if 'mem' in self.modes:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            self._stop_tracemalloc()
+
+        path = _session_dir(self.name)
+        summary = {'name': self.name, 'wall_seconds': wall, 'modes': sorted(self.modes),
+                   'failed': exc_info[0] is not None}
+        if self.cpu_skipped:
+            summary['cpu_skipped'] = 'another CPU profile was active'
+
+        if self.profiler is not None:
+            self.profiler.dump_stats(os.path.join(path, 'cpu.prof'))
+            report = io.StringIO()
+            pstats.Stats(self.profiler, stream=report).sort_stats('cumulative').print_stats(50)
+            with open(os.path.join(path, 'cpu.txt'), 'w', encoding='utf-8') as f:
+                f.write(report.getvalue())
+        if self.sampler is not None:
+            self.sampler.write(os.path.join(path, 'cpu.collapsed'))
+            summary['stack_samples'] = sum(self.sampler.stacks.values())
+
+        if snapshot is not None:
+            summary.update({'memory_current_mb': current / 1e6, 'memory_peak_mb': peak / 1e6})
+            with open(os.path.join(path, 'memory.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"Peak traced memory: {peak / 1e6:.1f} MB\n\nTop allocators (by line):\n")
+                for stat in snapshot.statistics('lineno')[:25]:
+                    f.write(f"{stat}\n")
+
+        with open(os.path.join(path, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"🔬 Profile '{self.name}' ({wall:.2f}s) written to {path}")
+        return False
+
+
+def profiled(name):
+    """
+    Decorator that profiles every call of a sync or async function when TREND_PROFILE is set.
+    The switch is evaluated once, at decoration time: when it is off the original function
+    is returned untouched, so there is no per-call overhead at all.
+    """
+    def decorator(func):
+        modes = profile_modes()
+        if not modes:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with ProfileSession(name, modes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with ProfileSession(name, modes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+
+from benchmarks.synthetic import SyntheticCorpus, SyntheticEncoder
+from database.analytics import CURRENT_FILE, load_balanced_trends, load_posts, open_snapshot, publish_snapshot
+from database.manager import TrendManager
+
+
+def _corpus_db(tmp_path, n=400):
+    db_path = str(tmp_path / 'trends.db')
+    TrendManager(db_path, nlp_model=SyntheticEncoder())
+    SyntheticCorpus(seed=3).populate(db_path, n)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE unified_posts SET trend_score = id')
+    return db_path
+
+
+def _version(out_dir):
+    return open_snapshot(out_dir).files[0].split(os.sep + 'v-')[1].split(os.sep)[0]
+
+
+def test_unchanged_database_is_not_republished(tmp_path):
+    db_path = _corpus_db(tmp_path)
+    out_dir = publish_snapshot(db_path)
+    version = _version(out_dir)
+    assert publish_snapshot(db_path) == out_dir
+    assert _version(out_dir) == version
+    assert len(load_posts(['id'], path=out_dir)) == 400
+
+
+def test_only_changed_platforms_are_rewritten(tmp_path):
+    db_path = _corpus_db(tmp_path)
+    out_dir = publish_snapshot(db_path)
+    before = {f: os.stat(f).st_ino for f in open_snapshot(out_dir).files}
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE unified_posts SET trend_score = trend_score + 1000 WHERE source_platform = 'GitHub'")
+
+    publish_snapshot(db_path)
+    after = open_snapshot(out_dir).files
+    rewritten = {f for f in after if os.stat(f).st_ino not in before.values()}
+    assert rewritten and all('source_platform=GitHub' in f for f in rewritten)
+    top = load_balanced_trends(per_platform=5, db_path=db_path, path=out_dir)
+    assert top.iloc[0]['source_platform'] == 'GitHub' and top.iloc[0]['trend_score'] >= 1000
+
+
+def test_readers_keep_their_version_across_publishes(tmp_path):
+    db_path = _corpus_db(tmp_path)
+    out_dir = publish_snapshot(db_path, keep=2)
+    reader = open_snapshot(out_dir)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE unified_posts SET trend_score = trend_score + 1')
+    publish_snapshot(db_path, keep=2)
+    # One publish later the retired version is still on disk
+    assert reader.to_table(columns=['id']).num_rows == 400
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE unified_posts SET trend_score = trend_score + 1')
+    publish_snapshot(db_path, keep=2)
+    versions = [d for d in os.listdir(out_dir) if d.startswith('v-')]
+    assert len(versions) == 2 and os.path.exists(os.path.join(out_dir, CURRENT_FILE))
+
+
+def test_missing_snapshot_falls_back_to_sqlite(tmp_path):
+    db_path = _corpus_db(tmp_path)
+    assert open_snapshot(str(tmp_path / 'missing')) is None
+    assert len(load_balanced_trends(per_platform=5, db_path=db_path, path=str(tmp_path / 'missing'))) == 20
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+from database.history import DAY, HOUR, ScoreHistory
+from database.manager import TrendManager
+
+NOW = 1000 * DAY  # day- and hour-aligned, so bucket edges are easy to reason about
+CONFIG = {'raw_hours': 48, 'hourly_days': 30, 'max_days': 365}
+
+
+@pytest.fixture
+def history(tmp_path):
+    db_path = str(tmp_path / 'history.db')
+    TrendManager(db_path, embedding_tag=('test', 1))
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('INSERT INTO unified_posts (id, source_platform, external_id, title, url) '
+                         'VALUES (?, ?, ?, ?, ?)', [(1, 'GitHub', 'a', 'first', 'https://a'),
+                                                    (2, 'GitHub', 'b', 'second', 'https://b'),
+                                                    (3, 'Dev.to', 'c', 'third', 'https://c')])
+    return ScoreHistory(db_path, config=CONFIG)
+
+
+def _insert(history, snapshots):
+    with sqlite3.connect(history.db_path) as conn:
+        conn.executemany('INSERT INTO score_snapshots (post_id, cycle_time, raw_score) VALUES (?, ?, ?)', snapshots)
+
+
+def _times(history, post_id=1):
+    with sqlite3.connect(history.db_path) as conn:
+        rows = conn.execute('SELECT cycle_time FROM score_snapshots WHERE post_id = ? ORDER BY cycle_time',
+                            (post_id,))
+        return [t for (t,) in rows]
+
+
+def test_rollup_keeps_raw_snapshots_up_to_the_cutoff(history):
+    cutoff = NOW - 48 * HOUR
+    # Two snapshots in the hour just before the cutoff, two at/after it in the same hour bucket
+    _insert(history, [(1, cutoff - 30 * 60, 1), (1, cutoff - 10 * 60, 2), (1, cutoff, 3), (1, cutoff + 60, 4)])
+    assert history.rollup(now=NOW) == {'dropped': 0, 'downsampled': 1}
+    assert _times(history) == [cutoff - 10 * 60, cutoff, cutoff + 60]
+
+
+def test_rollup_downsamples_to_hours_then_days_and_drops_expired(history):
+    hourly_cutoff, daily_cutoff, drop_cutoff = NOW - 48 * HOUR, NOW - 30 * DAY, NOW - 365 * DAY
+    hour = hourly_cutoff - 5 * HOUR
+    day = daily_cutoff - 3 * DAY
+    _insert(history, [
+        # One hour bucket in the hourly range: only its last snapshot survives
+        (1, hour, 1), (1, hour + 20 * 60, 2), (1, hour + HOUR - 1, 3),
+        # One day bucket in the daily range: only its last snapshot survives
+        (1, day + HOUR, 4), (1, day + 12 * HOUR, 5), (1, day + DAY - 1, 6),
+        # Exactly at the drop cutoff is kept; one second older is dropped
+        (1, drop_cutoff, 7), (1, drop_cutoff - 1, 8),
+    ])
+    result = history.rollup(now=NOW)
+    assert result['dropped'] == 1
+    assert _times(history) == [drop_cutoff, day + DAY - 1, hour + HOUR - 1]
+    # Idempotent
+    assert history.rollup(now=NOW) == {'dropped': 0, 'downsampled': 0}
+
+
+def test_velocity_of_a_post_with_a_single_snapshot_is_not_reported(history):
+    _insert(history, [(1, NOW - 2 * HOUR, 10), (1, NOW, 30), (2, NOW - HOUR, 50)])
+    velocity = history.velocity(window_hours=24, now=NOW)
+    assert velocity['post_id'].tolist() == [1]
+    assert velocity['velocity'].iloc[0] == pytest.approx(10.0)
+
+
+def test_velocity_only_uses_snapshots_inside_the_window(history):
+    # The older snapshot of post 2 falls outside the window, leaving it with one snapshot
+    _insert(history, [(1, NOW - 3 * HOUR, 0), (1, NOW, 3), (2, NOW - 30 * HOUR, 0), (2, NOW, 100)])
+    assert history.velocity(window_hours=24, now=NOW)['post_id'].tolist() == [1]
+    assert history.velocity(window_hours=48, now=NOW)['post_id'].tolist() == [2, 1]
+
+
+def test_movers_rank_within_a_platform_and_carry_post_fields(history):
+    _insert(history, [(1, NOW - HOUR, 0), (1, NOW, 5), (2, NOW - HOUR, 0), (2, NOW, 20),
+                      (3, NOW - HOUR, 0), (3, NOW, 500)])
+    movers = history.movers(platform='GitHub', now=NOW)
+    assert movers['title'].tolist() == ['second', 'first']
+    assert movers['url'].tolist() == ['https://b', 'https://a']
+    assert history.movers(platform='Mastodon', now=NOW).empty
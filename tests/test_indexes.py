@@ -0,0 +1,153 @@
+import json
+import sqlite3
+
+from benchmarks.synthetic import SYNTHETIC_MODEL_TAG, SyntheticCorpus, SyntheticEncoder
+from database.backfill import EmbeddingBackfill
+from database.keywords import KeywordIndex
+from database.manager import TrendManager
+from database.topics import TopicModel
+
+
+def _legacy_db(path, rows):
+    """A database from before the derived indexes: only unified_posts with JSON keywords."""
+    with sqlite3.connect(path) as conn:
+        conn.execute('''
+            CREATE TABLE unified_posts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, source_platform TEXT, external_id TEXT,
+                title TEXT, content TEXT, author TEXT, url TEXT, raw_score REAL, trend_score REAL,
+                published_at TEXT, collected_at TEXT, keywords TEXT, embedding TEXT,
+                UNIQUE(source_platform, external_id)
+            )
+        ''')
+        conn.executemany('''
+            INSERT INTO unified_posts (source_platform, external_id, title, published_at, collected_at, keywords)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def test_keyword_backfill_is_an_explicit_step(tmp_path):
+    db_path = str(tmp_path / 'legacy.db')
+    _legacy_db(db_path, [
+        ('GitHub', '1', 'a', '2026-10-01T10:00:00', '2026-10-01T10:00:00', json.dumps(['Rust', 'wasm'])),
+        ('Dev.to', '2', 'b', '2026-10-02T10:00:00', '2026-10-02T10:00:00', json.dumps(['rust'])),
+    ])
+
+    manager = TrendManager(db_path, embedding_tag=('test', 1))
+    # Opening the database only creates the tables
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM post_keywords').fetchone()[0] == 0
+    assert manager.keyword_index.needs_backfill()
+
+    assert manager.backfill_indexes()['keywords'] == 3
+    assert not manager.keyword_index.needs_backfill()
+    assert manager.backfill_indexes() == {}
+
+
+def test_empty_database_needs_no_keyword_backfill(tmp_path):
+    db_path = str(tmp_path / 'empty.db')
+    _legacy_db(db_path, [('GitHub', '1', 'a', '2026-10-01T10:00:00', '2026-10-01T10:00:00', '[]')])
+    assert not KeywordIndex(db_path).needs_backfill()
+
+
+def _synthetic_db(tmp_path, n=200):
+    db_path = str(tmp_path / 'synthetic.db')
+    manager = TrendManager(db_path, nlp_model=SyntheticEncoder())
+    # Bulk load: bypasses save_posts, like a database written before the topic tables existed
+    SyntheticCorpus(seed=7).populate(db_path, n)
+    return db_path, manager
+
+
+def _topic_counts(db_path, model_tag):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute('''
+            SELECT COUNT(DISTINCT t.id), COUNT(p.post_id) FROM topics t
+            LEFT JOIN post_topics p ON p.topic_id = t.id
+            WHERE t.embedding_model = ? AND t.embedding_version = ?
+        ''', model_tag).fetchone()
+
+
+def test_topic_backfill_is_an_explicit_step(tmp_path):
+    db_path, manager = _synthetic_db(tmp_path)
+    assert _topic_counts(db_path, SYNTHETIC_MODEL_TAG) == (0, 0)
+    assert manager.topics.needs_backfill()
+
+    report = manager.backfill_indexes()
+    assert report['topics'] == 200 and report['keywords'] > 0
+    topics, members = _topic_counts(db_path, SYNTHETIC_MODEL_TAG)
+    assert topics > 0 and members == 200
+    assert manager.backfill_indexes() == {}
+
+
+def test_finished_embedding_backfill_clusters_the_new_version(tmp_path):
+    db_path, _ = _synthetic_db(tmp_path, n=120)
+    name, version = SYNTHETIC_MODEL_TAG
+    backfill = EmbeddingBackfill(db_path, model_name=name, version=version + 1, encoder=SyntheticEncoder(),
+                                 config={'workers': 1, 'chunk_size': 50})
+
+    paused = backfill.run(limit=50)
+    assert not paused['finished'] and paused['topics'] == 0
+    result = backfill.run()
+    assert result['finished'] and result['topics'] == 120
+    topics, members = _topic_counts(db_path, (name, version + 1))
+    assert topics > 0 and members == 120
+
+
+def test_prune_moves_members_to_the_nearest_surviving_topic(tmp_path):
+    db_path, manager = _synthetic_db(tmp_path)
+    model = TopicModel(db_path, SYNTHETIC_MODEL_TAG, config={'prune_min_size': 10 ** 6})
+    model.rebuild()
+    with sqlite3.connect(db_path) as conn:
+        stale, size = conn.execute('SELECT id, size FROM topics ORDER BY size LIMIT 1').fetchone()
+        survivor_sizes = dict(conn.execute('SELECT id, size FROM topics WHERE id != ?', (stale,)))
+        # Only the stale topic is old enough to be pruned
+        conn.execute("UPDATE topics SET updated_at = '2000-01-01' WHERE id = ?", (stale,))
+        conn.execute("UPDATE topics SET updated_at = '2999-01-01' WHERE id != ?", (stale,))
+        assert model._prune(conn) == 1
+        conn.commit()
+
+        assert conn.execute('SELECT COUNT(*) FROM topics WHERE id = ?', (stale,)).fetchone()[0] == 0
+        assert conn.execute('SELECT COUNT(*) FROM post_topics').fetchone()[0] == 200
+        sizes = dict(conn.execute('SELECT id, size FROM topics'))
+    assert set(sizes) == set(survivor_sizes)
+    assert sum(sizes.values()) == sum(survivor_sizes.values()) + size
+
+
+def test_rerunning_a_finished_backfill_does_not_recluster(tmp_path, monkeypatch):
+    db_path, _ = _synthetic_db(tmp_path, n=60)
+    name, version = SYNTHETIC_MODEL_TAG
+    backfill = EmbeddingBackfill(db_path, model_name=name, version=version + 1, encoder=SyntheticEncoder(),
+                                 config={'workers': 1, 'chunk_size': 50})
+    assert backfill.run()['topics'] == 60
+
+    rebuilds = []
+    monkeypatch.setattr(TopicModel, 'rebuild', lambda self: rebuilds.append(self) or 0)
+    again = backfill.run()
+    assert again['finished'] and again['already_complete'] and again['topics'] == 0
+    assert rebuilds == []
+
+    # Rows re-saved under the old model since the finished run are encoded, and only then re-clustered
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE unified_posts SET embedding_version = ? WHERE id <= 5', (version,))
+    more = backfill.run()
+    assert more['finished'] and not more['already_complete'] and len(rebuilds) == 1
+    assert backfill.pending() == 0
+
+
+def test_merge_runs_under_the_write_lock(tmp_path, monkeypatch):
+    db_path, _ = _synthetic_db(tmp_path, n=50)
+    model = TopicModel(db_path, SYNTHETIC_MODEL_TAG)
+    model.rebuild()
+    merge, blocked = TopicModel._merge, []
+
+    def merge_with_concurrent_writer(self, cursor):
+        # A writer arriving while centroids are read must wait instead of interleaving
+        with sqlite3.connect(db_path, timeout=0) as other:
+            try:
+                other.execute("UPDATE topics SET updated_at = 'now'")
+            except sqlite3.OperationalError as e:
+                blocked.append(str(e))
+        return merge(self, cursor)
+
+    monkeypatch.setattr(TopicModel, '_merge', merge_with_concurrent_writer)
+    model.maintain()
+    assert blocked == ['database is locked']
@@ -0,0 +1,103 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from database.manager import DEFAULT_POST_COLUMNS, TrendManager
+
+START = datetime(2026, 10, 1)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TrendManager(str(tmp_path / 'posts.db'), embedding_tag=('test', 1))
+    # Scores cycle through 3 values so every page boundary falls inside a run of ties
+    rows = [
+        (i, 'GitHub' if i % 2 else 'Dev.to', str(i), f"post {i}", f"body {i}", float(i % 3),
+         (START + timedelta(hours=i)).isoformat(), '[0.1, 0.2]')
+        for i in range(1, 31)
+    ]
+    with sqlite3.connect(manager.db_path) as conn:
+        conn.executemany('''
+            INSERT INTO unified_posts (id, source_platform, external_id, title, content, trend_score,
+                                       collected_at, embedding)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return manager
+
+
+def _expected(platform=None, since=None, until=None):
+    """(trend_score, id) of the fixture rows in page order."""
+    rows = [(float(i % 3), i) for i in range(1, 31)
+            if (platform is None or ('GitHub' if i % 2 else 'Dev.to') == platform)
+            and (since is None or START + timedelta(hours=i) >= since)
+            and (until is None or START + timedelta(hours=i) < until)]
+    return sorted(rows, reverse=True)
+
+
+def _all_pages(manager, limit, **filters):
+    pages, after = [], None
+    while True:
+        posts, after = manager.page_posts(limit, after=after, **filters)
+        pages.append(posts)
+        if after is None:
+            return pages
+
+
+def test_pages_cover_tied_scores_without_gaps_or_repeats(manager):
+    pages = _all_pages(manager, 4)
+    seen = [(p['trend_score'], p['id']) for page in pages for p in page]
+    assert seen == _expected()
+    # Boundaries split ties: the first page ends inside the run of score 2.0
+    assert pages[0][-1]['trend_score'] == pages[1][0]['trend_score'] == 2.0
+    assert all(len(page) == 4 for page in pages[:-1])
+
+
+def test_last_full_page_returns_an_empty_final_page(manager):
+    pages = _all_pages(manager, 10)
+    assert [len(page) for page in pages] == [10, 10, 10, 0]
+
+
+@pytest.mark.parametrize('filters', [
+    {'platform': 'GitHub'},
+    {'platform': ['GitHub', 'Dev.to'], 'since': START + timedelta(hours=5)},
+    {'since': START + timedelta(hours=5), 'until': START + timedelta(hours=17)},
+    {'platform': 'Dev.to', 'until': (START + timedelta(hours=20)).isoformat()},
+])
+def test_filters_apply_to_every_page(manager, filters):
+    pages = _all_pages(manager, 3, **filters)
+    seen = [(p['trend_score'], p['id']) for page in pages for p in page]
+    platform = filters.get('platform') if isinstance(filters.get('platform'), str) else None
+    until = filters.get('until')
+    until = datetime.fromisoformat(until) if isinstance(until, str) else until
+    assert seen == _expected(platform, filters.get('since'), until)
+    assert len(seen) == manager.count_posts(**filters)
+
+
+def test_top_posts_matches_the_first_page(manager):
+    top = manager.top_posts(limit=5, platform='GitHub')
+    assert [(p['trend_score'], p['id']) for p in top] == _expected('GitHub')[:5]
+    assert top == manager.page_posts(5, platform='GitHub')[0]
+
+
+def test_iter_posts_streams_in_id_order_across_chunks(manager):
+    since = START + timedelta(hours=10)
+    ids = [p['id'] for p in manager.iter_posts(platform='Dev.to', since=since, chunk_size=4)]
+    assert ids == [i for i in range(10, 31) if i % 2 == 0]
+
+
+def test_embeddings_are_only_read_when_requested(manager):
+    assert 'embedding' not in DEFAULT_POST_COLUMNS
+    assert 'embedding' not in manager.top_posts(limit=1)[0]
+    assert 'embedding' not in next(manager.iter_posts())
+    assert 'embedding' not in manager.page_posts(2)[0][0]
+
+    post = manager.top_posts(limit=1, columns=['title', 'embedding'])[0]
+    assert post['embedding'] == '[0.1, 0.2]'
+    # Cursor columns are added even when not requested
+    assert set(post) == {'title', 'embedding', 'id', 'trend_score'}
+    assert set(next(manager.iter_posts(columns=['embedding']))) == {'embedding', 'id'}
+
+
+def test_unknown_columns_are_rejected(manager):
+    with pytest.raises(ValueError):
+        manager.top_posts(columns=['title', 'password'])
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import os
+import tracemalloc
+
+import pytest
+from telemetry import profiling
+from telemetry.profiling import ProfileSession
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(profiling, '_run_dir', None)
+    return tmp_path
+
+
+def _summaries(profile_dir):
+    return {entry.split('-', 1)[1]: json.load(open(os.path.join(root, entry, 'summary.json')))
+            for root, dirs, _ in os.walk(profile_dir) for entry in dirs
+            if os.path.exists(os.path.join(root, entry, 'summary.json'))}
+
+
+def test_overlapping_sessions_share_tracemalloc_and_cpu_hooks(profile_dir):
+    async def job(name, delay):
+        with ProfileSession(name, {'cpu', 'mem'}):
+            await asyncio.sleep(delay)
+            return [bytearray(1000) for _ in range(100)]
+
+    async def main():
+        # The first session to start exits first, while the second one is still running
+        return await asyncio.gather(job('first', 0.05), job('second', 0.15))
+
+    asyncio.run(main())
+    assert not tracemalloc.is_tracing()
+    summaries = _summaries(profile_dir)
+    assert set(summaries) == {'first', 'second'}
+    assert 'cpu_skipped' not in summaries['first']
+    assert summaries['second']['cpu_skipped']
+    assert all('memory_peak_mb' in s for s in summaries.values())
+
+
+def test_cpu_profiling_resumes_after_a_session_ends(profile_dir):
+    for name in ('one', 'two'):
+        with ProfileSession(name, {'cpu'}):
+            sum(range(10000))
+    summaries = _summaries(profile_dir)
+    assert not any('cpu_skipped' in s for s in summaries.values())
+    assert all(os.path.exists(os.path.join(root, d, 'cpu.prof'))
+               for root, dirs, _ in os.walk(profile_dir) for d in dirs if d.endswith(('one', 'two')))
+
+
+def test_external_tracemalloc_is_left_running(profile_dir):
+    tracemalloc.start()
+    try:
+        with ProfileSession('inner', {'mem'}):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,126 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+from collectors.base import BaseCollector, FetchError
+from database.queue import JobQueue, LeaseLost, STATUS_DEAD, STATUS_QUEUED
+from ui.worker import JOB_FETCH, IngestWorker
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'queue.db'), config={'db_path': None, 'lease_seconds': 0.2,
+                                                         'retry_base_seconds': 0, 'max_attempts': 2})
+
+
+def _row(queue, job_id):
+    with sqlite3.connect(queue.db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        return dict(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'})
+    first = queue.claim('worker-a')
+    assert first['id'] == job_id and queue.claim('worker-b') is None
+
+    time.sleep(0.25)
+    second = queue.claim('worker-b')
+    assert second['id'] == job_id and second['attempts'] == 2
+    # The first worker lost its lease: it can neither renew nor finish the job
+    with pytest.raises(LeaseLost):
+        queue.heartbeat(first, 'worker-a')
+    assert not queue.complete(first, 'worker-a')
+    assert queue.complete(second, 'worker-b')
+
+
+def test_expired_lease_after_the_last_attempt_dead_letters(queue):
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'})
+    queue.claim('worker-a')
+    time.sleep(0.25)
+    queue.claim('worker-a')
+    time.sleep(0.25)
+    assert queue.claim('worker-a') is None
+    assert _row(queue, job_id)['status'] == STATUS_DEAD
+
+
+def test_dedupe_key_allows_one_pending_job(queue):
+    key = 'fetch:GitHub'
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'}, dedupe_key=key)
+    assert queue.enqueue(JOB_FETCH, {'platform': 'GitHub'}, dedupe_key=key) is None
+    job = queue.claim('worker-a')
+    # Still pending while leased
+    assert queue.enqueue(JOB_FETCH, {'platform': 'GitHub'}, dedupe_key=key) is None
+    queue.complete(job, 'worker-a')
+    assert queue.enqueue(JOB_FETCH, {'platform': 'GitHub'}, dedupe_key=key) not in (None, job_id)
+
+
+def test_release_returns_the_job_without_using_an_attempt(queue):
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'})
+    job = queue.claim('worker-a')
+    assert not queue.release(job, 'worker-b')
+    assert queue.release(job, 'worker-a')
+    row = _row(queue, job_id)
+    assert row['status'] == STATUS_QUEUED and row['attempts'] == 0 and row['lease_owner'] is None
+    assert queue.claim('worker-b')['attempts'] == 1
+
+
+def test_failures_retry_then_dead_letter(queue):
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'})
+    assert queue.fail(queue.claim('worker-a'), 'worker-a', 'boom') == STATUS_QUEUED
+    assert queue.fail(queue.claim('worker-a'), 'worker-a', 'boom') == STATUS_DEAD
+    assert queue.claim('worker-a') is None
+    assert [job['id'] for job in queue.dead_letters()] == [job_id]
+    assert queue.requeue_dead() == 1 and queue.claim('worker-a')['attempts'] == 1
+
+
+def test_fail_after_losing_the_lease_leaves_the_job_alone(queue):
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'})
+    first = queue.claim('worker-a')
+    time.sleep(0.25)
+    second = queue.claim('worker-b')
+    assert queue.fail(first, 'worker-a', 'boom') is None
+    row = _row(queue, job_id)
+    assert row['lease_owner'] == 'worker-b' and row['last_error'] == 'lease expired'
+    assert queue.complete(second, 'worker-b')
+
+
+def test_concurrent_claims_never_share_a_job(queue):
+    for i in range(40):
+        queue.enqueue(JOB_FETCH, {'platform': str(i)})
+    claimed, lock = [], threading.Lock()
+
+    def drain(worker_id):
+        while (job := queue.claim(worker_id)) is not None:
+            with lock:
+                claimed.append(job['id'])
+
+    threads = [threading.Thread(target=drain, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(set(claimed)) and len(claimed) == 40
+
+
+class FailingCollector(BaseCollector):
+    def __init__(self):
+        super().__init__('GitHub')
+
+    async def fetch(self, client):
+        raise FetchError("search returned HTTP 503")
+
+
+def test_failed_fetch_is_retried_by_the_queue(queue):
+    job_id = queue.enqueue(JOB_FETCH, {'platform': 'GitHub'})
+    worker = IngestWorker(queue, None, [FailingCollector()], worker_id='worker-a')
+    assert asyncio.run(worker.run(None, once=True, max_jobs=1)) == 1
+    row = _row(queue, job_id)
+    assert row['status'] == STATUS_QUEUED and row['attempts'] == 1
+    assert row['last_error'] == 'FetchError: search returned HTTP 503'
+
+
+def test_inline_collect_counts_a_failed_poll():
+    assert asyncio.run(FailingCollector().collect(None)) == []
@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import httpx
+from collectors.rate_limit import EXTERNAL_BUCKET, PRIORITY_DEEP, PRIORITY_PRIMARY, RateLimitedTransport, TokenBucket
+
+LIMITS = {'api.example.com': {'rate': 100.0, 'burst': 100}, 'default': {'rate': 100.0, 'burst': 100}}
+RETRY = {'max_retries': 3, 'base_delay': 0.01, 'max_delay': 1.0}
+
+
+def _run(handler, requests, limits=LIMITS, retry=RETRY, priority=PRIORITY_PRIMARY):
+    """Sends the (method, url) requests in order through a rate-limited MockTransport client."""
+    calls = []
+
+    def recording(request):
+        calls.append(request.url.path)
+        return handler(request, len(calls))
+
+    async def main():
+        transport = RateLimitedTransport(transport=httpx.MockTransport(recording), limits=limits,
+                                         retry=retry, seed=0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = []
+            for method, url in requests:
+                try:
+                    responses.append(await client.request(method, url, extensions={'priority': priority}))
+                except httpx.TransportError as e:
+                    responses.append(e)
+            return responses, transport
+
+    responses, transport = asyncio.run(main())
+    return responses, calls, transport
+
+
+def test_429_with_retry_after_is_retried_after_the_delay():
+    def handler(request, n):
+        return httpx.Response(429, headers={'Retry-After': '0.2'}) if n == 1 else httpx.Response(200)
+
+    started = time.monotonic()
+    responses, calls, _ = _run(handler, [('GET', 'https://api.example.com/items')])
+    assert responses[0].status_code == 200
+    assert len(calls) == 2
+    assert time.monotonic() - started >= 0.2
+
+
+def test_retry_after_beyond_max_delay_blocks_the_host_locally():
+    def handler(request, n):
+        return httpx.Response(429, headers={'Retry-After': '60'})
+
+    responses, calls, transport = _run(handler, [('GET', 'https://api.example.com/a'),
+                                                 ('GET', 'https://api.example.com/b')])
+    assert [r.status_code for r in responses] == [429, 429]
+    # The second request never reaches the server while the host is blocked
+    assert calls == ['/a']
+    assert responses[1].headers['X-Throttled-Locally'] == '1'
+    assert transport.budget()['api.example.com']['blocked_for'] > 50
+
+
+def test_transient_errors_give_up_after_max_retries():
+    responses, calls, _ = _run(lambda request, n: httpx.Response(503), [('GET', 'https://api.example.com/x')])
+    assert responses[0].status_code == 503
+    assert len(calls) == RETRY['max_retries'] + 1
+
+
+def test_bucket_refills_at_the_configured_rate():
+    async def main():
+        bucket = TokenBucket(rate=10.0, capacity=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # Two tokens are available immediately, the next two take 0.1s each
+    assert 0.18 <= asyncio.run(main()) < 0.5
+
+
+def test_rate_limit_resources_get_separate_buckets():
+    def handler(request, n):
+        if request.url.path.startswith('/search'):
+            return httpx.Response(200, headers={'X-RateLimit-Resource': 'search', 'X-RateLimit-Remaining': '0',
+                                                'X-RateLimit-Reset': '60', 'X-RateLimit-Limit': '30'})
+        return httpx.Response(200, headers={'X-RateLimit-Resource': 'core', 'X-RateLimit-Remaining': '4999',
+                                            'X-RateLimit-Reset': '3600', 'X-RateLimit-Limit': '5000'})
+
+    responses, calls, transport = _run(handler, [('GET', 'https://api.github.com/search/repositories'),
+                                                 ('GET', 'https://api.github.com/repos/a/b/readme'),
+                                                 ('GET', 'https://api.github.com/search/repositories')],
+                                       limits={**LIMITS, 'api.github.com': LIMITS['default']})
+    # The exhausted search budget does not hold back the README fetch ...
+    assert responses[1].status_code == 200
+    assert calls[:2] == ['/search/repositories', '/repos/a/b/readme']
+    # ... while a second search is refused locally until the search window resets
+    assert responses[2].headers.get('X-Throttled-Locally') == '1'
+    budget = transport.budget()
+    assert budget['api.github.com:search']['remaining'] == 0
+    assert budget['api.github.com:core']['remaining'] == 4999
+
+
+def _unreachable(request, n):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+def test_deep_fetches_of_external_hosts_fail_fast():
+    responses, calls, transport = _run(_unreachable, [('GET', 'https://blog.example.org/post'),
+                                                      ('GET', 'https://news.example.net/story')],
+                                       priority=PRIORITY_DEEP)
+    assert all(isinstance(r, httpx.ConnectError) for r in responses)
+    assert calls == ['/post', '/story']
+    # Every unconfigured host shares one bucket
+    assert list(transport.budget()) == [EXTERNAL_BUCKET]
+
+
+def test_transport_errors_of_configured_hosts_are_retried():
+    responses, calls, _ = _run(_unreachable, [('GET', 'https://api.example.com/x')], priority=PRIORITY_DEEP)
+    assert isinstance(responses[0], httpx.ConnectError)
+    assert len(calls) == RETRY['max_retries'] + 1
+
+
+def test_waiters_are_served_by_priority():
+    async def main():
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        await bucket.acquire()
+        order = []
+
+        async def take(name, priority):
+            await bucket.acquire(priority)
+            order.append(name)
+
+        deep = [asyncio.create_task(take(f"deep{i}", PRIORITY_DEEP)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        primary = asyncio.create_task(take('primary', PRIORITY_PRIMARY))
+        await asyncio.gather(*deep, primary)
+        return order
+
+    order = asyncio.run(main())
+    # The listing call jumps every deep fetch still waiting, the deep fetches keep their order
+    assert order == ['primary', 'deep0', 'deep1', 'deep2']
+
+
+def test_metrics_of_unconfigured_hosts_share_one_label(monkeypatch):
+    from collectors import client as client_module
+    from telemetry.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    monkeypatch.setattr(client_module, 'metrics', registry)
+
+    async def main():
+        transport = client_module.InstrumentedTransport(httpx.MockTransport(lambda request: httpx.Response(200)))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for url in ('https://a.example.org/', 'https://b.example.net/', 'https://api.github.com/search'):
+                await client.get(url)
+
+    asyncio.run(main())
+    prometheus = registry.to_prometheus()
+    assert 'host="other"' in prometheus and 'host="api.github.com"' in prometheus
+    assert 'example' not in prometheus
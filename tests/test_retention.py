@@ -0,0 +1,38 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from database.manager import TrendManager
+from database.retention import RetentionManager, TIER_COLD
+
+
+def _legacy_db(tmp_path):
+    """A database created before retention: auto_vacuum still off."""
+    db_path = str(tmp_path / 'legacy.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('PRAGMA auto_vacuum = NONE')
+        conn.execute('CREATE TABLE t (x)')
+    TrendManager(db_path, embedding_tag=('test', 1))
+    old = (datetime.now() - timedelta(days=30)).isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany('''
+            INSERT INTO unified_posts (source_platform, external_id, content, collected_at) VALUES (?, ?, ?, ?)
+        ''', [('GitHub', str(i), 'x' * 2000, old) for i in range(50)])
+    return db_path
+
+
+def test_scheduled_run_never_switches_vacuum_mode(tmp_path):
+    db_path = _legacy_db(tmp_path)
+    retention = RetentionManager(db_path)
+    report = retention.run()
+    assert report['cold'] == 50 and report['incremental_vacuum'] is False
+    assert not retention.incremental_vacuum_enabled()
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM unified_posts WHERE storage_tier = ?', (TIER_COLD,)).fetchone()[0] == 50
+
+
+def test_explicit_migration_enables_incremental_vacuum(tmp_path):
+    retention = RetentionManager(_legacy_db(tmp_path))
+    assert retention.enable_incremental_vacuum()
+    assert retention.incremental_vacuum_enabled()
+    assert not retention.enable_incremental_vacuum()
+    assert retention.run()['incremental_vacuum'] is True
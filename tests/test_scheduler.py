@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from ui.scheduler import PipelineScheduler
+
+
+class FakeCollector:
+    def __init__(self, name, process_seconds=0.0):
+        self.platform_name = name
+        self.process_seconds = process_seconds
+
+    async def fetch(self, client):
+        return [{'title': self.platform_name}]
+
+    def process(self, posts):
+        time.sleep(self.process_seconds)
+        return posts
+
+
+class FakeManager:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def save_posts(self, posts):
+        if self.fail:
+            raise RuntimeError('database is locked')
+        return len(posts)
+
+
+class FakeJobs:
+    def __init__(self):
+        self.rescheduled = []
+
+    def reschedule_job(self, job_id, trigger):
+        self.rescheduled.append(job_id)
+
+    def add_job(self, *args, **kwargs):
+        pass
+
+
+def _scheduler(collectors, manager):
+    scheduler = PipelineScheduler(collectors, manager, None)
+    scheduler.scheduler = FakeJobs()
+    return scheduler
+
+
+def test_processing_does_not_block_the_event_loop():
+    collectors = [FakeCollector('Slow', process_seconds=0.3), FakeCollector('Fast')]
+    scheduler = _scheduler(collectors, FakeManager())
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(*(scheduler.collect_platform(c) for c in collectors), ticker())
+        return ticks
+
+    ticks = asyncio.run(main())
+    # A blocked loop would leave a ~0.3s gap between ticks
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.2
+    assert scheduler.dirty_platforms == {'Slow', 'Fast'}
+
+
+def test_failed_store_still_reschedules():
+    scheduler = _scheduler([FakeCollector('Mastodon')], FakeManager(fail=True))
+    asyncio.run(scheduler.collect_platform(scheduler.collectors[0]))
+    assert scheduler.scheduler.rescheduled == ['collect:Mastodon']
+    assert not scheduler.dirty_platforms
+
+
+def test_briefing_runs_share_one_service(monkeypatch):
+    import ui.briefing
+
+    created = []
+
+    class FakeBriefings:
+        def __init__(self, db_path):
+            created.append(db_path)
+
+        def pregenerate_from_graph(self, graph):
+            return 0
+
+    monkeypatch.setattr(ui.briefing, 'BriefingService', FakeBriefings)
+    manager = FakeManager()
+    manager.db_path = 'trends.db'
+    scheduler = _scheduler([], manager)
+    scheduler.pregenerate_briefings(None)
+    scheduler.pregenerate_briefings(None)
+    assert created == ['trends.db']
@@ -1,16 +1,12 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import os
 import sys
 import json
+import sqlite3
 import numpy as np
-import time
-
-# --- Google Generative AI SDK ---
-import google.generativeai as genai
 
 # --- Dynamic Path Resolution ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,6 +15,13 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from graph_analyzer import GraphBuilder
+from briefing import BriefingService
+from config import GRAPH_SNAPSHOT_MAX_AGE_MINUTES
+from database.analytics import load_balanced_trends
+from database.history import ScoreHistory
+from database.keywords import KeywordIndex
+from database.topics import TopicModel
+from telemetry.profiling import profiled
 
 DB_PATH = os.path.join(PROJECT_ROOT, "trends_project.db")
 
@@ -52,86 +55,63 @@ PLATFORM_COLORS = {
 
 
 # ==========================================
-# 🧠 AI ANALYST (LOGIC UNTOUCHED)
+# 🧠 AI ANALYST (CACHED, RATE-LIMITED BRIEFINGS)
 # ==========================================
 
-@st.cache_data(show_spinner=False, ttl=3600)
-def get_ai_briefing(p1, t1, c1, p2, t2, c2, score):
-    GEMINI_KEY = os.getenv("GEMINI_KEY")
-
-    if not GEMINI_KEY:
-        return "System Error: API key not found."
+@st.cache_resource
+def get_briefing_service():
+    # One service (and rate limiter) per server process, shared by every session
+    return BriefingService(DB_PATH)
 
-    time.sleep(3.0)
 
-    try:
-        genai.configure(api_key=GEMINI_KEY)
+def get_ai_briefing(post_a, post_b, score):
+    """Cached briefings come straight from SQLite; misses go through the shared rate limiter."""
+    thesis, _ = get_briefing_service().get_or_generate(post_a, post_b, score)
+    return thesis
 
-        try:
-            model = genai.GenerativeModel("models/gemini-flash-latest")
-        except Exception as e:
-            print("Primary model failed:", e)
-            model = genai.GenerativeModel("models/gemini-2.5-flash")
 
-        prompt = f"""
-        You are a senior AI industry analyst.
-
-        Analyze the connection between the following two signals from different platforms.
-        These signals have a semantic similarity score of {score:.1f}%.
-
-        --- SOURCE A ({p1}) ---
-        Title: {t1}
-        Content: {c1}
+# ==========================================
+# 📊 DATA ACCESS LAYER
+# ==========================================
 
-        --- SOURCE B ({p2}) ---
-        Title: {t2}
-        Content: {c2}
+@st.cache_data(ttl=300)
+def fetch_balanced_trends():
+    # Balanced representation, served from the Parquet snapshot (SQLite only as a fallback)
+    return load_balanced_trends(per_platform=25, db_path=DB_PATH)
 
-        Your task:
 
-        1. Explain the deeper connection between these two signals (not just surface similarity).
-        2. Identify the underlying technological or industry trend.
-        3. Explain WHY this trend is emerging now (market forces, technology shifts, developer behavior, etc).
-        4. Provide a forward-looking prediction (what is likely to happen next in this space).
-        5. Highlight any strategic insight or opportunity.
+def ensure_schema(*models):
+    # Databases written by older versions lack the index tables; create them empty
+    with sqlite3.connect(DB_PATH) as conn:
+        for model in models:
+            model.init_schema(conn.cursor())
 
-        Write a detailed, well-structured analysis (5–8 sentences).
-        Use a professional, insightful tone (like a top-tier analyst report).
-        Write ONLY in English.
-        """
-        response = model.generate_content(prompt)
 
-        if response and hasattr(response, "text"):
-            return response.text.strip()
+@st.cache_data(ttl=300)
+def fetch_keyword_momentum(days):
+    # Reads the pre-aggregated daily counts, not the posts table
+    ensure_schema(KeywordIndex)
+    index = KeywordIndex(DB_PATH)
+    rising = index.rising_keywords(days=days, limit=15)
+    series = index.keyword_series(rising['keyword'].head(5).tolist(), days=max(days * 4, 28))
+    return rising, series
 
-        return "AI could not generate insight."
 
-    except Exception as e:
-        error_msg = str(e)
-        if "429" in error_msg:
-            return "The AI service is currently at capacity. Please try again in 60 seconds."
-        return f"AI Insight unavailable: {error_msg}"
+@st.cache_data(ttl=300)
+def fetch_emerging_topics(days):
+    # Growth per persisted cluster; no pairwise similarity work at render time
+    ensure_schema(TopicModel)
+    model = TopicModel(DB_PATH)
+    emerging = model.emerging_topics(days=days, limit=12)
+    members = {topic_id: model.topic_posts(topic_id, limit=5) for topic_id in emerging['topic_id']}
+    return emerging, members
 
 
-# ==========================================
-# 📊 DATA ACCESS LAYER
-# ==========================================
-
 @st.cache_data(ttl=300)
-def fetch_balanced_trends():
-    if not os.path.exists(DB_PATH):
-        return pd.DataFrame()
-
-    conn = sqlite3.connect(DB_PATH)
-    # Balanced representation
-    df = pd.read_sql_query("""
-        SELECT * FROM (
-            SELECT *, ROW_NUMBER() OVER(PARTITION BY source_platform ORDER BY trend_score DESC) as rn 
-            FROM unified_posts
-        ) WHERE rn <= 25 ORDER BY trend_score DESC
-    """, conn)
-    conn.close()
-    return df
+def fetch_score_movers(window_hours, platform):
+    # Vectorised over the snapshot log; raw scores are only comparable within a platform
+    ensure_schema(ScoreHistory)
+    return ScoreHistory(DB_PATH).movers(window_hours=window_hours, platform=platform, limit=20)
 
 
 def safe_url_fetch(val):
@@ -144,6 +124,7 @@ def safe_url_fetch(val):
 # 🚀 CORE DASHBOARD INTERFACE
 # ==========================================
 
+@profiled('dashboard')
 def main():
     st.title("🧿 AI Trends Intelligence System")
     st.markdown("### Cross-Platform Semantic Discovery Engine")
@@ -162,7 +143,9 @@ def main():
 
     st.divider()
 
-    tab_wheel, tab_ai = st.tabs(["🌀 Ecosystem Wheel", "🔬 Intelligence Briefing"])
+    tab_wheel, tab_ai, tab_keywords, tab_topics, tab_movers = st.tabs(
+        ["🌀 Ecosystem Wheel", "🔬 Intelligence Briefing", "📈 Keyword Momentum", "🧭 Emerging Topics",
+         "🚀 Score Velocity"])
 
     with tab_wheel:
         # --- BALANCED LAYOUT: 3.0 vs 1.5 ---
@@ -249,8 +232,11 @@ def main():
         st.subheader("Automated Semantic Nexus Discovery")
         st.write("Generating strategic insights based on cross-platform convergence.")
 
+        # Prefer the graph maintained by the ingest scheduler, rebuild only if it is missing or stale
         builder = GraphBuilder()
-        g_nx = builder.build_graph()
+        g_nx = builder.load_snapshot(max_age_minutes=GRAPH_SNAPSHOT_MAX_AGE_MINUTES)
+        if g_nx is None:
+            g_nx = builder.build_graph()
 
         semantic_bridges = sorted(
             [(u, v, d) for u, v, d in g_nx.edges(data=True) if d.get('is_cross')],
@@ -271,13 +257,12 @@ def main():
                                 unsafe_allow_html=True)
 
                     btn_key = f"ai_btn_{u}_{v}"
-                    if st.button(f"🔍 Generate Strategic Briefing for this Nexus", key=btn_key):
+                    post_a, post_b = r1.to_dict(), r2.to_dict()
+                    thesis = get_briefing_service().cached(post_a, post_b)
+                    if thesis is None and st.button(f"🔍 Generate Strategic Briefing for this Nexus", key=btn_key):
                         with st.spinner("AI Analyst is synthesizing narrative..."):
-                            thesis = get_ai_briefing(
-                                r1['source_platform'], r1['title'], r1.get('content', ''),
-                                r2['source_platform'], r2['title'], r2.get('content', ''),
-                                match_val
-                            )
+                            thesis = get_ai_briefing(post_a, post_b, match_val)
+                    if thesis is not None:
                         st.markdown(f"<div class='ai-box'>🤖 <b>Strategic Report:</b><br>{thesis}</div>",
                                     unsafe_allow_html=True)
                     else:
@@ -303,6 +288,76 @@ def main():
                                        use_container_width=True)
                     st.divider()
 
+    with tab_keywords:
+        st.subheader("Rising Keyphrases")
+        days = st.select_slider("Window", options=[3, 7, 14, 30], value=7, format_func=lambda d: f"{d} days")
+        rising, series = fetch_keyword_momentum(days)
+
+        if rising.empty:
+            st.info("Not enough keyword history yet for this window.")
+        else:
+            col_rank, col_series = st.columns([1.5, 3.0])
+            with col_rank:
+                fig_rank = px.bar(
+                    rising.iloc[::-1], x='momentum', y='keyword', orientation='h',
+                    hover_data=['recent', 'baseline', 'platforms'], height=520
+                )
+                fig_rank.update_layout(margin=dict(t=10, l=10, r=10, b=10), yaxis_title=None)
+                st.plotly_chart(fig_rank, use_container_width=True)
+            with col_series:
+                fig_series = px.line(series, x='day', y='posts', color='keyword', markers=True, height=520)
+                fig_series.update_layout(margin=dict(t=10, l=10, r=10, b=10))
+                st.plotly_chart(fig_series, use_container_width=True)
+
+    with tab_topics:
+        st.subheader("Emerging Topics")
+        topic_days = st.select_slider("Growth window", options=[3, 7, 14, 30], value=7,
+                                      format_func=lambda d: f"{d} days", key="topic_window")
+        emerging, members = fetch_emerging_topics(topic_days)
+
+        if emerging.empty:
+            st.info("Topic clusters are still forming; check back after a few collection cycles.")
+        else:
+            emerging = emerging.assign(name=[f"#{t} {label or ''}" for t, label in zip(emerging['topic_id'], emerging['label'])])
+            fig_topics = px.bar(
+                emerging.iloc[::-1], x='growth', y='name', orientation='h', color='platforms',
+                hover_data=['recent', 'baseline', 'size'], height=480
+            )
+            fig_topics.update_layout(margin=dict(t=10, l=10, r=10, b=10), yaxis_title=None)
+            st.plotly_chart(fig_topics, use_container_width=True)
+
+            for row in emerging.itertuples():
+                with st.expander(f"{row.name} · {row.recent} new posts across {row.platforms} platforms"):
+                    for post in members.get(row.topic_id, []):
+                        st.markdown(f"- **{post['source_platform']}** · [{post['title']}]({post['url']})")
+
+    with tab_movers:
+        st.subheader("Fastest-Rising Posts")
+        col_platform, col_window = st.columns([1.0, 2.0])
+        with col_platform:
+            platform = st.selectbox("Platform", sorted(df['source_platform'].unique()), key="velocity_platform")
+        with col_window:
+            window_hours = st.select_slider("Window", options=[6, 12, 24, 48], value=24,
+                                            format_func=lambda h: f"{h} hours", key="velocity_window")
+        movers = fetch_score_movers(window_hours, platform)
+
+        if movers.empty:
+            st.info("Velocity needs at least two collection cycles per post; check back after the next cycle.")
+        else:
+            movers = movers.assign(name=[str(title)[:60] for title in movers['title']])
+            fig_movers = px.bar(
+                movers.iloc[::-1], x='velocity', y='name', orientation='h',
+                hover_data=['first_score', 'last_score', 'hours'], height=560,
+                labels={'velocity': 'score change per hour'}
+            )
+            fig_movers.update_layout(margin=dict(t=10, l=10, r=10, b=10), yaxis_title=None)
+            fig_movers.update_traces(marker_color=PLATFORM_COLORS.get(platform))
+            st.plotly_chart(fig_movers, use_container_width=True)
+
+            for row in movers.head(5).itertuples():
+                st.markdown(f"- **{row.last_score - row.first_score:+,.0f}** in {row.hours:.1f}h · "
+                            f"[{row.title}]({row.url})")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from config import BRIEFING_CONFIG, LLM_PROVIDER
+from database.retention import CONTENT_SQL, register_codecs
+
+# Bump whenever PROMPT_TEMPLATE changes: cached briefings of older prompts stop matching
+PROMPT_VERSION = 1
+
+PROMPT_TEMPLATE = """
+        You are a senior AI industry analyst.
+
+        Analyze the connection between the following two signals from different platforms.
+        These signals have a semantic similarity score of {score:.1f}%.
+
+        --- SOURCE A ({p1}) ---
+        Title: {t1}
+        Content: {c1}
+
+        --- SOURCE B ({p2}) ---
+        Title: {t2}
+        Content: {c2}
+
+        Your task:
+
+        1. Explain the deeper connection between these two signals (not just surface similarity).
+        2. Identify the underlying technological or industry trend.
+        3. Explain WHY this trend is emerging now (market forces, technology shifts, developer behavior, etc).
+        4. Provide a forward-looking prediction (what is likely to happen next in this space).
+        5. Highlight any strategic insight or opportunity.
+
+        Write a detailed, well-structured analysis (5–8 sentences).
+        Use a professional, insightful tone (like a top-tier analyst report).
+        Write ONLY in English.
+        """
+
+CAPACITY_MESSAGE = "The AI service is currently at capacity. Please try again in 60 seconds."
+
+
+class BriefingError(Exception):
+    """Raised by LLM clients; the message is shown to the user and nothing is cached."""
+
+
+class GeminiClient:
+    """Google Gemini through google-generativeai, falling back through the configured models."""
+
+    def __init__(self, api_key, models=None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.models = models or BRIEFING_CONFIG['models']
+        self.name = self.models[0]
+
+    def generate(self, prompt):
+        last_error = None
+        for model_name in self.models:
+            try:
+                response = self._genai.GenerativeModel(model_name).generate_content(prompt)
+            except Exception as e:
+                if "429" in str(e):
+                    raise BriefingError(CAPACITY_MESSAGE) from e
+                print(f"Model {model_name} failed: {e}")
+                last_error = e
+                continue
+            if response and hasattr(response, "text"):
+                return response.text.strip()
+            raise BriefingError("AI could not generate insight.")
+        raise BriefingError(f"AI Insight unavailable: {last_error}")
+
+
+class StubClient:
+    """Offline stand-in: deterministic canned briefings, no network (tests, demos, replay runs)."""
+
+    name = 'stub'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return f"[stub briefing {digest}] Both signals point at the same emerging practice."
+
+
+def build_client(provider=LLM_PROVIDER):
+    """Returns the configured LLM client, or None when no provider is usable."""
+    if provider == 'stub':
+        return StubClient()
+    if provider == 'gemini' and os.getenv("GEMINI_KEY"):
+        return GeminiClient(os.getenv("GEMINI_KEY"))
+    return None
+
+
+class RateLimiter:
+    """Thread-safe token bucket in front of the LLM provider (one per process)."""
+
+    def __init__(self, per_minute=BRIEFING_CONFIG['requests_per_minute'], burst=BRIEFING_CONFIG['burst']):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait=None):
+        """Takes a token, sleeping until one is available; False if that would exceed max_wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return False
+            # Reserve the token now so concurrent callers queue behind us
+            self.tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+def _canonical(post):
+    return (str(post.get('source_platform') or ''), str(post.get('title') or ''), str(post.get('content') or ''))
+
+
+def _post_id(post):
+    # Dashboard rows come from pandas, so ids may be numpy integers
+    return None if post.get('id') is None else int(post['id'])
+
+
+def briefing_key(post_a, post_b, prompt_version=PROMPT_VERSION):
+    """Order-independent hash of the two posts' text and the prompt version."""
+    first, second = sorted([_canonical(post_a), _canonical(post_b)])
+    payload = '\x1f'.join(first + second + (str(prompt_version),))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BriefingService:
+    """
+    Persistent briefing cache in front of a rate-limited LLM client.
+    Briefings live in the `briefings` table of the trends database, so they survive
+    restarts and are shared by every dashboard replica and the scheduler.
+    """
+
+    def __init__(self, db_path, client=None, limiter=None):
+        self.db_path = db_path
+        self.client = client if client is not None else build_client()
+        self.limiter = limiter or RateLimiter()
+        with sqlite3.connect(db_path) as conn:
+            self.init_schema(conn.cursor())
+
+    @staticmethod
+    def init_schema(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS briefings (
+                key TEXT PRIMARY KEY,
+                prompt_version INTEGER NOT NULL,
+                model TEXT,
+                post_a INTEGER,
+                post_b INTEGER,
+                briefing TEXT NOT NULL,
+                created_at TEXT
+            )
+        ''')
+
+    def cached(self, post_a, post_b):
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute('SELECT briefing FROM briefings WHERE key = ?',
+                               (briefing_key(post_a, post_b),)).fetchone()
+        return row[0] if row else None
+
+    def _store(self, key, post_a, post_b, text):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO briefings (key, prompt_version, model, post_a, post_b, briefing, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, PROMPT_VERSION, self.client.name, _post_id(post_a), _post_id(post_b), text,
+                  datetime.now().isoformat()))
+
+    def get_or_generate(self, post_a, post_b, score, max_wait=BRIEFING_CONFIG['max_wait_seconds']):
+        """Returns (briefing, from_cache). Failures return a user-facing message and are not cached."""
+        key = briefing_key(post_a, post_b)
+        hit = self.cached(post_a, post_b)
+        if hit is not None:
+            return hit, True
+        if self.client is None:
+            return "System Error: API key not found.", False
+        if not self.limiter.acquire(max_wait=max_wait):
+            return CAPACITY_MESSAGE, False
+
+        # Canonical order, so A/B in the prompt does not depend on which side was clicked
+        first, second = sorted([post_a, post_b], key=_canonical)
+        prompt = PROMPT_TEMPLATE.format(
+            score=score,
+            p1=first.get('source_platform'), t1=first.get('title'), c1=first.get('content', ''),
+            p2=second.get('source_platform'), t2=second.get('title'), c2=second.get('content', '')
+        )
+        try:
+            text = self.client.generate(prompt)
+        except BriefingError as e:
+            return str(e), False
+        except Exception as e:
+            return f"AI Insight unavailable: {e}", False
+        self._store(key, first, second, text)
+        return text, False
+
+    def pregenerate(self, bridges):
+        """Warms the cache for (post_a, post_b, score) bridges; waits for tokens instead of giving up."""
+        generated = 0
+        if self.client is None:
+            return generated
+        for post_a, post_b, score in bridges:
+            if self.cached(post_a, post_b) is not None:
+                continue
+            self.get_or_generate(post_a, post_b, score, max_wait=None)
+            # Failures are not stored, so a cache hit now means this call produced it
+            if self.cached(post_a, post_b) is not None:
+                generated += 1
+        return generated
+
+    def _load_posts(self, post_ids):
+        placeholders = ', '.join('?' * len(post_ids))
+        conn = register_codecs(sqlite3.connect(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f'''
+                SELECT id, source_platform, title, {CONTENT_SQL} AS content FROM unified_posts
+                WHERE id IN ({placeholders})
+            ''', list(post_ids)).fetchall()
+        finally:
+            conn.close()
+        return {row['id']: dict(row, content=row['content'] or '') for row in rows}
+
+    def pregenerate_from_graph(self, graph, top=BRIEFING_CONFIG['pregenerate_top']):
+        """Warms the briefings of the strongest cross-platform bridges, as ranked on the dashboard."""
+        bridges = sorted(
+            [(u, v, d) for u, v, d in graph.edges(data=True) if d.get('is_cross')],
+            key=lambda x: x[2].get('weight', 0),
+            reverse=True
+        )[:top]
+        if not bridges or self.client is None:
+            return 0
+        posts = self._load_posts({node for u, v, _ in bridges for node in (u, v)})
+        return self.pregenerate([(posts[u], posts[v], d['weight'] * 100)
+                                 for u, v, d in bridges if u in posts and v in posts])
@@ -2,13 +2,17 @@ import networkx as nx
 import sqlite3
 import os
 import json
+import time
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
+from telemetry.profiling import profiled
+from config import EMBEDDING_MODEL, EMBEDDING_VERSION
 
 # --- Path Configuration ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(CURRENT_DIR) if "ui" in CURRENT_DIR else CURRENT_DIR
 DB_PATH = os.path.join(PROJECT_ROOT, "trends_project.db")
+GRAPH_SNAPSHOT_PATH = os.path.join(PROJECT_ROOT, "graph_snapshot.json")
 
 # Platform UI Branding Colors
 PLATFORM_COLORS = {
@@ -19,23 +23,33 @@ PLATFORM_COLORS = {
 }
 
 
+def graph_snapshot_path(db_path):
+    """The graph snapshot of a database lives next to it (the default DB maps to GRAPH_SNAPSHOT_PATH)."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), os.path.basename(GRAPH_SNAPSHOT_PATH))
+
+
 class GraphBuilder:
     """
     Constructs a semantic knowledge graph from database embeddings.
     Designed for circular/spiral visualizations and cross-platform discovery.
     """
 
-    def __init__(self, cross_threshold=0.55, same_platform_threshold=0.85):
+    def __init__(self, cross_threshold=0.55, same_platform_threshold=0.85, db_path=DB_PATH,
+                 model_tag=(EMBEDDING_MODEL, EMBEDDING_VERSION)):
+        self.db_path = db_path
+        # Only vectors from one embedding model are comparable
+        self.model_tag = tuple(model_tag)
         self.cross_threshold = cross_threshold
         self.same_threshold = same_platform_threshold
         self.graph = nx.Graph()
 
+    @profiled('build_graph')
     def build_graph(self):
         """Builds the network graph by calculating semantic similarity between posts."""
-        if not os.path.exists(DB_PATH):
+        if not os.path.exists(self.db_path):
             return self.graph
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         # Balanced Sampling: Fetching top trends per platform to avoid bias
@@ -46,8 +60,9 @@ class GraphBuilder:
                 SELECT id, title, source_platform, trend_score, embedding, url
                 FROM unified_posts 
                 WHERE source_platform = ? AND embedding IS NOT NULL
+                  AND embedding_model = ? AND embedding_version = ?
                 ORDER BY trend_score DESC LIMIT 15
-            ''', (p,))
+            ''', (p,) + self.model_tag)
             all_rows.extend(cursor.fetchall())
         conn.close()
 
@@ -105,4 +120,25 @@ class GraphBuilder:
                 self.graph.nodes[node]['x'], self.graph.nodes[node]['y'] = coords[0], coords[1]
                 self.graph.nodes[node]['physics'] = False
 
-        return self.graph
\ No newline at end of file
+        return self.graph
+
+    def save_snapshot(self, path=GRAPH_SNAPSHOT_PATH):
+        """Persists the built graph as node-link JSON so the dashboard can skip the rebuild."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(nx.node_link_data(self.graph, edges="edges"), f)
+        os.replace(tmp_path, path)
+        return path
+
+    def load_snapshot(self, path=GRAPH_SNAPSHOT_PATH, max_age_minutes=None):
+        """Loads a previously saved graph. Returns None if it is missing, unreadable or stale."""
+        if not os.path.exists(path):
+            return None
+        if max_age_minutes is not None and time.time() - os.path.getmtime(path) > max_age_minutes * 60:
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.graph = nx.node_link_graph(json.load(f), edges="edges")
+        except (OSError, ValueError, KeyError):
+            return None
+        return self.graph
@@ -1,9 +1,9 @@
 import asyncio
 import sys
 import os
-import httpx
 import textwrap
-from datetime import datetime
+import time
+from contextlib import nullcontext
 
 # --- System Path Setup ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,30 +11,43 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
+# --- Profiling Switch ---
+# Decorators read it once at import time, so it has to be set before the modules below load
+from telemetry.profiling import enable_profiling, profile_modes, profiled
+if '--profile' in sys.argv and not profile_modes():
+    enable_profiling()
+
 # --- Internal Imports ---
 import config
 from database.manager import TrendManager
+from database.analytics import publish_snapshot
+from database.queue import JobQueue
+from collectors.client import build_client, rate_budget
 from collectors.github import GitHubCollector
 from collectors.hacker_news import HackerNewsCollector
 from collectors.mastodon import MastodonCollector
 from collectors.devto import DevToCollector
+from ui.scheduler import PipelineScheduler
+from telemetry.metrics import metrics
+from telemetry.exporter import CycleExporter, start_http_server
 
-# --- Configuration ---
-REFRESH_INTERVAL_MINUTES = 60
-REFRESH_INTERVAL_SECONDS = REFRESH_INTERVAL_MINUTES * 60
+cycle_exporter = CycleExporter()
 
 
-async def run_cycle(cycle_num, start_time):
+@profiled('run_cycle')
+async def run_cycle(cycle_num, start_time, db_manager=None, client=None):
     """
     Executes a single data collection cycle, including storage,
     AI embedding generation, and cross-platform normalization.
+    A pre-built TrendManager and HTTP client (e.g. in replay mode) can be injected.
     """
     print(f"\n" + "=" * 80)
     print(f"🕒 CYCLE #{cycle_num} STARTING | TIME: {start_time}")
     print("=" * 80)
+    cycle_started = time.perf_counter()
 
     # Initialize Database Manager
-    db_manager = TrendManager()
+    db_manager = db_manager or TrendManager()
 
     # Initialize Data Collectors
     collectors = [
@@ -43,16 +56,25 @@ async def run_cycle(cycle_num, start_time):
         MastodonCollector(),
         DevToCollector()
     ]
+    # Rescore the same database the posts are written to
+    for collector in collectors:
+        collector.db_path = db_manager.db_path
 
     all_posts = []
 
     try:
-        async with httpx.AsyncClient(timeout=30.0, headers={'User-Agent': 'TrendAnalyzer/5.0'}) as client:
+        async with (nullcontext(client) if client else build_client()) as client:
             # 1. Ingest Data from all platforms
             for collector in collectors:
-                platform_posts = await collector.collect(client)
+                with metrics.timer('collect_seconds', platform=collector.platform_name):
+                    platform_posts = await collector.collect(client)
                 all_posts.extend(platform_posts)
 
+            # Remaining API budget as reported by each host's rate-limit headers
+            for host, budget in rate_budget(client).items():
+                if budget['remaining'] is not None:
+                    print(f"    📉 {host}: {budget['remaining']}/{budget['limit']} requests left in window")
+
             # 2. Save new unique items and generate semantic embeddings
             new_count = db_manager.save_posts(all_posts)
             print(f">>> 💾 Saved {new_count} new unique items to the database.")
@@ -64,6 +86,7 @@ async def run_cycle(cycle_num, start_time):
 
         # 4. Data Health Report
         db_manager.get_db_stats()
+        publish_snapshot(db_manager.db_path)
 
         # 5. Final Output - Reporting Results in a formatted table
         print(f">>> ✅ Cycle #{cycle_num} Complete. Total fetched items: {len(all_posts)}")
@@ -75,7 +98,7 @@ async def run_cycle(cycle_num, start_time):
         print("-" * 100)
 
         # Fetch top 15 trends from the database
-        top_posts = db_manager.get_all_posts()[:15]
+        top_posts = db_manager.top_posts(15, columns=['source_platform', 'trend_score', 'title'])
 
         for i, post in enumerate(top_posts, 1):
             title = post.get('title', 'No Title').replace('\n', ' ')
@@ -87,37 +110,46 @@ async def run_cycle(cycle_num, start_time):
             print("-" * 100)
 
     except Exception as e:
+        metrics.inc('cycle_errors_total', error=type(e).__name__)
         print(f"❌ Critical Error during cycle execution: {e}")
+    finally:
+        metrics.observe('cycle_seconds', time.perf_counter() - cycle_started)
+        cycle_exporter.export(cycle_num, fetched=len(all_posts))
 
 
 async def start_scheduler():
     """
-    Main scheduler loop that keeps the engine running in intervals.
+    Runs each collector as an independent job with an adaptive polling interval.
+    Rescoring and graph maintenance run as downstream jobs whenever new data lands.
+    With TREND_INGEST=queue, collection is dispatched to `python cli.py worker` processes.
     """
+    use_queue = config.INGEST_MODE == 'queue'
     print("\n" + "#" * 60)
     print(f"      TrendAnalyzer v5.0 - Semantic AI Edition")
-    print(f"      🔄 Refresh Interval: {REFRESH_INTERVAL_MINUTES} Minutes")
+    print(f"      🔄 Adaptive per-platform polling")
+    if use_queue:
+        print(f"      📨 Dispatching to ingest workers (python cli.py worker)")
     print("#" * 60)
 
-    cycle_counter = 1
+    db_manager = TrendManager()
+    queue = JobQueue(db_manager.db_path) if use_queue else None
+    collectors = [
+        GitHubCollector(),
+        HackerNewsCollector(),
+        MastodonCollector(),
+        DevToCollector()
+    ]
+    start_http_server()
 
-    while True:
+    async with build_client() as client:
+        scheduler = PipelineScheduler(collectors, db_manager, client, queue=queue)
+        scheduler.start()
         try:
-            current_time = datetime.now().strftime("%H:%M:%S")
-            await run_cycle(cycle_counter, current_time)
-
-            print(
-                f"\n[Scheduler] 💤 Cycle #{cycle_counter} finished. Sleeping for {REFRESH_INTERVAL_MINUTES} minutes...")
-            cycle_counter += 1
-            await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
-
-        except KeyboardInterrupt:
-            print("\n🛑 Stopping Scheduler manually...")
-            break
-        except Exception as e:
-            print(f"Unexpected Scheduler Error: {e}")
-            print("Retrying in 60 seconds...")
-            await asyncio.sleep(60)
+            # Jobs run on this event loop; park the coroutine until shutdown
+            await asyncio.Event().wait()
+        finally:
+            print("\n🛑 Stopping Scheduler...")
+            scheduler.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from telemetry.metrics import metrics
+from telemetry.exporter import CycleExporter
+from config import (
+    POLLING_CONFIG, POLLING_TARGET_NEW_ITEMS, POLLING_SMOOTHING,
+    RESCORE_DELAY_SECONDS, GRAPH_REBUILD_DELAY_SECONDS, SCORE_HISTORY_CONFIG, RETENTION_CONFIG, TOPIC_CONFIG,
+    ANALYTICS_SNAPSHOT_INTERVAL_MINUTES
+)
+
+
+class AdaptiveInterval:
+    """
+    Derives a polling interval from the observed arrival rate of new items.
+    Fast-moving sources converge towards min_minutes, quiet ones back off towards max_minutes.
+    """
+
+    def __init__(self, initial_minutes, min_minutes, max_minutes,
+                 target_new_items=POLLING_TARGET_NEW_ITEMS, smoothing=POLLING_SMOOTHING):
+        self.min_minutes = min_minutes
+        self.max_minutes = max_minutes
+        self.target_new_items = target_new_items
+        self.smoothing = smoothing
+        self.minutes = self._clamp(initial_minutes)
+        self.rate = None  # EWMA of new items per minute
+
+    @classmethod
+    def for_platform(cls, platform_name):
+        settings = POLLING_CONFIG.get(platform_name, POLLING_CONFIG['default'])
+        return cls(settings['initial_minutes'], settings['min_minutes'], settings['max_minutes'])
+
+    def _clamp(self, minutes):
+        return max(self.min_minutes, min(self.max_minutes, minutes))
+
+    def update(self, new_items, elapsed_minutes):
+        """Feeds one poll result and returns the next interval in minutes."""
+        observed = new_items / max(elapsed_minutes, 1e-6)
+        if self.rate is None:
+            self.rate = observed
+        else:
+            self.rate = self.smoothing * observed + (1 - self.smoothing) * self.rate
+
+        if self.rate <= 0:
+            proposed = self.minutes * 2
+        else:
+            proposed = self.target_new_items / self.rate
+        # Never move more than 2x per step to avoid oscillating on a single noisy poll
+        proposed = max(self.minutes / 2, min(self.minutes * 2, proposed))
+        self.minutes = self._clamp(proposed)
+        return self.minutes
+
+
+class PipelineScheduler:
+    """
+    Runs every collector as an independent APScheduler job with its own adaptive interval.
+    Rescoring and graph maintenance are debounced downstream jobs triggered by new data.
+    With a job queue the collector jobs only dispatch 'fetch' jobs to ingest workers.
+    """
+
+    def __init__(self, collectors, db_manager, client, queue=None):
+        self.collectors = collectors
+        self.db_manager = db_manager
+        self.client = client
+        self.queue = queue
+        self.scheduler = AsyncIOScheduler()
+        self.intervals = {c.platform_name: AdaptiveInterval.for_platform(c.platform_name) for c in collectors}
+        self.last_run = {}
+        self.last_dispatch = {}
+        # Collect jobs add on the event loop, rescore swaps it from the executor thread
+        self.dirty_platforms = set()
+        self._dirty_lock = threading.Lock()
+        self._nlp_lock = threading.Lock()
+        self.exporter = CycleExporter()
+        self.polls = 0
+        # Built on the first briefing run, then reused so its rate limiter spans every run
+        self._briefings = None
+
+    @staticmethod
+    def _job_id(collector):
+        return f"collect:{collector.platform_name}"
+
+    def start(self):
+        collect = self.collect_platform if self.queue is None else self.dispatch_platform
+        for collector in self.collectors:
+            self.scheduler.add_job(
+                collect,
+                IntervalTrigger(minutes=self.intervals[collector.platform_name].minutes),
+                args=[collector],
+                id=self._job_id(collector),
+                next_run_time=datetime.now(),
+                max_instances=1,
+                coalesce=True
+            )
+        self.scheduler.add_job(
+            self.rollup_history,
+            IntervalTrigger(hours=SCORE_HISTORY_CONFIG['rollup_interval_hours']),
+            id='rollup_history',
+            max_instances=1,
+            coalesce=True
+        )
+        self.scheduler.add_job(
+            self.apply_retention,
+            IntervalTrigger(hours=RETENTION_CONFIG['interval_hours']),
+            id='retention',
+            max_instances=1,
+            coalesce=True
+        )
+        # Own, slower job: a publish re-encodes every changed platform, too costly per rescore
+        self.scheduler.add_job(
+            self.publish_snapshot,
+            IntervalTrigger(minutes=ANALYTICS_SNAPSHOT_INTERVAL_MINUTES),
+            id='publish_snapshot',
+            max_instances=1,
+            coalesce=True
+        )
+        self.scheduler.add_job(
+            self.maintain_topics,
+            IntervalTrigger(hours=TOPIC_CONFIG['interval_hours']),
+            id='maintain_topics',
+            max_instances=1,
+            coalesce=True
+        )
+        # Sync job: the executor thread keeps a long migration off the event loop
+        self._schedule_once('backfill_indexes', self.backfill_indexes, 0)
+        if self.queue is not None:
+            self.scheduler.add_job(
+                self.purge_queue,
+                IntervalTrigger(hours=24),
+                id='purge_queue',
+                max_instances=1,
+                coalesce=True
+            )
+        self.scheduler.start()
+
+    def shutdown(self):
+        self.scheduler.shutdown(wait=False)
+
+    def _schedule_once(self, job_id, func, delay_seconds, args=None):
+        """(Re)schedules a one-shot job; repeated calls push it back, coalescing bursts."""
+        self.scheduler.add_job(
+            func,
+            'date',
+            run_date=datetime.now() + timedelta(seconds=delay_seconds),
+            args=args,
+            id=job_id,
+            replace_existing=True
+        )
+
+    # Not @profiled: the collector jobs overlap on one event loop, so per-call profiles would mix
+    async def collect_platform(self, collector):
+        """Collector job: fetch, store, then adapt this platform's polling interval."""
+        name = collector.platform_name
+        interval = self.intervals[name]
+        now = time.monotonic()
+        elapsed_minutes = (now - self.last_run[name]) / 60 if name in self.last_run else interval.minutes
+        self.last_run[name] = now
+
+        try:
+            with metrics.timer('collect_seconds', platform=name):
+                raw_posts = await collector.fetch(self.client)
+            # NLP and embedding are CPU-bound: off the loop, so other platforms keep fetching on time
+            posts, new_count = await asyncio.to_thread(self._process_and_store, collector, raw_posts)
+        except Exception as e:
+            # A failed poll still backs off below instead of killing the job
+            metrics.inc('collect_errors_total', platform=name, error=type(e).__name__)
+            print(f"❌ [Scheduler] {name}: poll failed: {e}")
+            posts, new_count = [], 0
+
+        minutes = interval.update(new_count, elapsed_minutes)
+        metrics.set('poll_interval_minutes', minutes, platform=name)
+        self.scheduler.reschedule_job(self._job_id(collector), trigger=IntervalTrigger(minutes=minutes))
+        print(f"[Scheduler] {name}: {new_count} new / {len(posts)} fetched | next poll in {minutes:.0f} min")
+
+        if new_count:
+            self._mark_dirty(name)
+
+        # Each poll is one "cycle" for telemetry; downstream job timings land in the next export
+        self.polls += 1
+        self.exporter.export(self.polls, platform=name, fetched=len(posts), new=new_count)
+
+    def _process_and_store(self, collector, raw_posts):
+        # One at a time: the keyword and embedding models are shared and loaded lazily
+        with self._nlp_lock:
+            posts = collector.process(raw_posts)
+            return posts, self.db_manager.save_posts(posts)
+
+    def dispatch_platform(self, collector):
+        """
+        Collector job in queue mode: enqueues a fetch for the ingest workers and adapts the
+        interval to the posts they stored since the previous dispatch.
+        """
+        from ui.worker import JOB_FETCH
+
+        name = collector.platform_name
+        interval = self.intervals[name]
+        now, dispatched_at = time.monotonic(), datetime.now()
+        previous = self.last_dispatch.get(name)
+        self.last_dispatch[name] = dispatched_at
+        elapsed_minutes = (now - self.last_run[name]) / 60 if name in self.last_run else interval.minutes
+        self.last_run[name] = now
+
+        # One outstanding fetch per platform: a backlog never piles up duplicate polls
+        job_id = self.queue.enqueue(JOB_FETCH, {'platform': name}, dedupe_key=f"{JOB_FETCH}:{name}")
+        if previous is None:
+            print(f"[Scheduler] 📨 {name}: fetch dispatched | next in {interval.minutes:.0f} min")
+            return
+
+        new_count = self.db_manager.count_posts(platform=name, since=previous, until=dispatched_at)
+        minutes = interval.update(new_count, elapsed_minutes)
+        metrics.set('poll_interval_minutes', minutes, platform=name)
+        self.scheduler.reschedule_job(self._job_id(collector), trigger=IntervalTrigger(minutes=minutes))
+        state = 'fetch dispatched' if job_id else 'previous fetch still pending'
+        print(f"[Scheduler] 📨 {name}: {new_count} new since last dispatch, {state} | next in {minutes:.0f} min")
+
+        if new_count:
+            self._mark_dirty(name)
+
+        self.polls += 1
+        self.exporter.export(self.polls, platform=name, new=new_count)
+
+    def purge_queue(self):
+        """Maintenance job (queue mode): drops finished jobs past their retention."""
+        purged = self.queue.purge()
+        print(f"[Scheduler] 🧹 Queue: {purged} finished jobs purged")
+
+    def _mark_dirty(self, platform_name):
+        with self._dirty_lock:
+            self.dirty_platforms.add(platform_name)
+        self._schedule_once('rescore', self.rescore, RESCORE_DELAY_SECONDS)
+
+    def rescore(self):
+        """Downstream job: renormalizes the platforms that received new items."""
+        with self._dirty_lock:
+            dirty, self.dirty_platforms = self.dirty_platforms, set()
+        for collector in self.collectors:
+            if collector.platform_name in dirty:
+                collector.recalculate_platform_stats()
+        print(f"[Scheduler] 🧠 Rescored: {', '.join(sorted(dirty)) or 'nothing'}")
+        self.db_manager.get_db_stats()
+        self._schedule_once('rebuild_graph', self.rebuild_graph, GRAPH_REBUILD_DELAY_SECONDS)
+
+    def publish_snapshot(self):
+        """Maintenance job: republishes the changed platforms of the dashboard's Parquet snapshot."""
+        from database.analytics import publish_snapshot
+
+        path = publish_snapshot(self.db_manager.db_path)
+        print(f"[Scheduler] 📦 Analytics snapshot published to {path}")
+
+    def rebuild_graph(self):
+        """Downstream job: rebuilds the semantic graph snapshot served to the dashboard."""
+        from ui.graph_analyzer import GraphBuilder, graph_snapshot_path
+
+        db_path = self.db_manager.db_path
+        builder = GraphBuilder(db_path=db_path,
+                               model_tag=(self.db_manager.embedding_model, self.db_manager.embedding_version))
+        graph = builder.build_graph()
+        builder.save_snapshot(graph_snapshot_path(db_path))
+        print(f"[Scheduler] 🕸️ Graph snapshot: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+        self._schedule_once('pregenerate_briefings', self.pregenerate_briefings, 0, args=[graph])
+
+    def pregenerate_briefings(self, graph):
+        """Downstream job: generates missing AI briefings for the top bridges so dashboard clicks hit the cache."""
+        from ui.briefing import BriefingService
+
+        if self._briefings is None:
+            self._briefings = BriefingService(self.db_manager.db_path)
+        with metrics.timer('stage_seconds', stage='briefings'):
+            generated = self._briefings.pregenerate_from_graph(graph)
+        print(f"[Scheduler] 🤖 Briefings: {generated} pre-generated")
+
+    def rollup_history(self):
+        """Maintenance job: downsamples old score snapshots."""
+        result = self.db_manager.history.rollup()
+        print(f"[Scheduler] 🗜️ Score history rollup: {result['downsampled']} downsampled, {result['dropped']} dropped")
+
+    def apply_retention(self):
+        """Maintenance job: tiers old rows and releases free pages."""
+        report = self.db_manager.retention.run()
+        print(f"[Scheduler] 🧊 Retention: {report['cold']} moved to cold, "
+              f"{report['embedding_only']} stripped to embedding, {report['free_pages_left']} free pages left")
+        if not report['incremental_vacuum']:
+            print("[Scheduler] ⚠️ Free pages are not released: run `python cli.py vacuum` while nothing is writing")
+
+    def backfill_indexes(self):
+        """Startup job: fills derived indexes that are missing on databases from older versions."""
+        report = self.db_manager.backfill_indexes()
+        if report:
+            print(f"[Scheduler] 🔑 Backfilled: {', '.join(f'{name} ({n})' for name, n in report.items())}")
+
+    def maintain_topics(self):
+        """Maintenance job: merges converging topics, splits incoherent ones and refreshes labels."""
+        report = self.db_manager.topics.maintain()
+        print(f"[Scheduler] 🧭 Topics: {report['merged']} merged, {report['split']} split, "
+              f"{report['pruned']} pruned, {report['topics']} active")
\ No newline at end of file
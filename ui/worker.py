@@ -0,0 +1,102 @@
+import asyncio
+
+from database.queue import LeaseLost, worker_name
+from telemetry.metrics import metrics
+from config import QUEUE_CONFIG
+
+# Network stage of a collector; payload {'platform'}
+JOB_FETCH = 'fetch'
+# NLP, embedding and storage stage; payload {'platform', 'posts'} with the fetched raw posts
+JOB_PROCESS = 'process'
+JOB_KINDS = (JOB_FETCH, JOB_PROCESS)
+
+
+class IngestWorker:
+    """
+    Drains the ingest job queue. A 'fetch' job runs one collector's network stage and enqueues
+    the raw posts as a 'process' job; a 'process' job runs the NLP stage and stores the posts
+    with their embeddings. Any number of workers can run side by side, on this host or on others
+    sharing the queue, and `kinds` dedicates a worker to I/O-bound or CPU-bound jobs.
+    Queue calls wait on SQLite's busy timeout, so they run in threads to keep the event loop free.
+    """
+
+    def __init__(self, queue, db_manager, collectors, kinds=JOB_KINDS, worker_id=None):
+        self.queue = queue
+        self.db_manager = db_manager
+        self.collectors = {c.platform_name: c for c in collectors}
+        self.kinds = list(kinds)
+        self.worker_id = worker_id or worker_name()
+
+    async def run(self, client, once=False, max_jobs=None):
+        """Claims and runs jobs until stopped; with once=True it returns when no job is due."""
+        handled = 0
+        while max_jobs is None or handled < max_jobs:
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id, self.kinds)
+            if job is None:
+                if once:
+                    break
+                await asyncio.sleep(QUEUE_CONFIG['poll_seconds'])
+                continue
+            await self.run_job(job, client)
+            handled += 1
+        return handled
+
+    async def _heartbeat(self, job):
+        interval = self.queue.config['lease_seconds'] / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, job, self.worker_id)
+            except LeaseLost as e:
+                # Keep going: handlers are idempotent, the other worker's copy is harmless
+                print(f"⚠️ [Worker {self.worker_id}] {e}")
+                return
+
+    async def run_job(self, job, client):
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            with metrics.timer('job_seconds', kind=job['kind']):
+                if job['kind'] == JOB_FETCH:
+                    await self.fetch(job['payload'], client)
+                elif job['kind'] == JOB_PROCESS:
+                    # CPU-bound: off the event loop so the lease keeps being renewed
+                    await asyncio.to_thread(self.process, job['payload'])
+                else:
+                    raise ValueError(f"Unknown job kind: {job['kind']}")
+        except asyncio.CancelledError:
+            # Shielded: the release must land even though this task is being cancelled
+            await asyncio.shield(asyncio.to_thread(self.queue.release, job, self.worker_id))
+            raise
+        except Exception as e:
+            metrics.inc('job_errors_total', kind=job['kind'], error=type(e).__name__)
+            status = await asyncio.to_thread(self.queue.fail, job, self.worker_id, f"{type(e).__name__}: {e}")
+            outcome = status or "lease lost, left to its current owner"
+            print(f"❌ [Worker {self.worker_id}] job #{job['id']} ({job['kind']}, attempt "
+                  f"{job['attempts']}/{job['max_attempts']}) failed: {e} -> {outcome}")
+        else:
+            await asyncio.to_thread(self.queue.complete, job, self.worker_id)
+        finally:
+            heartbeat.cancel()
+
+    def _collector(self, payload):
+        try:
+            return self.collectors[payload['platform']]
+        except KeyError:
+            raise ValueError(f"No collector for platform {payload.get('platform')!r}") from None
+
+    async def fetch(self, payload, client):
+        collector = self._collector(payload)
+        name = collector.platform_name
+        with metrics.timer('collect_seconds', platform=name):
+            posts = await collector.fetch(client)
+        if posts:
+            await asyncio.to_thread(self.queue.enqueue, JOB_PROCESS, {'platform': name, 'posts': posts})
+        print(f"[Worker {self.worker_id}] 📡 {name}: fetched {len(posts)} raw posts")
+
+    def process(self, payload):
+        collector = self._collector(payload)
+        posts = collector.process(payload['posts'])
+        new_count = self.db_manager.save_posts(posts)
+        print(f"[Worker {self.worker_id}] 🧠 {collector.platform_name}: {new_count} new / "
+              f"{len(posts)} kept of {len(payload['posts'])} fetched")
+        return new_count